@@ -1,10 +1,14 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-import pytz
-import matplotlib.pyplot as plt
 from streamlit_option_menu import option_menu
 import os
+from utils.statistics_store import get_statistics_store
+from utils.instrumentation import PAGE_RENDER_SECONDS, record_session, start_metrics_server, timer
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from components.debug_panel import debug_panel_enabled, display_debug_panel
+from utils.warmup import start_warmup, warmup_enabled
+
+# Export render, load, inference and cache metrics on a local Prometheus port
+start_metrics_server()
 
 # Inject custom CSS
 def set_background_color_and_text():
@@ -178,96 +182,16 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Load the dataset for key metrics
-@st.cache_data
-def load_data():
-    return pd.read_csv(os.path.join('data', 'delhi_metro_final.csv'))
-
-def load_model_comparison_data():
-    """
-    Load the model performance metrics from a CSV file.
-    """
-    try:
-        df = pd.read_csv(os.path.join('data', 'model_performance_metrics.csv'))
-        return df
-    except FileNotFoundError:
-        st.error("The file 'model_performance_metrics.csv' was not found. Please ensure it exists in the 'data' directory.")
-        return pd.DataFrame()
-    except UnicodeDecodeError:
-        st.error("There was an issue decoding the file. Please ensure it is properly encoded.")
-        return pd.DataFrame()
-
-def get_local_time(timezone='Asia/Kolkata'):
-    """
-    Get the current time in the desired timezone.
-    """
-    server_time = datetime.now(pytz.utc)
-    local_timezone = pytz.timezone(timezone)
-    return server_time.astimezone(local_timezone)
-
-def get_current_ridership(station_name, hourly_ridership, timezone='Asia/Kolkata'):
-    """
-    Calculate the ridership at the current time for a given station, adjusted for timezone.
-    """
-    now = get_local_time(timezone)
-    current_hour = now.hour
-    current_day = now.weekday()  # Monday=0, Sunday=6
-
-    # Determine whether it's a weekday or weekend
-    if current_day < 5:  # Weekday (Monday to Friday)
-        ridership_column = f"Weekday_{current_hour}"
-    else:  # Weekend (Saturday and Sunday)
-        ridership_column = f"Weekend_{current_hour}"
-
-    # Filter the hourly ridership DataFrame for the given station
-    station_data = hourly_ridership[hourly_ridership['Station_Name'] == station_name]
-
-    if not station_data.empty:
-        current_ridership = station_data.iloc[0][ridership_column]
-        return int(current_ridership)
-    else:
-        raise ValueError(f"Station '{station_name}' not found in the data.")
-
-def plot_model_comparisons(df):
-    """
-    Plot comparisons of model performance metrics.
-    """
-    st.subheader("Model Performance Comparison")
-    
-    # RMSE Comparison
-    st.write("### Root Mean Squared Error (RMSE) Comparison")
-    fig, ax = plt.subplots()
-    ax.bar(df['Model'], df['RMSE'], color='skyblue')
-    ax.set_ylabel('RMSE')
-    ax.set_title('Root Mean Squared Error (RMSE) Comparison')
-    st.pyplot(fig)
-
-    # MAE Comparison
-    st.write("### Mean Absolute Error (MAE) Comparison")
-    fig, ax = plt.subplots()
-    ax.bar(df['Model'], df['MAE'], color='lightgreen')
-    ax.set_ylabel('MAE')
-    ax.set_title('Mean Absolute Error (MAE) Comparison')
-    st.pyplot(fig)
-
-    # R2_Score Comparison
-    st.write("### R² Score Comparison")
-    fig, ax = plt.subplots()
-    ax.bar(df['Model'], df['R2_Score'], color='salmon')  # Updated column name
-    ax.set_ylabel('R² Score')
-    ax.set_title('R² Score Comparison')
-    st.pyplot(fig)
-
 def display_home():
     st.markdown("<h1 style='text-align: center; color: #001f3f; font-size: 3rem; font-weight: 900;'>Delhi Metro Ridership Dashboard</h1>", unsafe_allow_html=True)
     st.markdown("<div style='text-align: center;'><span style='font-size: 1.8rem; color: #333; font-weight: 600;'>Advanced Analytics & Predictive Insights for Urban Transit Planning</span></div>", unsafe_allow_html=True)
     st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
     # --- Key Metrics Section ---
     st.markdown("### Key Metrics")
-    df = load_data()
-    total_stations = df.shape[0]
-    avg_daily_ridership = int(df['Daily_Ridership'].mean())
-    highest_ridership_station = df.loc[df['Daily_Ridership'].idxmax(), 'Station Names']
+    stats = get_statistics_store('stations')
+    total_stations = stats.rows
+    avg_daily_ridership = int(stats.mean('Daily_Ridership'))
+    highest_ridership_station = stats.top()[0][1]
     col1, col2, col3 = st.columns(3)
     with col1:
         st.markdown('<div class="metric-card blue-bg">🚇<br><span class="metric-number">{}</span><div class="metric-caption"><b>Total metro stations currently operational</b></div></div>'.format(total_stations), unsafe_allow_html=True)
@@ -318,20 +242,32 @@ with st.sidebar:
     )
 
 # Main content based on selection
-if selected == "Home":
-    display_home()
-elif selected == "Map Visualization":
-    from components.map_visualization import display_map
-    display_map()
-elif selected == "Data Insights":
-    from components.data_insights import show_data_insights
-    show_data_insights()
-elif selected == "Model Comparisons":
-    from components.model_comparisons import compare_models
-    compare_models()
-elif selected == "Real-Time Analysis":
-    from components.real_time_analysis import display_real_time_analysis
-    display_real_time_analysis()
-elif selected == "Scenario Simulations":
-    from components.scenario_simulations import run_scenario_simulation
-    run_scenario_simulation()
+with timer(PAGE_RENDER_SECONDS, page=selected):
+    if selected == "Home":
+        display_home()
+    elif selected == "Map Visualization":
+        from components.map_visualization import display_map
+        display_map()
+    elif selected == "Data Insights":
+        from components.data_insights import show_data_insights
+        show_data_insights()
+    elif selected == "Model Comparisons":
+        from components.model_comparisons import compare_models
+        compare_models()
+    elif selected == "Real-Time Analysis":
+        from components.real_time_analysis import display_real_time_analysis
+        display_real_time_analysis()
+    elif selected == "Scenario Simulations":
+        from components.scenario_simulations import run_scenario_simulation
+        run_scenario_simulation()
+
+ctx = get_script_run_ctx()
+if ctx is not None:
+    record_session(ctx.session_id, st.session_state.to_dict())
+
+if debug_panel_enabled():
+    display_debug_panel()
+
+# Load the other pages' modules, data and models in the background once the first page is drawn
+if warmup_enabled():
+    start_warmup()
@@ -0,0 +1 @@
+# This file initializes the benchmarks package, allowing the benchmark scripts to be run as modules.
\ No newline at end of file
@@ -0,0 +1,80 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from matplotlib._pylab_helpers import Gcf
+from utils.figure_rendering import FIGURE_CACHE_SIZE, clear_figure_cache, draw_figure
+from utils.ridership_cube import get_ridership_cube
+from utils.visualization_utils import draw_station_hourly_trends, plot_station_hourly_trends
+
+def rss_mb():
+    """Resident set size of this process in MiB (Linux)."""
+    with open('/proc/self/statm') as f:
+        pages = int(f.read().split()[1])
+    return pages * 4096 / 2**20
+
+def run(renders=2000, threads=8, max_growth_mb=10.0):
+    """
+    Render hourly-trend figures from many threads and check that memory stays flat.
+
+    Half of the renders bypass the cache with a distinct profile each time; the other
+    half go through the render_figure cache (via plot_station_hourly_trends) with more distinct keys than the cache holds, so
+    eviction is exercised too. The warm-up fills the cache, so any RSS growth after
+    it is a leak rather than cached images.
+    """
+    cube = get_ridership_cube()
+    stations = cube.stations
+    profiles = [cube.station_profile(station) for station in stations]
+
+    def render(i):
+        weekday, weekend = profiles[i % len(profiles)]
+        if i % 2:
+            # A distinct profile for every render, so nothing is served from memory
+            return len(draw_figure(draw_station_hourly_trends, weekday + i, weekend, station=stations[i % len(stations)]))
+        return len(plot_station_hourly_trends(weekday + i % (FIGURE_CACHE_SIZE * 2), weekend, stations[i % len(stations)]))
+
+    clear_figure_cache()
+    warmup = FIGURE_CACHE_SIZE * 2 + threads * 10
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(render, range(warmup)))
+        baseline = rss_mb()
+        start = time.perf_counter()
+        sizes = list(pool.map(render, range(warmup, warmup + renders)))
+        elapsed = time.perf_counter() - start
+    final = rss_mb()
+    return {
+        'renders': renders,
+        'threads': threads,
+        'elapsed_seconds': elapsed,
+        'renders_per_second': renders / elapsed,
+        'mean_image_bytes': float(np.mean(sizes)),
+        'rss_after_warmup_mb': baseline,
+        'rss_final_mb': final,
+        'rss_growth_mb': final - baseline,
+        'open_pyplot_figures': Gcf.get_num_fig_managers(),
+        'ok': final - baseline <= max_growth_mb and Gcf.get_num_fig_managers() == 0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that concurrent figure rendering does not leak memory (run from src).")
+    parser.add_argument('--renders', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--max-growth-mb', type=float, default=10.0, help="Fail if RSS grows more than this after warm-up.")
+    parser.add_argument('--json', action='store_true', help="Print the result as JSON.")
+    args = parser.parse_args()
+
+    result = run(args.renders, args.threads, args.max_growth_mb)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['renders']:,} renders on {result['threads']} threads in {result['elapsed_seconds']:.1f}s "
+              f"({result['renders_per_second']:.0f}/s); RSS {result['rss_after_warmup_mb']:.1f} -> "
+              f"{result['rss_final_mb']:.1f} MiB ({result['rss_growth_mb']:+.1f}); "
+              f"open pyplot figures: {result['open_pyplot_figures']}; {'OK' if result['ok'] else 'FAILED'}")
+    if not result['ok']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from utils.history import RidershipHistory
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run(stations=4096, days=365, max_growth_mb=64.0, path=None):
+    """
+    Aggregate a one-month slice and then the full history, and check that peak memory stays flat.
+
+    The history is generated in a subprocess (unless path is given) so that this
+    process's peak RSS reflects only the scans. The one-month scan sets the
+    baseline; the full scan reads days/31 times as many rows.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if path is None:
+            path = tmp_dir
+            subprocess.run([sys.executable, '-m', 'utils.synthetic_data', path, '--stations', str(stations),
+                            '--days', str(days), '--overwrite'], check=True, stdout=subprocess.DEVNULL)
+        history = RidershipHistory(path)
+        start = time.perf_counter()
+        pushed_down = history.aggregate(lines=['Yellow line'], start_date='2020-01-01', end_date='2020-01-31')
+        pushdown_seconds = time.perf_counter() - start
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        full = history.aggregate()
+        elapsed = time.perf_counter() - start
+        peak = peak_rss_mb()
+    return {
+        'rows': full.rows,
+        'elapsed_seconds': elapsed,
+        'rows_per_second': full.rows / elapsed,
+        'filtered_rows': pushed_down.rows,
+        'filtered_seconds': pushdown_seconds,
+        'peak_rss_filtered_mb': baseline,
+        'peak_rss_full_mb': peak,
+        'peak_rss_growth_mb': peak - baseline,
+        'ok': peak - baseline <= max_growth_mb
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that out-of-core history aggregation runs in bounded memory (run from src).")
+    parser.add_argument('--path', help="Existing history directory; a synthetic one is generated otherwise.")
+    parser.add_argument('--stations', type=int, default=4096)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--max-growth-mb', type=float, default=64.0, help="Fail if peak RSS grows more than this.")
+    parser.add_argument('--json', action='store_true', help="Print the result as JSON.")
+    args = parser.parse_args()
+
+    result = run(args.stations, args.days, args.max_growth_mb, args.path)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"Full scan: {result['rows']:,} rows in {result['elapsed_seconds']:.1f}s ({result['rows_per_second']:,.0f}/s); "
+              f"filtered scan: {result['filtered_rows']:,} rows in {result['filtered_seconds']:.2f}s")
+        print(f"Peak RSS {result['peak_rss_filtered_mb']:.0f} MiB after the filtered scan, "
+              f"{result['peak_rss_full_mb']:.0f} MiB after the full scan ({result['peak_rss_growth_mb']:+.1f}); "
+              f"{'OK' if result['ok'] else 'FAILED'}")
+    if not result['ok']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import json
+import sys
+import timeit
+import warnings
+import numpy as np
+import xgboost as xgb
+from utils.data_loader import load_dataset
+from utils.model_utils import FEATURE_COLUMNS, get_inference_engine, get_model
+
+def parity_rows(engine, n_random=20_000, seed=0):
+    """
+    Rows for the parity check: real stations, random values well outside their range,
+    and every folded split threshold together with the floats either side of it.
+    """
+    rng = np.random.default_rng(seed)
+    stations = load_dataset('stations', columns=FEATURE_COLUMNS).to_numpy(dtype=np.float64)
+    splits = np.isfinite(engine.threshold)
+    thresholds, features = engine.threshold[splits], engine.feature[splits]
+    edges = stations[rng.integers(0, len(stations), 3 * len(thresholds))]
+    for k, (threshold, feature) in enumerate(zip(thresholds, features)):
+        edges[3 * k:3 * k + 3, feature] = (np.nextafter(threshold, -np.inf), threshold, np.nextafter(threshold, np.inf))
+    low, high = stations.min(axis=0), stations.max(axis=0)
+    spread = high - low
+    random = rng.uniform(low - spread, high + spread, (n_random, len(FEATURE_COLUMNS)))
+    return np.vstack([stations, edges, random])
+
+def check_parity(n_random=20_000):
+    """
+    Compare the compiled engine with model.predict on the same raw feature rows.
+
+    Checks the leaf reached in every tree and the predictions themselves, through
+    both the NumPy traversal (small batches) and in-place predict (large batches).
+    """
+    engine = get_inference_engine()
+    model = get_model('xgboost')
+    X = parity_rows(engine, n_random)
+    expected_leaves = model.get_booster().predict(xgb.DMatrix(X, feature_names=FEATURE_COLUMNS), pred_leaf=True)
+    leaf_mismatches = int((engine.leaf_indices(X) - engine.roots != expected_leaves).sum())
+    expected = model.predict(X)
+    small = np.concatenate([engine.predict(X[i:i + 64]) for i in range(0, len(X), 64)])
+    large = engine.predict(X)
+    return {
+        'rows': len(X),
+        'leaf_mismatches': leaf_mismatches,
+        'max_abs_diff_numpy_traversal': float(np.abs(small - expected).max()),
+        'max_abs_diff_inplace_predict': float(np.abs(large - expected).max()),
+        'ok': leaf_mismatches == 0 and np.array_equal(small, expected) and np.array_equal(large, expected)
+    }
+
+def time_call(fn, min_seconds=0.5):
+    """Median seconds per call over five timing runs."""
+    number, elapsed = 1, 0.0
+    while True:
+        elapsed = timeit.timeit(fn, number=number)
+        if elapsed >= min_seconds / 5:
+            break
+        number *= 2
+    return float(np.median(timeit.repeat(fn, number=number, repeat=5)) / number)
+
+def run(batch_sizes=(1, 100_000)):
+    """Time the current serving path against the compiled engine at each batch size."""
+    engine = get_inference_engine()
+    model = get_model('xgboost')
+    stations = load_dataset('stations', columns=FEATURE_COLUMNS).to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(1)
+    results = []
+    for batch_size in batch_sizes:
+        X = stations[rng.integers(0, len(stations), batch_size)]
+        baseline = time_call(lambda: model.predict(X))
+        compiled = time_call(lambda: engine.predict(X))
+        results.append({
+            'batch_size': batch_size,
+            'sklearn_xgboost_seconds': baseline,
+            'compiled_seconds': compiled,
+            'speedup': baseline / compiled
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Check parity of the compiled XGBoost engine and benchmark it (run from src).")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100_000])
+    parser.add_argument('--json', action='store_true', help="Print the result as JSON.")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    result = {'parity': check_parity(), 'timings': run(args.batch_sizes)}
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        parity = result['parity']
+        print(f"Parity on {parity['rows']:,} rows: {'OK' if parity['ok'] else 'FAILED'} "
+              f"(leaf mismatches {parity['leaf_mismatches']}, max abs diff "
+              f"{parity['max_abs_diff_numpy_traversal']} / {parity['max_abs_diff_inplace_predict']})")
+        for timing in result['timings']:
+            print(f"batch {timing['batch_size']:>7,}: model.predict {timing['sklearn_xgboost_seconds'] * 1000:9.3f} ms  "
+                  f"compiled {timing['compiled_seconds'] * 1000:9.3f} ms  ({timing['speedup']:.1f}x)")
+    if not result['parity']['ok']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
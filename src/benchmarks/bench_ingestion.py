@@ -0,0 +1,45 @@
+import argparse
+import itertools
+import json
+import time
+from utils.ingestion import TapCounter, synthetic_events
+from utils.ridership_cube import get_ridership_cube
+
+def run(n_events, batch_size):
+    """Time TapCounter ingestion of pre-generated synthetic events on one core."""
+    cube = get_ridership_cube()
+    weekday = cube.counts[:, 0]
+    source = synthetic_events(weekday.sum(axis=1), hourly_weights=weekday, batch_size=batch_size)
+    batches = list(itertools.islice(source, max(1, n_events // batch_size)))
+    counter = TapCounter(cube.station_names)
+
+    start = time.perf_counter()
+    for timestamps, station_ids, directions in batches:
+        counter.ingest(timestamps, station_ids, directions)
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(batch[0]) for batch in batches)
+    assert counter.events == total
+    return {
+        'events': total,
+        'batch_size': batch_size,
+        'elapsed_seconds': elapsed,
+        'events_per_second': total / elapsed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tap-event ingestion throughput.")
+    parser.add_argument('--events', type=int, default=5_000_000)
+    parser.add_argument('--batch-size', type=int, default=65536)
+    parser.add_argument('--json', action='store_true', help="Print the result as JSON.")
+    args = parser.parse_args()
+
+    result = run(args.events, args.batch_size)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"Ingested {result['events']:,} events in {result['elapsed_seconds']:.2f}s "
+          f"({result['events_per_second']:,.0f} events/s, batch size {args.batch_size})")
+
+if __name__ == "__main__":
+    main()
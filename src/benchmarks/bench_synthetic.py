@@ -0,0 +1,61 @@
+import argparse
+import json
+import resource
+import sys
+import tempfile
+import time
+from utils.data_loader import load_dataset
+from utils.synthetic_data import generate
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run(stations=4096, days=120, max_growth_mb=32.0):
+    """
+    Generate a small and a large synthetic dataset and check that peak memory stays flat.
+
+    The small run (one station block, one month) sets the peak RSS; the large run
+    covers stations x days times more rows, so any growth of the peak beyond
+    max_growth_mb means memory scales with the dataset.
+    """
+    template = load_dataset('stations')
+    with tempfile.TemporaryDirectory() as small_dir, tempfile.TemporaryDirectory() as large_dir:
+        small = generate(small_dir, 1024, 31, template=template)
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        large = generate(large_dir, stations, days, template=template)
+        elapsed = time.perf_counter() - start
+        peak = peak_rss_mb()
+    return {
+        'small_rows': small['hourly_rows'],
+        'large_rows': large['hourly_rows'],
+        'elapsed_seconds': elapsed,
+        'rows_per_second': large['hourly_rows'] / elapsed,
+        'peak_rss_small_mb': baseline,
+        'peak_rss_large_mb': peak,
+        'peak_rss_growth_mb': peak - baseline,
+        'ok': peak - baseline <= max_growth_mb
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that synthetic dataset generation runs in constant memory (run from src).")
+    parser.add_argument('--stations', type=int, default=4096)
+    parser.add_argument('--days', type=int, default=120)
+    parser.add_argument('--max-growth-mb', type=float, default=32.0, help="Fail if peak RSS grows more than this.")
+    parser.add_argument('--json', action='store_true', help="Print the result as JSON.")
+    args = parser.parse_args()
+
+    result = run(args.stations, args.days, args.max_growth_mb)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['large_rows']:,} rows in {result['elapsed_seconds']:.1f}s ({result['rows_per_second']:,.0f}/s); "
+              f"peak RSS {result['peak_rss_small_mb']:.0f} MiB after {result['small_rows']:,} rows, "
+              f"{result['peak_rss_large_mb']:.0f} MiB after {result['large_rows']:,} "
+              f"({result['peak_rss_growth_mb']:+.1f}); {'OK' if result['ok'] else 'FAILED'}")
+    if not result['ok']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+from utils.model_utils import FEATURE_COLUMNS
+from utils.data_loader import load_dataset
+
+def sample_rows(n_rows, seed=42):
+    """Sample feature rows from the real station table, jittered so requests differ."""
+    stations = load_dataset('stations', columns=FEATURE_COLUMNS).to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    rows = stations[rng.integers(0, len(stations), n_rows)]
+    rows[:, 2] += rng.normal(0, 1.0, n_rows)  # Distance from first station
+    rows[:, 2] = np.clip(rows[:, 2], 0, None)
+    return rows
+
+async def run_load(url, n_requests, concurrency, rows_per_request):
+    """Fire n_requests at the service with the given concurrency and collect latencies."""
+    AsyncHTTPClient.configure(None, max_clients=concurrency)
+    client = AsyncHTTPClient()
+    rows = sample_rows(n_requests * rows_per_request)
+    bodies = [
+        json.dumps({'features': rows[i * rows_per_request:(i + 1) * rows_per_request].tolist()})
+        for i in range(n_requests)
+    ]
+    latencies = []
+    errors = 0
+    next_request = 0
+
+    async def worker():
+        nonlocal next_request, errors
+        while next_request < n_requests:
+            body = bodies[next_request]
+            next_request += 1
+            start = time.perf_counter()
+            try:
+                await client.fetch(url, method='POST', body=body, headers={'Content-Type': 'application/json'})
+                latencies.append(time.perf_counter() - start)
+            except (HTTPClientError, OSError):
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    return np.array(latencies), errors, elapsed
+
+def report(latencies, errors, elapsed, rows_per_request):
+    """Summarise a load run as throughput and latency percentiles."""
+    completed = len(latencies)
+    return {
+        'requests': completed,
+        'errors': errors,
+        'elapsed_seconds': elapsed,
+        'requests_per_second': completed / elapsed if elapsed else 0.0,
+        'rows_per_second': completed * rows_per_request / elapsed if elapsed else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000) if completed else None,
+        'p99_ms': float(np.percentile(latencies, 99) * 1000) if completed else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the prediction service.")
+    parser.add_argument('--url', default='http://127.0.0.1:8600/predict')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--rows-per-request', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    latencies, errors, elapsed = asyncio.run(run_load(args.url, args.requests, args.concurrency, args.rows_per_request))
+    result = report(latencies, errors, elapsed, args.rows_per_request)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"Requests:    {result['requests']} ok, {result['errors']} failed in {elapsed:.2f}s")
+    print(f"Throughput:  {result['requests_per_second']:.0f} req/s ({result['rows_per_second']:.0f} rows/s)")
+    if result['requests']:
+        print(f"Latency:     p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms")
+
+if __name__ == "__main__":
+    main()
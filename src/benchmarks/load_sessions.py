@@ -0,0 +1,198 @@
+import argparse
+import json
+import random
+import resource
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import numpy as np
+from benchmarks.suite import PAGES
+
+# Session state key the patched navigation menu reads the page to show from
+PAGE_KEY = '_load_test_page'
+
+def rss_mb():
+    """Resident set size of this process in MiB (Linux)."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def navigation_menu(*args, **kwargs):
+    """Stand-in for option_menu: the page the driving session asked for."""
+    import streamlit as st
+    return st.session_state.get(PAGE_KEY, kwargs.get('options', PAGES)[0])
+
+class SharedRuntime:
+    """
+    Give every AppTest session the same runtime, as a real server does.
+
+    AppTest installs a fresh mock Runtime singleton for each run and clears it when
+    the run ends, which breaks other sessions running at the same time. While this
+    context is active the AppTest module sees a private class instead, so its
+    assignments are harmless. All sessions then share one media file manager, one
+    st.cache_data store and one compiled-script cache (compiling the script from
+    several threads at once trips a CPython 3.11 parser bug).
+    """
+
+    def __enter__(self):
+        from streamlit.runtime import Runtime
+        from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+        from streamlit.runtime.media_file_manager import MediaFileManager
+        from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+        from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+        self.runtime = mock.MagicMock(spec=Runtime)
+        self.runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage('/mock/media'))
+        self.runtime.cache_storage_manager = MemoryCacheStorageManager()
+        self.script_cache = ScriptCache()
+        self.saved = Runtime._instance
+        Runtime._instance = self.runtime
+        self.patches = [
+            mock.patch('streamlit.testing.v1.app_test.Runtime', type('Runtime', (), {'_instance': None})),
+            mock.patch('streamlit.testing.v1.app_test.ScriptCache', lambda: self.script_cache),
+            mock.patch('streamlit.testing.v1.local_script_runner.ScriptCache', lambda: self.script_cache),
+            mock.patch('streamlit_option_menu.option_menu', navigation_menu)
+        ]
+        for patch in self.patches:
+            patch.start()
+        return self
+
+    def __exit__(self, *exc):
+        from streamlit.runtime import Runtime
+        for patch in reversed(self.patches):
+            patch.stop()
+        Runtime._instance = self.saved
+
+def interact(at, page, rng):
+    """Reruns a user would trigger after opening a page, as (action, rerun function) pairs."""
+    if page == "Real-Time Analysis" and at.selectbox:
+        station = rng.choice(at.selectbox[0].options)
+        yield 'select station', lambda: at.selectbox[0].set_value(station).run()
+    elif page == "Scenario Simulations" and at.button:
+        yield 'simulate', lambda: at.button[0].click().run()
+
+class Session:
+    """One simulated user: an AppTest instance visiting pages in a random order."""
+
+    def __init__(self, session_id, seed, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.session_id = session_id
+        self.rng = random.Random(seed)
+        self.at = AppTest.from_file('app.py', default_timeout=timeout)
+        self.samples = []
+        self.errors = []
+
+    def rerun(self, page, action, fn):
+        start = time.perf_counter()
+        try:
+            fn()
+            failed = bool(self.at.exception)
+            if failed:
+                self.errors.append(f"{page} ({action}): {self.at.exception[0].value}")
+        except Exception as e:  # A timed-out or crashed rerun is a result, not a harness failure
+            failed = True
+            self.errors.append(f"{page} ({action}): {type(e).__name__}: {e}")
+        self.samples.append((page, action, time.perf_counter() - start, failed))
+
+    def run_round(self, pages):
+        for page in self.rng.sample(pages, len(pages)):
+            self.at.session_state[PAGE_KEY] = page
+            self.rerun(page, 'open', self.at.run)
+            for action, fn in interact(self.at, page, self.rng):
+                self.rerun(page, action, fn)
+
+def percentiles(latencies):
+    latencies = np.asarray(latencies)
+    if len(latencies) == 0:
+        return {'count': 0}
+    return {
+        'count': len(latencies),
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+        'max_ms': float(latencies.max() * 1000)
+    }
+
+def run(n_sessions=8, rounds=3, pages=PAGES, seed=0, timeout=300):
+    """
+    Drive n_sessions concurrent AppTest sessions through every page for a number of rounds.
+
+    One warm-up session first visits every page so that process-wide caches are
+    loaded, making the baseline RSS. Per-session memory is the RSS added by the live
+    sessions divided by their number; growth per round is the RSS change from the
+    end of the first round to the end of the last, per session and round, which
+    should be close to zero when nothing leaks.
+    """
+    warnings.filterwarnings('ignore')
+    with SharedRuntime():
+        warmup = Session('warmup', seed, timeout)
+        warmup.run_round(list(pages))
+        del warmup
+        baseline = rss_mb()
+
+        sessions = [Session(i, seed + i + 1, timeout) for i in range(n_sessions)]
+        round_rss = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n_sessions) as pool:
+            for _ in range(rounds):
+                list(pool.map(lambda session: session.run_round(list(pages)), sessions))
+                round_rss.append(rss_mb())
+        elapsed = time.perf_counter() - start
+
+    samples = [sample for session in sessions for sample in session.samples]
+    by_page = {}
+    for page, _, latency, _ in samples:
+        by_page.setdefault(page, []).append(latency)
+    errors = [error for session in sessions for error in session.errors]
+    return {
+        'sessions': n_sessions,
+        'rounds': rounds,
+        'reruns': len(samples),
+        'failed_reruns': sum(failed for *_, failed in samples),
+        'elapsed_seconds': elapsed,
+        'reruns_per_second': len(samples) / elapsed,
+        'latency': percentiles([latency for _, _, latency, _ in samples]),
+        'latency_by_page': {page: percentiles(latencies) for page, latencies in by_page.items()},
+        'rss_baseline_mb': baseline,
+        'rss_final_mb': round_rss[-1],
+        'rss_peak_mb': peak_rss_mb(),
+        'rss_per_session_mb': (round_rss[-1] - baseline) / n_sessions,
+        'rss_growth_per_session_round_mb': (round_rss[-1] - round_rss[0]) / n_sessions / max(rounds - 1, 1),
+        'errors': errors[:20]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent AppTest sessions (run from src).")
+    parser.add_argument('--sessions', type=int, default=8, help="Concurrent sessions.")
+    parser.add_argument('--rounds', type=int, default=3, help="Visits of every page per session.")
+    parser.add_argument('--pages', nargs='+', choices=PAGES, default=PAGES, metavar='PAGE')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=300, help="Seconds before a single rerun is failed.")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    result = run(args.sessions, args.rounds, args.pages, args.seed, args.timeout)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        latency = result['latency']
+        print(f"Sessions:    {result['sessions']} x {result['rounds']} rounds, {result['reruns']} reruns "
+              f"({result['failed_reruns']} failed) in {result['elapsed_seconds']:.1f}s")
+        print(f"Latency:     p50 {latency['p50_ms']:.0f} ms, p95 {latency['p95_ms']:.0f} ms, p99 {latency['p99_ms']:.0f} ms")
+        for page, stats in result['latency_by_page'].items():
+            print(f"  {page:22s} p50 {stats['p50_ms']:7.0f}  p95 {stats['p95_ms']:7.0f}  p99 {stats['p99_ms']:7.0f} ms  (n={stats['count']})")
+        print(f"Memory:      baseline {result['rss_baseline_mb']:.0f} MiB, final {result['rss_final_mb']:.0f} MiB, "
+              f"peak {result['rss_peak_mb']:.0f} MiB")
+        print(f"             {result['rss_per_session_mb']:.1f} MiB per session, "
+              f"{result['rss_growth_per_session_round_mb']:+.2f} MiB per session per round after the first")
+        for error in result['errors']:
+            print(f"Error:       {error}")
+    if result['failed_reruns']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
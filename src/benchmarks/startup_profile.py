@@ -0,0 +1,97 @@
+import argparse
+import json
+import subprocess
+import sys
+from benchmarks.suite import PAGES
+
+# Printed to stderr just before the first render, so only the page's own imports are attributed to it
+RENDER_MARKER = '--- first render ---'
+
+# Renders one page twice in a fresh interpreter and prints the two render times as JSON
+RENDER_SCRIPT = f"""
+import json, sys, time
+from unittest import mock
+from streamlit.testing.v1 import AppTest
+page = sys.argv[1]
+with mock.patch('streamlit_option_menu.option_menu', return_value=page):
+    at = AppTest.from_file('app.py', default_timeout=120)
+    print({RENDER_MARKER!r}, file=sys.stderr, flush=True)
+    start = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    at.run()
+    second = time.perf_counter() - start
+print(json.dumps({{'first': first, 'second': second, 'exception': str(at.exception[0].value) if at.exception else None}}))
+"""
+
+def parse_importtime(lines):
+    """(module, depth, self_seconds, cumulative_seconds) for each line of -X importtime output."""
+    imports = []
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), depth, int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return imports
+
+def profile_page(page, top=15):
+    """
+    Cold-start profile of one page: first and second render times and the imports made by the first.
+
+    The page is rendered in a new interpreter with -X importtime. Imports made
+    before the render (Streamlit itself and the test harness) are left out.
+    Modules are reported by cumulative time, which includes their own imports;
+    'top_level' are the ones the app and its pages import directly.
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', RENDER_SCRIPT, page],
+                             capture_output=True, text=True, check=True)
+    stderr = process.stderr.splitlines()
+    imports = parse_importtime(stderr[stderr.index(RENDER_MARKER) + 1:]) if RENDER_MARKER in stderr else []
+    timings = json.loads(process.stdout.strip().splitlines()[-1])
+    top_level = [(name, cumulative) for name, depth, _, cumulative in imports if depth == 0]
+    return {
+        'page': page,
+        'first_render_seconds': timings['first'],
+        'second_render_seconds': timings['second'],
+        'exception': timings['exception'],
+        'import_seconds': sum(cumulative for _, cumulative in top_level),
+        'modules_imported': len(imports),
+        'top_level': sorted(top_level, key=lambda item: -item[1])[:top],
+        'slowest': [(name, cumulative) for name, _, _, cumulative in sorted(imports, key=lambda item: -item[3])[:top]]
+    }
+
+def run(pages=('Home',), top=15, max_home_seconds=None):
+    results = [profile_page(page, top) for page in pages]
+    home = next((result for result in results if result['page'] == 'Home'), None)
+    ok = all(result['exception'] is None for result in results)
+    if max_home_seconds is not None and home is not None:
+        ok = ok and home['first_render_seconds'] <= max_home_seconds
+    return {'pages': results, 'ok': ok}
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the cold start of dashboard pages: render time and time per import (run from src).")
+    parser.add_argument('pages', nargs='*', default=['Home'], help="Pages to profile (default: Home); 'all' for every page.")
+    parser.add_argument('--top', type=int, default=15, help="Modules to list per page.")
+    parser.add_argument('--max-home-seconds', type=float, help="Fail if the first Home render takes longer.")
+    parser.add_argument('--json', action='store_true', help="Print the result as JSON.")
+    args = parser.parse_args()
+
+    pages = PAGES if args.pages == ['all'] else args.pages
+    result = run(pages, args.top, args.max_home_seconds)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for page in result['pages']:
+            print(f"{page['page']}: first render {page['first_render_seconds']:.3f}s, second {page['second_render_seconds']:.3f}s, "
+                  f"{page['modules_imported']} modules imported in {page['import_seconds']:.3f}s")
+            if page['exception']:
+                print(f"  raised: {page['exception']}")
+            for name, seconds in page['top_level']:
+                print(f"  {seconds * 1000:8.1f} ms  {name}")
+    if not result['ok']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
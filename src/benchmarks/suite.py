@@ -0,0 +1,350 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+from unittest import mock
+import numpy as np
+
+THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), 'thresholds.json')
+
+PAGES = ["Home", "Map Visualization", "Data Insights", "Model Comparisons", "Real-Time Analysis", "Scenario Simulations"]
+
+BENCHMARKS = {}
+
+def benchmark(name, group):
+    """
+    Register a benchmark factory under name and group.
+
+    The factory does any setup and returns (fn, options): the zero-argument function
+    to time and keyword arguments for measure().
+    """
+    def register(fn):
+        BENCHMARKS[name] = (group, fn)
+        return fn
+    return register
+
+def measure(fn, repeat=20, number=1):
+    """Time fn() and return summary statistics in seconds per call."""
+    fn()  # Warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    samples.sort()
+    return {
+        'median': statistics.median(samples),
+        'min': samples[0],
+        'p95': samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        'repeat': repeat,
+        'number': number
+    }
+
+# --- Data loading ---
+
+@benchmark('data.load_table.stations.cold', 'data')
+def bench_load_stations_cold():
+    from utils import data_loader
+
+    def run():
+        data_loader._tables.clear()
+        data_loader.load_table('stations')
+    return run, {'repeat': 10}
+
+@benchmark('data.load_dataset.stations', 'data')
+def bench_load_stations():
+    from utils.data_loader import load_dataset
+    return lambda: load_dataset('stations'), {'repeat': 50}
+
+@benchmark('data.load_dataset.hourly', 'data')
+def bench_load_hourly():
+    from utils.data_loader import load_dataset
+    return lambda: load_dataset('hourly'), {'repeat': 50}
+
+@benchmark('data.read_csv.stations', 'data')
+def bench_read_csv_stations():
+    import pandas as pd
+    from utils.data_loader import csv_path
+    return lambda: pd.read_csv(csv_path('stations')), {'repeat': 20}
+
+# --- Prediction ---
+
+def _feature_rows(n_rows):
+    from utils.data_loader import load_dataset
+    from utils.model_utils import FEATURE_COLUMNS
+    stations = load_dataset('stations', columns=FEATURE_COLUMNS).to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(0)
+    return stations[rng.integers(0, len(stations), n_rows)]
+
+def _register_model_benchmarks():
+    for model_name in ('xgboost', 'linear_regression', 'ensemble'):
+        for label, n_rows, repeat in (('single', 1, 200), ('batch_10k', 10_000, 10)):
+            def factory(model_name=model_name, n_rows=n_rows, repeat=repeat):
+                import pandas as pd
+                from utils.model_utils import FEATURE_COLUMNS, get_model
+                model = get_model(model_name)
+                # The models were fitted on a DataFrame, so predict on one to match
+                features = pd.DataFrame(_feature_rows(n_rows), columns=FEATURE_COLUMNS)
+                return lambda: model.predict(features), {'repeat': repeat}
+            benchmark(f'predict.{model_name}.{label}', 'predict')(factory)
+
+_register_model_benchmarks()
+
+@benchmark('predict.serving_pipeline.single', 'predict')
+def bench_pipeline_single():
+    from utils.model_utils import predict_ridership_batch
+    features = _feature_rows(1)
+    return lambda: predict_ridership_batch(features), {'repeat': 200}
+
+@benchmark('predict.serving_pipeline.batch_10k', 'predict')
+def bench_pipeline_batch():
+    from utils.model_utils import predict_ridership_batch
+    features = _feature_rows(10_000)
+    return lambda: predict_ridership_batch(features), {'repeat': 10}
+
+@benchmark('predict.serving_pipeline.batch_100k', 'predict')
+def bench_pipeline_batch_100k():
+    from utils.model_utils import predict_ridership_batch
+    features = _feature_rows(100_000)
+    return lambda: predict_ridership_batch(features), {'repeat': 5}
+
+@benchmark('predict.simulate_ridership.cached', 'predict')
+def bench_simulate_cached():
+    from utils.prediction_cache import PredictionCache
+    cache = PredictionCache(use_surface=False)
+    row = _feature_rows(1)[0].tolist()
+    cache.predict_one(*row)
+    return lambda: cache.predict_one(*row), {'repeat': 20, 'number': 1000}
+
+@benchmark('predict.prediction_interval', 'predict')
+def bench_prediction_interval():
+    from utils.conformal import calibrate, get_calibration
+    # Falls back to an in-memory table when none is saved, so the lookup is still timed with its version check
+    fallback = calibrate()
+    return lambda: (get_calibration() or fallback).interval(5000.0), {'repeat': 20, 'number': 1000}
+
+@benchmark('predict.prediction_surface.lookup', 'predict')
+def bench_surface_lookup():
+    from utils.prediction_cache import quantize
+    from utils.prediction_surface import precompute_surface
+    surface = precompute_surface(grid_points=11)
+    key = quantize(_feature_rows(1)[0])
+    return lambda: surface.lookup(key), {'repeat': 20, 'number': 1000}
+
+# --- Map ---
+
+@benchmark('map.build_and_render.uncached', 'map')
+def bench_build_map_uncached():
+    from utils import map_builder
+    from utils.data_loader import load_dataset
+    df = load_dataset('stations')
+
+    def run():
+        # Regenerate every layer from scratch, bypassing the memory and disk caches
+        layers = {
+            layer: (map_builder.layer_hash(df, layer), builder(df))
+            for layer, builder in map_builder.LAYER_BUILDERS.items()
+        }
+        map_builder._assemble_map(layers, None).get_root().render()
+    return run, {'repeat': 5}
+
+@benchmark('map.create_map', 'map')
+def bench_create_map():
+    from utils.map_builder import create_map
+    from utils.data_loader import load_dataset
+    df = load_dataset('stations')
+    return lambda: create_map(df).get_root().render(), {'repeat': 10}
+
+@benchmark('map.render_map_html.cached', 'map')
+def bench_render_map_cached():
+    from utils.map_builder import render_map_html
+    from utils.data_loader import load_dataset
+    df = load_dataset('stations')
+    return lambda: render_map_html(df), {'repeat': 50}
+
+# --- Hourly ridership lookups ---
+
+@benchmark('hourly.cube.lookup', 'hourly')
+def bench_cube_lookup():
+    from utils.ridership_cube import get_ridership_cube
+    cube = get_ridership_cube()
+    names = cube.stations
+    return lambda: [cube.lookup(name, 0, 8) for name in names], {'repeat': 50}
+
+@benchmark('hourly.dataframe.lookup', 'hourly')
+def bench_dataframe_lookup():
+    from utils.data_loader import load_dataset
+    df = load_dataset('hourly')
+    names = sorted(df['Station_Name'].unique())
+    return lambda: [df[df['Station_Name'] == name].iloc[0]['Weekday_8'] for name in names], {'repeat': 5}
+
+@benchmark('hourly.cube.top_stations', 'hourly')
+def bench_top_stations():
+    from utils.ridership_cube import get_ridership_cube
+    cube = get_ridership_cube()
+    return lambda: cube.top_stations(8, 0, 10), {'repeat': 100}
+
+@benchmark('hourly.forecast.refresh_7d', 'hourly')
+def bench_forecast_refresh():
+    from utils.forecasting import HourlyForecaster
+    from utils.ridership_cube import get_ridership_cube
+    forecaster = HourlyForecaster.from_cube(get_ridership_cube())
+    hours = iter(range(10**9))
+    # A new start hour every call, so the table is recomputed rather than served from cache
+    return lambda: forecaster.forecast_table(480_000 + next(hours), 7), {'repeat': 100}
+
+@benchmark('hourly.forecast.update', 'hourly')
+def bench_forecast_update():
+    from utils.forecasting import HourlyForecaster
+    from utils.ridership_cube import get_ridership_cube
+    cube = get_ridership_cube()
+    forecaster = HourlyForecaster.from_cube(cube)
+    observed = cube.counts[:, 0, 8].astype(np.float64)
+    hours = iter(range(10**9))
+    return lambda: forecaster.update(480_000 + next(hours), observed), {'repeat': 100}
+
+@benchmark('ingestion.tap_counter.1m_events', 'hourly')
+def bench_ingestion():
+    from benchmarks.bench_ingestion import run
+    return lambda: run(1_000_000, 65536), {'repeat': 5}
+
+# --- Network routing ---
+
+@benchmark('network.all_pairs.compute', 'network')
+def bench_all_pairs():
+    from utils.network_graph import MetroNetwork, NETWORK_COLUMNS
+    from utils.data_loader import load_table
+    network = MetroNetwork.from_stations(load_table('stations', columns=NETWORK_COLUMNS).to_pandas())
+    return network.compute_all_pairs, {'repeat': 10}
+
+@benchmark('network.shortest_path', 'network')
+def bench_shortest_path():
+    from utils.network_graph import get_network
+    network = get_network()
+    return lambda: network.shortest_path('Rajiv Chowk', 'Kashmere Gate'), {'repeat': 100}
+
+# --- Statistics store ---
+
+@benchmark('statistics.read_home_metrics', 'statistics')
+def bench_statistics_read():
+    from utils.statistics_store import get_statistics_store
+
+    def run():
+        stats = get_statistics_store('stations')
+        return stats.rows, stats.mean('Daily_Ridership'), stats.top()[0], stats.quantile('Daily_Ridership', 0.33)
+    return run, {'repeat': 200}
+
+@benchmark('statistics.append_1k_rows', 'statistics')
+def bench_statistics_append():
+    from utils.data_loader import load_table
+    from utils.statistics_store import StatisticsStore
+    table = load_table('stations')
+    rows = table.take(np.arange(1000) % table.num_rows)
+    store = StatisticsStore('Daily_Ridership', 'Station Names')
+    return lambda: store.append(rows), {'repeat': 50}
+
+# --- Spatial index ---
+
+def _spatial_index_100k():
+    from utils.spatial_index import SpatialIndex
+    rng = np.random.default_rng(0)
+    return SpatialIndex(rng.uniform(28.4, 28.9, 100_000), rng.uniform(76.8, 77.6, 100_000)), rng
+
+@benchmark('spatial.nearest_k5.100k_points', 'spatial')
+def bench_spatial_nearest():
+    index, rng = _spatial_index_100k()
+    return lambda: index.nearest(rng.uniform(28.4, 28.9), rng.uniform(76.8, 77.6), 5), {'repeat': 200}
+
+@benchmark('spatial.radius_1km.100k_points', 'spatial')
+def bench_spatial_radius():
+    index, rng = _spatial_index_100k()
+    return lambda: index.within_radius(rng.uniform(28.4, 28.9), rng.uniform(76.8, 77.6), 1.0), {'repeat': 200}
+
+@benchmark('spatial.bbox.100k_points', 'spatial')
+def bench_spatial_bbox():
+    index, rng = _spatial_index_100k()
+
+    def run():
+        south, west = rng.uniform(28.4, 28.85), rng.uniform(76.8, 77.55)
+        return index.bbox(south, west, south + 0.05, west + 0.05)
+    return run, {'repeat': 200}
+
+# --- Page rendering ---
+
+def _register_page_benchmarks():
+    for page in PAGES:
+        def factory(page=page):
+            from streamlit.testing.v1 import AppTest
+
+            def run():
+                with mock.patch('streamlit_option_menu.option_menu', return_value=page):
+                    at = AppTest.from_file('app.py', default_timeout=120)
+                    at.run()
+                if at.exception:
+                    raise RuntimeError(f"Page '{page}' raised: {at.exception[0].value}")
+            return run, {'repeat': 5}
+        benchmark(f"page.{page.lower().replace(' ', '_').replace('-', '_')}", 'page')(factory)
+
+_register_page_benchmarks()
+
+def run_benchmarks(selected=None):
+    """Run the selected benchmarks (all by default) and return their results."""
+    results = {}
+    for name, (group, factory) in BENCHMARKS.items():
+        if selected and not any(name.startswith(prefix) or group == prefix for prefix in selected):
+            continue
+        fn, options = factory()
+        results[name] = dict(measure(fn, **options), group=group)
+        print(f"{name:45s} median {results[name]['median'] * 1000:10.3f} ms", file=sys.stderr)
+    return results
+
+def check_thresholds(results, thresholds):
+    """Return the benchmarks whose median exceeds its threshold (seconds)."""
+    failures = []
+    for name, result in results.items():
+        limit = thresholds.get(name)
+        if limit is not None and result['median'] > limit:
+            failures.append({'benchmark': name, 'median': result['median'], 'threshold': limit})
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the performance benchmark suite (from the src directory).")
+    parser.add_argument('benchmarks', nargs='*', help="Benchmark name prefixes or groups to run (default: all).")
+    parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+    parser.add_argument('--thresholds', default=THRESHOLDS_FILE, help="JSON file of maximum median seconds per benchmark.")
+    parser.add_argument('--no-check', action='store_true', help="Do not fail on threshold regressions.")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    results = run_benchmarks(args.benchmarks)
+    thresholds = {}
+    if os.path.exists(args.thresholds):
+        with open(args.thresholds, 'r', encoding='utf-8') as f:
+            thresholds = json.load(f)
+    failures = check_thresholds(results, thresholds)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'results': results,
+        'regressions': failures
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    for failure in failures:
+        print(f"REGRESSION {failure['benchmark']}: median {failure['median'] * 1000:.3f} ms "
+              f"exceeds threshold {failure['threshold'] * 1000:.3f} ms", file=sys.stderr)
+    if failures and not args.no_check:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
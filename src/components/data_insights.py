@@ -1,13 +1,13 @@
 import os
-import pandas as pd
 import streamlit as st
+from utils.data_loader import load_dataset
+from utils.history import RidershipHistory, get_history_aggregates, history_available
+from utils.statistics_store import get_statistics_store
+from utils.image_assets import graph_title, image_variant, list_images
 
 def load_data():
     """Load the dataset."""
-    df = pd.read_csv(os.path.join('data', 'delhi_metro_final.csv'))
-    if 'Unnamed: 0' in df.columns:
-        df = df.drop(columns=['Unnamed: 0'])
-    return df
+    return load_dataset('stations')
 
 def display_overview(df):
     """Display an overview of the dataset."""
@@ -26,8 +26,36 @@ def display_overview(df):
     st.dataframe(df.head())
 
     st.markdown("#### 📈 Summary Statistics")
-    st.dataframe(df.describe())
+    st.dataframe(get_statistics_store('stations').describe())
 
+def display_history():
+    """Summary statistics and hourly curves of the partitioned ridership history, scanned out of core."""
+    from utils.visualization_utils import plot_hourly_ridership_patterns
+    st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
+    st.markdown("## 🗄️ Ridership History")
+    st.markdown(
+        """
+        <p style='font-size: 1.4rem; color: #333; margin-bottom: 1.5em;'>
+           Hourly ridership across the full history. Filters are applied while scanning, so only matching data is read.
+        </p>
+        """,
+        unsafe_allow_html=True
+    )
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+    lines = col1.multiselect("Metro lines", RidershipHistory().lines(), placeholder="All lines", key="history_lines")
+    station_text = col2.text_input("Stations (comma-separated)", key="history_stations")
+    start_date = col3.date_input("From", value=None, key="history_start")
+    end_date = col4.date_input("To", value=None, key="history_end")
+    stations = [name.strip() for name in station_text.split(',') if name.strip()]
+
+    with st.spinner("Scanning ridership history..."):
+        aggregates = get_history_aggregates(stations or None, lines or None, start_date, end_date)
+    if aggregates.rows == 0:
+        st.info("No ridership history matches these filters.")
+        return
+    st.markdown(f"#### 📈 Hourly Ridership Statistics ({aggregates.rows:,} rows)")
+    st.dataframe(aggregates.summary())
+    st.image(plot_hourly_ridership_patterns(aggregates.hourly_curves()), use_container_width=True)
 
 def display_analysis_graphs():
     """Display all graphs from the data_analysis_graphs directory."""
@@ -42,12 +70,16 @@ def display_analysis_graphs():
         unsafe_allow_html=True
     )
 
-    graphs_dir = os.path.join('assets', 'data_analysis_graphs')
-    graph_files = sorted([f for f in os.listdir(graphs_dir) if f.endswith('.png')])
+    graph_paths = list_images(os.path.join('assets', 'data_analysis_graphs'))
 
-    # Display images one per row
-    for graph_file in graph_files:
-        st.image(os.path.join(graphs_dir, graph_file), use_container_width=True)
+    # Thumbnails first; the full-resolution variants are only sent when asked for
+    if st.toggle("Show full-resolution graphs", key='data_insights_full_graphs'):
+        for path in graph_paths:
+            st.image(image_variant(path, 'full'), caption=graph_title(path), use_container_width=True)
+        return
+    for row_start in range(0, len(graph_paths), 2):
+        for column, path in zip(st.columns(2), graph_paths[row_start:row_start + 2]):
+            column.image(image_variant(path, 'thumbnail'), caption=graph_title(path), use_container_width=True)
 
 def show_data_insights():
     """Main function to display data insights."""
@@ -70,6 +102,8 @@ def show_data_insights():
     )
     df = load_data()
     display_overview(df)
+    if history_available():
+        display_history()
     display_analysis_graphs()
 
 if __name__ == "__main__":
@@ -0,0 +1,46 @@
+import os
+import streamlit as st
+from utils.instrumentation import metrics_server_error, metrics_summary, start_metrics_server
+
+def debug_panel_enabled():
+    """The panel is shown with METRO_DEBUG_PANEL=1 or a ?debug=1 query parameter."""
+    return os.environ.get('METRO_DEBUG_PANEL') == '1' or st.query_params.get('debug') == '1'
+
+def display_debug_panel():
+    """
+    Show the same timings, cache hit ratios and session figures that are exported
+    on the Prometheus metrics endpoint.
+    """
+    import pandas as pd
+    summary = metrics_summary()
+    with st.expander("🛠️ Debug: Performance Metrics", expanded=False):
+        port = start_metrics_server()
+        if port:
+            st.caption(f"Prometheus metrics: http://127.0.0.1:{port}/metrics")
+        elif metrics_server_error() is not None:
+            st.caption(f"Prometheus metrics endpoint unavailable: {metrics_server_error()}")
+
+        timings = [
+            {
+                'Metric': name.replace('metro_', '').replace('_seconds', '').replace('_bytes', ''),
+                'Labels': ', '.join(f'{k}={v}' for k, v in labels.items()),
+                'Count': count,
+                'Mean': f'{mean / 1024:.1f} KiB' if name.endswith('_bytes') else f'{mean * 1000:.2f} ms'
+            }
+            for name, labels, count, mean in summary['histograms']
+        ]
+        if timings:
+            st.markdown("**Timings**")
+            st.dataframe(pd.DataFrame(timings), hide_index=True, use_container_width=True)
+
+        caches = [
+            {'Cache': cache, 'Hits': hits, 'Misses': misses, 'Hit Ratio': f'{hits / max(1, hits + misses):.1%}'}
+            for cache, (hits, misses) in sorted(summary['caches'].items())
+        ]
+        if caches:
+            st.markdown("**Caches**")
+            st.dataframe(pd.DataFrame(caches), hide_index=True, use_container_width=True)
+
+        sessions = summary['gauges'].get('metro_active_sessions')
+        if sessions is not None:
+            st.metric("Active Sessions", int(sessions))
@@ -1,70 +1,24 @@
-import folium
 import pandas as pd
-from folium.plugins import MarkerCluster, HeatMap
 import streamlit as st
 import streamlit.components.v1 as components
 import os
+from utils.data_loader import load_dataset
+from utils.map_builder import render_map_html
+from utils.network_graph import get_network, hub_name
 
-def create_map(df):
-    """
-    Create an interactive map with markers, a heatmap layer, and metro lines.
-    """
-    # Create a base map centered on Delhi
-    delhi_map = folium.Map(location=[28.6139, 77.2090], zoom_start=11, tiles='CartoDB positron')
-
-    # Create a marker cluster
-    marker_cluster = MarkerCluster().add_to(delhi_map)
-
-    # Add markers for each metro station
-    for idx, row in df.iterrows():
-        popup_content = f"""
-        <b>Station:</b> {row['Station Names']}<br>
-        <b>Daily Ridership:</b> {row['Daily_Ridership']}<br>
-        <b>Metro Line:</b> {row['Metro Line']}<br>
-        <b>Opened:</b> {row['Opening_Year']}<br>
-        <b>Distance from First Station:</b> {row['Dist. From First Station(km)']} km
-        """
-
-        folium.Marker(
-            location=[row['Latitude'], row['Longitude']],
-            popup=folium.Popup(popup_content, max_width=300),
-            tooltip=row['Station Names']
-        ).add_to(marker_cluster)
-
-    # Add metro lines to the map
-    metro_lines = df.groupby('Metro Line')
-    colors = ['red', 'blue', 'green', 'orange', 'purple', 'yellow']  # Colors for different metro lines
-    color_map = {line: colors[i % len(colors)] for i, line in enumerate(metro_lines.groups.keys())}
-
-    for line, stations in metro_lines:
-        line_coords = stations[['Latitude', 'Longitude']].values.tolist()
-        folium.PolyLine(
-            locations=line_coords,
-            color=color_map[line],
-            weight=4,
-            opacity=0.7,
-            tooltip=f"{line} Line"
-        ).add_to(delhi_map)
-
-    # Add a heatmap layer based on ridership
-    heat_data = df[['Latitude', 'Longitude', 'Daily_Ridership']].values.tolist()
-    HeatMap(heat_data, radius=15, blur=10, max_zoom=13).add_to(delhi_map)
-
-    return delhi_map
-
-def load_data(file_path):
+def load_data():
     """
     Load the dataset containing metro station details.
     """
     try:
-        return pd.read_csv(file_path)
+        return load_dataset('stations')
     except FileNotFoundError:
-        st.error(f"The file '{file_path}' was not found. Please ensure it exists in the 'data' directory.")
+        st.error("The station dataset was not found. Please ensure 'delhi_metro_final.csv' exists in the 'data' directory.")
         return pd.DataFrame()
 
 def display_map():
     """
-    Display the pre-generated interactive map in the Streamlit app.
+    Display the interactive map in the Streamlit app, built from the current station data.
     """
     st.markdown(
         """
@@ -84,6 +38,67 @@ def display_map():
         unsafe_allow_html=True
     )
 
+    df = load_data()
+    if df.empty:
+        display_pregenerated_map()
+        return
+
+    st.markdown(
+        "<div style='font-size: 1.3rem; font-weight: 700; margin-bottom: 0.1em; color: #001f3f;'>Filter by Metro Line</div>",
+        unsafe_allow_html=True
+    )
+    all_lines = sorted(df['Metro Line'].unique())
+    selected_lines = st.multiselect("", all_lines, placeholder="All lines", key="map_line_filter")
+
+    route = select_route(df)
+    coordinates = None
+    if route and route['path']:
+        stops = df.drop_duplicates(['Station Names', 'Metro Line']).set_index(['Station Names', 'Metro Line'])
+        coordinates = [tuple(stops.loc[stop, ['Latitude', 'Longitude']]) for stop in route['path']]
+
+    map_html = render_map_html(df, selected_lines or None, coordinates)
+    components.html(map_html, height=600, scrolling=True)
+    if route:
+        display_route(route)
+
+def select_route(df):
+    """
+    Origin and destination pickers; returns the best route between them, or None.
+    """
+    st.markdown(
+        "<div style='font-size: 1.3rem; font-weight: 700; margin-bottom: 0.1em; color: #001f3f;'>Plan a Route</div>",
+        unsafe_allow_html=True
+    )
+    stations = sorted(df['Station Names'].map(hub_name).unique())
+    col1, col2 = st.columns(2)
+    origin = col1.selectbox("Origin", [None] + stations, format_func=lambda s: s or "Choose a station", key="map_route_origin")
+    destination = col2.selectbox("Destination", [None] + stations, format_func=lambda s: s or "Choose a station", key="map_route_destination")
+    if not origin or not destination:
+        return None
+    route = get_network().shortest_path(origin, destination)
+    if route is None:
+        st.warning(f"{origin} and {destination} are not connected in the station data.")
+        return None
+    route['origin'] = origin
+    return route
+
+def display_route(route):
+    """
+    Distance, transfers and stops of a route, with the origin's accessibility.
+    """
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Route Distance", f"{route['distance_km']:.1f} km")
+    col2.metric("Transfers", route['transfers'])
+    network = get_network()
+    access = network.accessibility().iloc[network.station(route['origin'])]
+    col3.metric("Reachable with ≤1 Transfer", int(access['Reachable_Stations']))
+    if route['path']:
+        st.dataframe(pd.DataFrame(route['path'], columns=['Station', 'Line']), hide_index=True, use_container_width=True)
+
+def display_pregenerated_map():
+    """
+    Fall back to the pre-generated map HTML when the station data cannot be loaded.
+    """
     # Path to the pre-generated map HTML file
     map_file_path = os.path.join('data', 'delhi_metro_map.html')
 
@@ -1,6 +1,24 @@
 import os
 import streamlit as st
 import pandas as pd
+from utils.data_loader import load_dataset
+from utils.figure_rendering import draw_figure
+from utils.image_assets import data_uri, encode_image, image_variant, list_images
+from utils.model_evaluation import EVALUATED_MODELS, evaluate_models, metrics_table
+
+# Page section of each evaluated model
+MODEL_SECTIONS = [
+    ('xgboost', "🚀 XGBoost Model"),
+    ('linear_regression', "📈 Linear Regression Model"),
+    ('ensemble', "🤝 Ensemble Model")
+]
+
+# Pre-rendered notebook graphs of each model, shown when live evaluation is unavailable
+STATIC_GRAPHS = {
+    'xgboost': ["xgboost_actual_vs_predicted.png", "xgboost_feature_importance.png"],
+    'linear_regression': ["linear_regression_actual_vs_predicted.png", "linear_regression_coefficients.png"],
+    'ensemble': ["ensemble_actual_vs_predicted.png"]
+}
 
 def load_model_comparison_data():
     """
@@ -8,12 +26,64 @@ def load_model_comparison_data():
     """
     try:
         # Load the CSV file
-        df = pd.read_csv(os.path.join("data", "model_performance_metrics.csv"))
+        df = load_dataset('model_metrics')
         return df
     except FileNotFoundError:
         st.error("The file 'model_performance_metrics.csv' was not found. Please ensure it exists in the 'data' directory.")
         return pd.DataFrame()  # Return an empty DataFrame if the file is missing
 
+def figure_image(draw, *data, figsize):
+    """Draw a figure and return it as a data URI of its full-size WebP variant."""
+    return data_uri(encode_image(draw_figure(draw, *data, figsize=figsize, dpi=150), 'full'))
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_model_figure(kind, name, key):
+    """
+    WebP data URI of one evaluation figure ('actual_vs_predicted', 'explanation' or 'metrics').
+
+    key is the evaluation cache key, so figures are redrawn only when a model or the
+    data changes. Returns None if the model has nothing to draw.
+    """
+    if kind == 'metrics':
+        return figure_image(draw_metric_bars, pd.DataFrame(metrics_table(evaluate_models())), figsize=(15, 5))
+    result = next(r for r in evaluate_models([name]))
+    if kind == 'actual_vs_predicted':
+        return figure_image(draw_actual_vs_predicted, result, figsize=(10, 6))
+    if not result['explanation']:
+        return None
+    return figure_image(draw_model_explanation, result, figsize=(12, 6))
+
+def draw_actual_vs_predicted(fig, result):
+    """Scatter the held-out actual ridership against the model's predictions."""
+    ax = fig.subplots()
+    ax.scatter(result['actual'], result['predicted'], alpha=0.5)
+    low, high = min(result['actual']), max(result['actual'])
+    ax.plot([low, high], [low, high], 'r--')
+    ax.set_xlabel('Actual Ridership')
+    ax.set_ylabel('Predicted Ridership')
+    ax.set_title(f"{result['model']}: Actual vs Predicted Ridership")
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+
+def draw_model_explanation(fig, result):
+    """Bar chart of feature importances or coefficients."""
+    label, values = result['explanation']
+    ordered = sorted(values.items(), key=lambda item: item[1])
+    ax = fig.subplots()
+    ax.barh([feature for feature, _ in ordered], [value for _, value in ordered])
+    ax.set_xlabel(label)
+    ax.set_title(f"{result['model']} {label}")
+    fig.tight_layout()
+
+def draw_metric_bars(fig, df):
+    """Side-by-side bar charts of RMSE, MAE and R² Score for every model."""
+    axes = fig.subplots(1, 3)
+    for ax, metric, color in zip(axes, ['RMSE', 'MAE', 'R² Score'], ['skyblue', 'lightgreen', 'salmon']):
+        ax.bar(df['Model'], df[metric], color=color)
+        ax.set_title(metric)
+        ax.tick_params(axis='x', rotation=20)
+    fig.tight_layout()
+
 def plot_model_comparisons(df):
     """
     Plot comparisons of model performance metrics.
@@ -24,7 +94,7 @@ def plot_model_comparisons(df):
         "model_comparison.png"
     )
     if os.path.exists(model_comparison_path):
-        st.image(model_comparison_path, use_container_width=True)
+        st.image(image_variant(model_comparison_path, 'full'), use_container_width=True)
 
 def display_model_comparison_graphs():
     """Display all graphs from the model_analysis_graphs directory except model_comparison.png and model-specific graphs."""
@@ -42,153 +112,87 @@ def display_model_comparison_graphs():
         st.error(f"The directory '{graphs_dir}' does not exist. Please ensure the path is correct and contains the model comparison graphs.")
         return
 
-    graph_files = sorted([f for f in os.listdir(graphs_dir) if f.endswith('.png')])
+    # Graphs shown in the model sections above are excluded from the bottom section
+    exclude_files = [graph for graphs in STATIC_GRAPHS.values() for graph in graphs] + ["model_comparison.png"]
+    graph_paths = list_images(graphs_dir, exclude=exclude_files)
 
-    if not graph_files:
+    if not graph_paths:
         st.warning("No PNG files found in the directory.")
         return
 
-    # List of graphs to exclude from the bottom section
-    exclude_files = [
-        "xgboost_feature_importance.png",
-        "xgboost_actual_vs_predicted.png",
-        "linear_regression_actual_vs_predicted.png",
-        "linear_regression_coefficients.png",
-        "ensemble_actual_vs_predicted.png",
-        "model_comparison.png"
-    ]
-
-    for graph_file in graph_files:
-        if graph_file not in exclude_files:
-            st.image(os.path.join(graphs_dir, graph_file), use_container_width=True)
-            st.markdown("---")
-
-def compare_models():
-    st.markdown(
-        """
-        <h1 style='font-size: 3.2rem; font-weight: 900; color: #001f3f; margin-bottom: 0.2em;'>
-            Model Comparisons
-        </h1>
-        <hr style='border: 2px solid #001f3f; margin-top: 0; margin-bottom: 2em;'>
-        """,
-        unsafe_allow_html=True
-    )
-    st.markdown(
-        """
-        <p style='font-size: 1.4rem; color: #333; margin-bottom: 1.5em;'>
-           This section compares the performance of different models used for ridership prediction.
-        </p>
-        """,
-        unsafe_allow_html=True
-    )
-
-    # Load model performance data
-    df = load_model_comparison_data()
+    for path in graph_paths:
+        st.image(image_variant(path, 'full'), use_container_width=True)
+        st.markdown("---")
 
-    # --- XGBoost Section ---
-    st.header("🚀 XGBoost Model")
+def display_model_section(name, title, df, results):
+    """Metrics row and figures of one model: live figures if it was evaluated, else the notebook's."""
+    st.header(title)
+    model_label = EVALUATED_MODELS[name]
     st.markdown(
-        """
+        f"""
         <p style='font-size: 1.4rem; color: #333; margin-bottom: 1.5em;'>
-           Performance Metrics for XGBoost Model:
+           Performance Metrics for {model_label} Model:
         </p>
         """,
         unsafe_allow_html=True
     )
     if not df.empty:
-        xgb_row = df[df['Model'].str.lower().str.contains('xgboost')]
-        if not xgb_row.empty:
-            st.dataframe(xgb_row)
+        row = df[df['Model'].str.lower() == model_label.lower()]
+        if not row.empty:
+            st.dataframe(row, hide_index=True)
     st.markdown(
-        """
+        f"""
         <p style='font-size: 1.4rem; color: #333; margin-bottom: 1.5em;'>
-           Visualizations for XGBoost Model:
+           Visualizations for {model_label} Model:
         </p>
         """,
         unsafe_allow_html=True
     )
-    # Actual vs Predicted graph for XGBoost
-    xgb_actual_vs_pred_path = os.path.join(
-        "assets", "model_analysis_graphs",
-        "xgboost_actual_vs_predicted.png"
-    )
-    if os.path.exists(xgb_actual_vs_pred_path):
-        st.image(xgb_actual_vs_pred_path, use_container_width=True)
-    # Feature importance 
-    xgb_graph_path = os.path.join(
-        "assets", "model_analysis_graphs",
-        "xgboost_feature_importance.png"
-    )
-    if os.path.exists(xgb_graph_path):
-        st.image(xgb_graph_path, use_container_width=True)
+    if name in results:
+        for kind in ('actual_vs_predicted', 'explanation'):
+            image = render_model_figure(kind, name, results[name]['key'])
+            if image is not None:
+                st.image(image, use_container_width=True)
+    else:
+        for graph in STATIC_GRAPHS[name]:
+            path = os.path.join("assets", "model_analysis_graphs", graph)
+            if os.path.exists(path):
+                st.image(image_variant(path, 'full'), use_container_width=True)
 
-    # --- Linear Regression Section ---
-    st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
-    st.header("📈 Linear Regression Model")
+def compare_models():
     st.markdown(
         """
-        <p style='font-size: 1.4rem; color: #333; margin-bottom: 1.5em;'>
-           Performance Metrics for Linear Regression Model:
-        </p>
+        <h1 style='font-size: 3.2rem; font-weight: 900; color: #001f3f; margin-bottom: 0.2em;'>
+            Model Comparisons
+        </h1>
+        <hr style='border: 2px solid #001f3f; margin-top: 0; margin-bottom: 2em;'>
         """,
         unsafe_allow_html=True
     )
-    lr_row = df[df['Model'].str.lower().str.contains('linear')]
-    if not lr_row.empty:
-        st.dataframe(lr_row)
     st.markdown(
         """
         <p style='font-size: 1.4rem; color: #333; margin-bottom: 1.5em;'>
-           Visualizations for Linear Regression Model:
+           This section compares the performance of different models used for ridership prediction,
+           scored live on the held-out test set.
         </p>
         """,
         unsafe_allow_html=True
     )
-    # Actual vs Predicted graph for Linear Regression
-    lr_actual_vs_pred_path = os.path.join(
-        "assets", "model_analysis_graphs",
-        "linear_regression_actual_vs_predicted.png"
-    )
-    if os.path.exists(lr_actual_vs_pred_path):
-        st.image(lr_actual_vs_pred_path, use_container_width=True)
-    # Linear Regression Coefficient graph
-    lr_coeff_path = os.path.join(
-        "assets", "model_analysis_graphs",
-        "linear_regression_coefficients.png"
-    )
-    if os.path.exists(lr_coeff_path):
-        st.image(lr_coeff_path, use_container_width=True)
 
-    # --- Ensemble Model Section ---
-    st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
-    st.header("🤝 Ensemble Model")
-    st.markdown(
-        """
-        <p style='font-size: 1.4rem; color: #333; margin-bottom: 1.5em;'>
-           Performance Metrics for Ensemble Model:
-        </p>
-        """,
-        unsafe_allow_html=True
-    )
-    ensemble_row = df[df['Model'].str.lower().str.contains('ensemble')]
-    if not ensemble_row.empty:
-        st.dataframe(ensemble_row)
-
-    st.markdown(
-        """
-        <p style='font-size: 1.4rem; color: #333; margin-bottom: 1.5em;'>
-           Visualizations for for Ensemble Model:
-        </p>
-        """,
-        unsafe_allow_html=True
-    )
-    # Actual vs Predicted graph for Ensemble
-    ensemble_actual_vs_pred_path = os.path.join(
-        "assets", "model_analysis_graphs",
-        "ensemble_actual_vs_predicted.png"
-    )
-    if os.path.exists(ensemble_actual_vs_pred_path):
-        st.image(ensemble_actual_vs_pred_path, use_container_width=True)
+    # Score the current model files; fall back to the notebook's frozen results if that fails
+    try:
+        with st.spinner("Evaluating models..."):
+            results = {result['name']: result for result in evaluate_models()}
+        df = pd.DataFrame(metrics_table(results.values()))
+    except (OSError, ValueError, KeyError, RuntimeError) as e:
+        st.warning(f"Live model evaluation is unavailable ({e}). Showing the last saved results instead.")
+        results = {}
+        df = load_model_comparison_data()
+
+    # st.tabs runs every tab's body on each rerun, so only the selected model's section is rendered
+    titles = dict(MODEL_SECTIONS)
+    name = st.selectbox("Model", list(titles), format_func=titles.get, key="model_comparisons_section")
+    display_model_section(name, titles[name], df, results)
 
     # --- Performance Metric Table ---
     st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
@@ -204,17 +208,22 @@ def compare_models():
     )
 
     if not df.empty:
-        st.dataframe(df)
+        st.dataframe(df, hide_index=True)
 
     # --- Model Performance Comparison (Bar Charts) ---
     st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
     st.header("📉 Model Performance Comparison (Bar Charts)")
-    plot_model_comparisons(df)
+    if results:
+        st.image(render_model_figure('metrics', None, tuple(r['key'] for r in results.values())), use_container_width=True)
+    else:
+        plot_model_comparisons(df)
 
     # --- Cross Validation Graphs ---
     st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
     st.header("🖼️ Cross Validation Graphs")
-    display_model_comparison_graphs()
+    # An expander still renders its contents when collapsed, so the graphs are only loaded once toggled on
+    if st.toggle("Show cross validation graphs", key="model_comparisons_cv_graphs"):
+        display_model_comparison_graphs()
 
 if __name__ == "__main__":
-    compare_models()
\ No newline at end of file
+    compare_models()
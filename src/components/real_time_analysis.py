@@ -1,15 +1,67 @@
 import streamlit as st
 import pandas as pd
 import datetime
-import matplotlib.pyplot as plt
 import os
 import pytz
+import numpy as np
+from utils.ridership_cube import get_ridership_cube, day_type_for, DAY_TYPES
+from utils.ingestion import get_tap_counter, ingestion_error, is_ingesting, start_ingestion
+from utils.visualization_utils import plot_station_hourly_trends
+from utils.forecasting import current_epoch_hour, get_forecaster, local_hours
 
-# Load the hourly ridership data
-@st.cache_data
-def load_hourly_data():
-    data = pd.read_csv(os.path.join('data', 'hourly_ridership.csv'))
-    return data
+# Hours ahead shown under "Expected Next Hours"
+EXPECTED_HOURS = 6
+
+def display_live_tap_counts(station_name):
+    """
+    Display live entry/exit counts for the selected station from the tap-event counters.
+    """
+    st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
+    st.subheader("Live Tap Counts")
+    if not is_ingesting():
+        # The feed is configured with METRO_TAP_SOURCE ('synthetic', 'file:<path>' or 'socket:<host>:<port>')
+        source_spec = os.environ.get('METRO_TAP_SOURCE')
+        if source_spec:
+            try:
+                start_ingestion(source_spec)
+            except ValueError as error:
+                st.error(f"Cannot connect the tap-event feed: {error} "
+                         "Set METRO_TAP_SOURCE to 'synthetic', 'file:<path>' or 'socket:<host>:<port>'.")
+                return
+        elif st.toggle("Simulate live tap feed", key="simulate_tap_feed"):
+            start_ingestion('synthetic')
+        else:
+            st.info("No tap-event feed is connected. Set METRO_TAP_SOURCE or simulate a feed to see live counts.")
+            return
+        if ingestion_error() is not None:
+            st.error(f"The tap-event feed stopped: {ingestion_error()}. Fix the source and restart the app to reconnect.")
+            return
+
+    counter = get_tap_counter()
+    entries, exits = counter.hour_counts(station_name)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Entries This Hour", f"{entries:,}")
+    col2.metric("Exits This Hour", f"{exits:,}")
+    col3.metric("Events Ingested", f"{counter.events:,}")
+
+    hours, counts = counter.recent_hours(station_name)
+    if counts.any():
+        ist_hours = [datetime.datetime.fromtimestamp(int(h) * 3600, pytz.timezone('Asia/Kolkata')).strftime('%H:00') for h in hours]
+        st.line_chart(pd.DataFrame(counts, index=ist_hours, columns=['Entries', 'Exits']))
+
+def display_expected_ridership(station_name, now, hours=EXPECTED_HOURS):
+    """
+    Display the forecast ridership of the selected station for the next few hours.
+    """
+    forecaster = get_forecaster()
+    if is_ingesting():
+        forecaster.sync(get_tap_counter())
+    start_hour = current_epoch_hour(now) + 1
+    expected = forecaster.station_forecast(station_name, start_hour, hours)
+    _, hours_of_day = local_hours(np.arange(start_hour, start_hour + hours))
+    st.subheader("Expected Next Hours:")
+    for column, hour, value in zip(st.columns(hours), hours_of_day, expected):
+        column.metric(f"{hour:02d}:00", f"{value:,}")
 
 # Function to display real-time ridership data for selected stations
 def display_real_time_analysis():
@@ -26,10 +78,10 @@ def display_real_time_analysis():
         unsafe_allow_html=True
     )
     # Load data
-    hourly_data = load_hourly_data()
+    cube = get_ridership_cube()
 
     # Sort station names alphabetically
-    stations = sorted(hourly_data['Station_Name'].unique())
+    stations = cube.stations
 
     # Create the dropdown for station selection
     st.markdown(
@@ -38,36 +90,31 @@ def display_real_time_analysis():
     )
     selected_station = st.selectbox("", stations)
 
-    # Filter data for the selected station
-    station_data = hourly_data[hourly_data['Station_Name'] == selected_station]
-
     # Display current ridership and current time
     ist = pytz.timezone('Asia/Kolkata')  # IST timezone
     current_time_ist = datetime.datetime.now(ist)
     current_hour = current_time_ist.hour
     current_time_str = current_time_ist.strftime('%Y-%m-%d %H:%M:%S')
-    current_ridership = station_data[f'Weekday_{current_hour}'].values[0] if current_hour < 24 else 0
+    current_day_type = day_type_for(current_time_ist.weekday())
+    current_ridership = cube.lookup(selected_station, current_day_type, current_hour)
     st.subheader("Current Ridership and Time:")
     st.markdown(f'<div class="ridership-box">{current_ridership} Passengers</div>', unsafe_allow_html=True)
     st.markdown(f'<div style="font-size: 1.8rem; margin-top: 0.5rem;">Current Time (IST):  <b>{current_time_str}</b></div>', unsafe_allow_html=True)
 
+    display_expected_ridership(selected_station, current_time_ist)
+
+    display_live_tap_counts(selected_station)
+
     # Plot hourly ridership trends
     st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
     st.subheader("Hourly Ridership Trends")
-    hours = list(range(24))
-    station_row = station_data.iloc[0]
-    weekday_ridership = [station_row[f'Weekday_{i}'] for i in hours]
-    weekend_ridership = [station_row[f'Weekend_{i}'] for i in hours]
+    weekday_ridership, weekend_ridership = cube.station_profile(selected_station)
+    st.image(plot_station_hourly_trends(weekday_ridership, weekend_ridership, selected_station), use_container_width=True)
 
-    plt.figure(figsize=(12, 6))
-    plt.plot(hours, weekday_ridership, label='Weekday', color='blue')
-    plt.plot(hours, weekend_ridership, label='Weekend', color='red')
-    plt.title(f'Hourly Ridership Trends for {selected_station}')
-    plt.xlabel('Hour of Day')
-    plt.ylabel('Ridership')
-    plt.xticks(hours)
-    plt.legend()
-    st.pyplot(plt)
+    # Busiest stations across the network at the current hour
+    st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
+    st.subheader(f"Busiest Stations This Hour ({DAY_TYPES[current_day_type]}, {current_hour}:00)")
+    st.dataframe(cube.top_stations(current_hour, current_day_type, n=10), hide_index=True)
 
 # Call the function to display the real-time analysis
 if __name__ == "__main__":
@@ -1,23 +1,35 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.model_utils import load_model
-import joblib
-import os
+from utils.conformal import DEFAULT_COVERAGE, get_calibration
+from utils.model_utils import FEATURE_COLUMNS, predict_ridership_batch
+from utils.feature_engineering import DENSITY_RADIUS_KM, get_feature_transformer
+from utils.prediction_cache import get_prediction_cache
+from utils.spatial_index import get_station_locator
+from utils.statistics_store import get_statistics_store
+from utils.figure_rendering import render_figure
 
-# Load the trained models
-xgb_model = load_model(os.path.join('models', 'xgboost_model.pkl'))  
+def get_ridership_thresholds():
+    """Return the (low, high) ridership thresholds from the original dataset's statistics store."""
+    stats = get_statistics_store('stations')
+    return (
+        stats.quantile('Daily_Ridership', 0.33),  # Low threshold
+        stats.quantile('Daily_Ridership', 0.67)  # High threshold
+    )
 
-# Load the scaler
-scaler = joblib.load(os.path.join('models', 'scaler.pkl'))
-line_encoder = joblib.load(os.path.join('models', 'line_encoder.pkl'))
+# Existing stations listed next to the scenario's location
+NEAREST_STATIONS = 5
 
-# Load the original dataset to calculate ridership thresholds
-df = pd.read_csv(os.path.join('data', 'delhi_metro_final.csv'))
-ridership_thresholds = (
-    df['Daily_Ridership'].quantile(0.33),  # Low threshold
-    df['Daily_Ridership'].quantile(0.67)  # High threshold
-)
+# Range and kind of each input that can be swept on the grid
+SWEEP_RANGES = {
+    'Station_Age': (0, 100, 'discrete'),
+    'Metro_Line_Encoded': (0, 12, 'discrete'),
+    'Dist. From First Station(km)': (0.0, 50.0, 'continuous'),
+    'Latitude': (28.40, 28.90, 'continuous'),
+    'Longitude': (76.80, 77.60, 'continuous'),
+    'Connectivity': (1, 10, 'discrete'),
+    'Station_Density': (0, 10, 'discrete')
+}
 
 def categorize_ridership(prediction, thresholds):
     """
@@ -39,18 +51,110 @@ def categorize_ridership(prediction, thresholds):
     else:
         return 'High'
 
+def simulate_ridership_batch(scenarios):
+    """
+    Predicts ridership for many scenarios with a single transform and predict call.
+
+    Parameters:
+    scenarios (DataFrame or array-like): N scenarios, either a DataFrame with
+        FEATURE_COLUMNS or an (N, 7) array in FEATURE_COLUMNS order.
+
+    Returns:
+    ndarray: Predicted ridership for each scenario.
+    """
+    if isinstance(scenarios, pd.DataFrame):
+        features = scenarios[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    else:
+        features = scenarios
+    return predict_ridership_batch(features)
+
 def simulate_ridership(station_age, metro_line_encoded, distance_from_first_station, latitude, longitude, connectivity, station_density):
-    features = np.array([[station_age, metro_line_encoded, distance_from_first_station, latitude, longitude, connectivity, station_density]])
-    features_scaled = scaler.transform(features)
-    xgb_prediction = xgb_model.predict(features_scaled)
-    return xgb_prediction[0]
+    """
+    Predicts ridership for one scenario through the shared prediction cache, so
+    repeated input combinations (after quantization) skip the model entirely.
+
+    Returns the prediction and whether it was interpolated from the precomputed
+    prediction surface (METRO_PREDICTION_SURFACE=1) rather than predicted by the model.
+    """
+    predictions, approximate = get_prediction_cache().predict([(
+        station_age, metro_line_encoded, distance_from_first_station,
+        latitude, longitude, connectivity, station_density
+    )], return_approximate=True)
+    return predictions[0], bool(approximate[0])
+
+def derive_scenario_features(transformer, station_age, metro_line, interchange_lines, distance_from_first_station, latitude, longitude):
+    """
+    Derives the model features for a candidate station from its raw attributes.
+
+    Connectivity counts the primary line plus any interchange lines, and Station_Density
+    is counted from latitude and longitude against the existing network.
+    """
+    lines = [metro_line] + list(interchange_lines)
+    stations = pd.DataFrame({
+        'Station Names': '__scenario__',
+        'Metro Line': lines,
+        'Opening_Year': transformer.reference_year - station_age,
+        'Dist. From First Station(km)': distance_from_first_station,
+        'Latitude': latitude,
+        'Longitude': longitude
+    })
+    features = transformer.transform(stations)
+    return {col: features[col].iloc[0].item() for col in FEATURE_COLUMNS}
+
+def sweep_values(feature, resolution):
+    """Return the grid values for a swept feature."""
+    low, high, kind = SWEEP_RANGES[feature]
+    if kind == 'discrete':
+        values = np.arange(low, high + 1)
+        if len(values) > resolution:
+            values = np.unique(np.linspace(low, high, resolution).round())
+        return values
+    return np.linspace(low, high, resolution)
 
-def display_simulation_results(xgb_pred):
+def simulate_ridership_grid(base_inputs, x_feature, x_values, y_feature, y_values):
+    """
+    Sweeps two inputs over a grid while holding the others at base_inputs.
+
+    Parameters:
+    base_inputs (dict): Value for every feature in FEATURE_COLUMNS.
+    x_feature, y_feature (str): Names of the two swept features.
+    x_values, y_values (array-like): Grid values for each swept feature.
+
+    Returns:
+    ndarray: Predictions of shape (len(y_values), len(x_values)).
+    """
+    x_values = np.asarray(x_values, dtype=np.float64)
+    y_values = np.asarray(y_values, dtype=np.float64)
+    base_row = np.array([base_inputs[col] for col in FEATURE_COLUMNS], dtype=np.float64)
+    grid = np.tile(base_row, (len(y_values) * len(x_values), 1))
+    xx, yy = np.meshgrid(x_values, y_values)
+    grid[:, FEATURE_COLUMNS.index(x_feature)] = xx.ravel()
+    grid[:, FEATURE_COLUMNS.index(y_feature)] = yy.ravel()
+    return simulate_ridership_batch(grid).reshape(len(y_values), len(x_values))
+
+def draw_sweep_heatmap(fig, predictions, x_values, y_values, x_feature, y_feature):
+    ax = fig.subplots()
+    mesh = ax.pcolormesh(x_values, y_values, predictions, cmap='viridis', shading='nearest')
+    fig.colorbar(mesh, ax=ax, label='Predicted Daily Ridership')
+    ax.set_xlabel(x_feature)
+    ax.set_ylabel(y_feature)
+    ax.set_title(f'Predicted Ridership: {y_feature} vs {x_feature}')
+
+def display_sweep_heatmap(predictions, x_feature, x_values, y_feature, y_values):
+    """Render the grid sweep predictions as a heatmap."""
+    image = render_figure(
+        draw_sweep_heatmap, np.asarray(predictions), np.asarray(x_values), np.asarray(y_values),
+        x_feature=x_feature, y_feature=y_feature, figsize=(12, 7)
+    )
+    st.image(image, use_container_width=True)
+
+def display_simulation_results(xgb_pred, approximate=False):
     st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
     st.subheader("Predicted Ridership")
     def format_pred(val):
         return f"{int(val):,}"
-    xgb_category = categorize_ridership(xgb_pred, ridership_thresholds)
+    xgb_category = categorize_ridership(xgb_pred, get_ridership_thresholds())
+    calibration = get_calibration()
     category_colors = {
         'Low': '#FF6B6B',
         'Medium': '#FFD93D',
@@ -66,11 +170,23 @@ def display_simulation_results(xgb_pred):
         st.markdown(
             f"""
             <div style='margin-bottom: 32px;'>
-                <div style='font-size: 30px; font-weight: bold; color: black; margin-bottom: 24px;'>{format_pred(xgb_pred)} <span style='font-size:22px; font-weight:500;'>Passengers</span></div>
+                <div style='font-size: 30px; font-weight: bold; color: black; margin-bottom: 24px;'>{'≈ ' if approximate else ''}{format_pred(xgb_pred)} <span style='font-size:22px; font-weight:500;'>Passengers</span></div>
             </div>
             """,
             unsafe_allow_html=True
         )
+        if approximate:
+            st.caption("Approximate: interpolated from the precomputed prediction surface, not predicted by the model.")
+        if calibration is not None:
+            low, high = calibration.interval(xgb_pred, DEFAULT_COVERAGE)
+            st.markdown(
+                f"<div style='font-size: 20px; color: black;'>{DEFAULT_COVERAGE:.0%} prediction interval: "
+                f"<b>{format_pred(low)} – {format_pred(high)}</b></div>"
+                f"<div style='font-size: 0.95rem; color: #555;'>Calibrated on {calibration.rows} held-out stations.</div>",
+                unsafe_allow_html=True
+            )
+        else:
+            st.caption("No prediction interval: calibrate the current models with `python -m utils.conformal`.")
     with col2:
         st.markdown(
             f"<div style='background-color: {category_colors[xgb_category]}; color: black; border-radius: 20px; padding: 8px 16px; margin-bottom: 8px; text-align: center; font-weight: bold;'>"
@@ -111,22 +227,9 @@ def run_scenario_simulation():
     st.markdown("<span style='font-size:1.15rem; font-weight:700; color:#001f3f;'>Station Age (years)</span>", unsafe_allow_html=True)
     station_age = st.slider("", 0, 100, 10)
 
-    line_options = {
-        "Red Line": 0,
-        "Yellow Line": 1,
-        "Blue Line": 2,
-        "Green Line": 3,
-        "Violet Line": 4,
-        "Airport Express": 5,
-        "Magenta Line": 6,
-        "Pink Line": 7,
-        "Grey Line": 8,
-        "Rapid Metro": 9,
-        "Orange Line": 10
-    }
+    transformer = get_feature_transformer()
     st.markdown("<div style='font-size: 1.3rem; font-weight: 700; margin-bottom: 0.5em; color: #001f3f;'>Select a Metro Line</div>", unsafe_allow_html=True)
-    selected_line = st.selectbox("", list(line_options.keys()))
-    metro_line_encoded = line_options[selected_line]
+    selected_line = st.selectbox("", transformer.line_classes)
 
     st.markdown("<span style='font-size:1.15rem; font-weight:700; color:#001f3f;'>Distance from First Station (km)</span>", unsafe_allow_html=True)
     distance_from_first_station = st.slider("", 0.0, 50.0, 5.0)
@@ -137,27 +240,35 @@ def run_scenario_simulation():
     st.markdown("<span style='font-size:1.15rem; font-weight:700; color:#001f3f;'>Longitude</span>", unsafe_allow_html=True)
     longitude = st.number_input("", value=77.2090)
 
-    st.markdown("<span style='font-size:1.15rem; font-weight:700; color:#001f3f;'>Connectivity (number of lines)</span>", unsafe_allow_html=True)
-    connectivity = st.slider("", 1, 10, 2)
+    st.markdown("<span style='font-size:1.15rem; font-weight:700; color:#001f3f;'>Interchange Lines (other lines serving this station)</span>", unsafe_allow_html=True)
+    interchange_lines = st.multiselect("", [line for line in transformer.line_classes if line != selected_line])
+
+    scenario_features = derive_scenario_features(
+        transformer, station_age, selected_line, interchange_lines,
+        distance_from_first_station, latitude, longitude
+    )
+    metro_line_encoded = scenario_features['Metro_Line_Encoded']
+    connectivity = scenario_features['Connectivity']
+    station_density = scenario_features['Station_Density']
 
     st.markdown(
-        """
+        f"""
         <div style='margin-top:1.2em; margin-bottom:0.5em;'>
-            <span style='font-size:1.15rem; font-weight:700; color:#001f3f;'>Station Density:</span>
+            <span style='font-size:1.15rem; font-weight:700; color:#001f3f;'>Derived Features:</span>
             <div style='font-size:1.08rem; color:#222; margin-top:0.2em;'>
-                Station Density refers to the number of metro stations within a certain radius (e.g., 2 km) of the selected station.<br>
-                A higher value means the station is in a more densely connected area of the metro network.
+                Connectivity: <b>{connectivity}</b> line(s) &nbsp;|&nbsp; Station Density: <b>{station_density}</b> station(s) within {DENSITY_RADIUS_KM} km<br>
+                Station Density is derived from the latitude and longitude above; a higher value means the station is in a more densely connected area of the metro network.
             </div>
         </div>
         """,
         unsafe_allow_html=True
     )
-    station_density = st.slider(
-        "",
-        min_value=0,
-        max_value=10,
-        value=1,
-        step=1,
+
+    st.markdown("<span style='font-size:1.15rem; font-weight:700; color:#001f3f;'>Nearest Existing Stations</span>", unsafe_allow_html=True)
+    st.dataframe(
+        get_station_locator().nearest(latitude, longitude, NEAREST_STATIONS),
+        hide_index=True, use_container_width=True,
+        column_config={'Distance_km': st.column_config.NumberColumn("Distance (km)", format="%.2f")}
     )
 
     st.markdown("""
@@ -198,12 +309,41 @@ def run_scenario_simulation():
     # --- Results Section ---
     if button_clicked:
         st.markdown('<div class="results-container">', unsafe_allow_html=True)
-        xgb_pred = simulate_ridership(
+        xgb_pred, approximate = simulate_ridership(
             station_age, metro_line_encoded, distance_from_first_station,
             latitude, longitude, connectivity, station_density
         )
-        display_simulation_results(xgb_pred)
+        display_simulation_results(xgb_pred, approximate)
         st.markdown('</div>', unsafe_allow_html=True)  
 
+    # --- Grid Sweep Section ---
+    st.markdown("<hr style='border: 2px solid #001f3f;'>", unsafe_allow_html=True)
+    st.header("Grid Sweep")
+    st.markdown(
+        """
+        <div style='font-size:1.08rem; color:#222; margin-bottom:0.5em;'>
+            Sweep two inputs across their full range while holding the others at the values above.
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    st.markdown("<span style='font-size:1.15rem; font-weight:700; color:#001f3f;'>X-axis Input</span>", unsafe_allow_html=True)
+    x_feature = st.selectbox("", FEATURE_COLUMNS, index=0, key="sweep_x_feature")
+    st.markdown("<span style='font-size:1.15rem; font-weight:700; color:#001f3f;'>Y-axis Input</span>", unsafe_allow_html=True)
+    y_feature = st.selectbox("", [f for f in FEATURE_COLUMNS if f != x_feature], index=1, key="sweep_y_feature")
+    st.markdown("<span style='font-size:1.15rem; font-weight:700; color:#001f3f;'>Grid Resolution (points per axis)</span>", unsafe_allow_html=True)
+    resolution = st.slider("", 10, 100, 50, key="sweep_resolution")
+
+    sweep_clicked = st.button("🗺️ Run Grid Sweep")
+    if sweep_clicked:
+        base_inputs = dict(zip(FEATURE_COLUMNS, [
+            station_age, metro_line_encoded, distance_from_first_station,
+            latitude, longitude, connectivity, station_density
+        ]))
+        x_values = sweep_values(x_feature, resolution)
+        y_values = sweep_values(y_feature, resolution)
+        predictions = simulate_ridership_grid(base_inputs, x_feature, x_values, y_feature, y_values)
+        display_sweep_heatmap(predictions, x_feature, x_values, y_feature, y_values)
+
 if __name__ == "__main__":
     run_scenario_simulation()
\ No newline at end of file
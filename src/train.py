@@ -0,0 +1,25 @@
+import argparse
+import time
+import warnings
+from utils.training import RANDOM_STATE, run_training
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the scaler, line encoder and ridership models (run from the src directory).")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Parallel jobs for the search and cross-validation (default: all cores).")
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE, help="Random seed for the split, folds and models.")
+    parser.add_argument('--quick', action='store_true', help="Search a single XGBoost candidate (for smoke tests).")
+    parser.add_argument('--no-publish', action='store_true', help="Only write the versioned copy under models/versions.")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    start = time.perf_counter()
+    version_dir, report = run_training(n_jobs=args.n_jobs, seed=args.seed, quick=args.quick, publish=not args.no_publish)
+    print(f"XGBoost parameters: {report['xgboost_params']} ({report['search_candidates']} candidates searched)")
+    for name, metrics in report['test_metrics'].items():
+        cv = report['cross_validation'][name]
+        print(f"{name:20s} test RMSE {metrics['rmse']:9.2f}  MAE {metrics['mae']:9.2f}  R² {metrics['r2']:.4f}  "
+              f"| CV RMSE {cv['rmse_mean']:9.2f} ± {cv['rmse_std']:.2f}")
+    print(f"Wrote {version_dir}{'' if args.no_publish else ' and published it to models/'} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import json
+import math
+import os
+import threading
+import time
+import numpy as np
+from utils.data_loader import csv_path
+from utils.file_utils import file_hash
+from utils.model_evaluation import RANDOM_STATE, held_out_data
+from utils.model_utils import FEATURE_COLUMNS, MODELS_DIR, artifact_path, get_model, pipeline_version, predict_ridership_batch
+
+CALIBRATION_FILE = os.path.join(MODELS_DIR, 'ensemble_calibration.json')
+
+# Coverage levels the table holds a half-width for
+COVERAGE_LEVELS = (0.8, 0.9, 0.95)
+DEFAULT_COVERAGE = 0.9
+
+# The simulator shows the XGBoost model's prediction on raw FEATURE_COLUMNS; its row is keyed by registry name
+SERVED = 'xgboost'
+
+def calibration_version():
+    """Hashes of everything the table depends on: the served XGBoost model, the ensemble and the stations CSV."""
+    return pipeline_version() + (file_hash(artifact_path('ensemble')), file_hash(csv_path('stations')))
+
+def conformal_quantile(scores, coverage):
+    """
+    The split-conformal half-width for absolute residuals at a coverage level.
+
+    This is the ceil((n + 1) * coverage)-th smallest score, so a new point is
+    covered with probability at least `coverage` when it is exchangeable with
+    the calibration rows; infinite when there are too few rows for that level.
+    """
+    scores = np.sort(np.asarray(scores, dtype=np.float64))
+    rank = math.ceil((len(scores) + 1) * coverage)
+    return float(scores[rank - 1]) if rank <= len(scores) else math.inf
+
+def member_predictions(ensemble, X):
+    """
+    Predictions of every estimator in a VotingRegressor and of the ensemble itself.
+
+    transform() runs all the estimators over the batch in one pass; the ensemble's
+    prediction is their (weighted) average, exactly as predict() computes it.
+    """
+    members = ensemble.transform(X)
+    predictions = {name: members[:, i] for i, (name, _) in enumerate(ensemble.estimators)}
+    predictions['ensemble'] = np.average(members, axis=1, weights=ensemble.weights)
+    return predictions
+
+class ConformalCalibration:
+    """
+    Prediction-interval half-widths per predictor and coverage level.
+
+    An interval is the point prediction plus or minus the half-width, clipped at
+    zero ridership, so adding one to a prediction is a dictionary lookup.
+    """
+
+    def __init__(self, half_widths, rows, version):
+        self.half_widths = {predictor: {float(level): float(width) for level, width in widths.items()}
+                            for predictor, widths in half_widths.items()}
+        self.rows = rows
+        self.version = tuple(version)
+
+    def interval(self, prediction, coverage=DEFAULT_COVERAGE, predictor=SERVED):
+        """(low, high) bounds around a point prediction."""
+        half_width = self.half_widths[predictor][coverage]
+        return max(0.0, prediction - half_width), prediction + half_width
+
+def calibrate(levels=COVERAGE_LEVELS, random_state=RANDOM_STATE):
+    """
+    Build the table from the held-out split with the current models.
+
+    The served predictions come from one batched call to the same raw-feature
+    engine the simulator uses, so each interval is centred and calibrated on the
+    number the page shows; those of the ensemble and its members come from one
+    pass over the ensemble.
+    """
+    X, y = held_out_data(random_state)
+    y = np.asarray(y, dtype=np.float64)
+    predictions = {SERVED: predict_ridership_batch(X[FEATURE_COLUMNS].to_numpy(dtype=np.float64))}
+    predictions.update(member_predictions(get_model('ensemble'), X))
+    half_widths = {
+        predictor: {level: conformal_quantile(np.abs(y - predicted), level) for level in levels}
+        for predictor, predicted in predictions.items()
+    }
+    return ConformalCalibration(half_widths, len(y), calibration_version())
+
+def save_calibration(calibration):
+    """Write the table atomically next to the models."""
+    metadata = {
+        'version': list(calibration.version),
+        'rows': calibration.rows,
+        'half_widths': {predictor: {str(level): width for level, width in widths.items()}
+                        for predictor, widths in calibration.half_widths.items()}
+    }
+    tmp_path = f'{CALIBRATION_FILE}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp_path, CALIBRATION_FILE)
+
+def load_calibration():
+    """Load the saved table, or return None if it is missing or was built for other artifacts."""
+    try:
+        with open(CALIBRATION_FILE, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if tuple(metadata['version']) != calibration_version():
+        return None
+    return ConformalCalibration(metadata['half_widths'], metadata['rows'], metadata['version'])
+
+_calibration_lock = threading.Lock()
+_calibration = None
+_calibration_key = None
+
+def get_calibration():
+    """
+    Return the process-wide calibration table, or None if none has been built
+    for the current models and data.
+    """
+    global _calibration, _calibration_key
+    key = calibration_version()
+    if os.path.exists(CALIBRATION_FILE):
+        key += (os.stat(CALIBRATION_FILE).st_mtime_ns,)
+    if key == _calibration_key:
+        return _calibration
+    with _calibration_lock:
+        if key != _calibration_key:
+            _calibration = load_calibration()
+            _calibration_key = key
+        return _calibration
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the simulator's prediction intervals on the held-out split (run from the src directory).")
+    parser.parse_args()
+
+    start = time.perf_counter()
+    calibration = calibrate()
+    save_calibration(calibration)
+    print(f"Wrote {CALIBRATION_FILE} from {calibration.rows} held-out rows in {time.perf_counter() - start:.2f}s")
+    print(f"{'predictor':12s}" + ''.join(f"{f'±{level:.0%}':>12s}" for level in COVERAGE_LEVELS))
+    for predictor, widths in calibration.half_widths.items():
+        print(f"{predictor:12s}" + ''.join(f"{widths[level]:12,.0f}" for level in COVERAGE_LEVELS))
+
+if __name__ == "__main__":
+    main()
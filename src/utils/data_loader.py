@@ -1,11 +1,153 @@
-import pandas as pd
 import os
+import threading
+import time
+import pyarrow as pa
+from utils.file_utils import file_hash
+from utils.instrumentation import LOAD_SECONDS, record_cache
+
+DATA_DIR = 'data'
+
+# Source CSV of each dataset, relative to DATA_DIR
+DATASET_FILES = {
+    'stations': 'delhi_metro_final.csv',
+    'hourly': 'hourly_ridership.csv',
+    'model_metrics': 'model_performance_metrics.csv'
+}
+
+HOURLY_COLUMNS = [f'{day_type}_{hour}' for hour in range(24) for day_type in ('Weekday', 'Weekend')]
+
+# Typed schema of each dataset's Arrow file
+SCHEMAS = {
+    'stations': pa.schema([
+        ('ID (Station ID)', pa.float64()),
+        ('Station Names', pa.string()),
+        ('Dist. From First Station(km)', pa.float64()),
+        ('Metro Line', pa.string()),
+        ('Opened(Year)', pa.string()),
+        ('Layout', pa.string()),
+        ('Latitude', pa.float64()),
+        ('Longitude', pa.float64()),
+        ('Opening_Year', pa.int64()),
+        ('Station_Age', pa.int64()),
+        ('Metro_Line_Encoded', pa.int64()),
+        ('Connectivity', pa.int64()),
+        ('Station_Density', pa.int64()),
+        ('Daily_Ridership', pa.int64()),
+        ('Ridership_Category', pa.string())
+    ]),
+    'hourly': pa.schema(
+        [
+            ('Station_ID', pa.float64()),
+            ('Station_Name', pa.string()),
+            ('Metro_Line', pa.string()),
+            ('Daily_Ridership', pa.int64())
+        ] + [(col, pa.int32()) for col in HOURLY_COLUMNS]
+    ),
+    'model_metrics': pa.schema([
+        ('Model', pa.string()),
+        ('RMSE', pa.float64()),
+        ('MAE', pa.float64()),
+        ('R² Score', pa.float64())
+    ])
+}
+
+# Key under which the source CSV hash is stored in the Arrow schema metadata
+SOURCE_HASH_KEY = b'source_sha256'
+
+_store_lock = threading.Lock()
+_tables = {}
+
+def csv_path(name):
+    return os.path.join(DATA_DIR, DATASET_FILES[name])
+
+def arrow_path(name):
+    return os.path.splitext(csv_path(name))[0] + '.arrow'
+
+def read_source_csv(name):
+    """Read a dataset's CSV and cast it to its typed schema."""
+    import pandas as pd
+    df = pd.read_csv(csv_path(name))
+    if 'Unnamed: 0' in df.columns:
+        df = df.drop(columns=['Unnamed: 0'])
+    schema = SCHEMAS[name]
+    return pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+def build_arrow_file(name):
+    """
+    Convert a dataset's CSV into a typed Arrow IPC file next to it.
+
+    The CSV's content hash is stored in the schema metadata so the file is rebuilt
+    whenever the CSV changes. The file is written atomically.
+    """
+    table = read_source_csv(name)
+    table = table.replace_schema_metadata({SOURCE_HASH_KEY: file_hash(csv_path(name)).encode()})
+    path = arrow_path(name)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+def _open_arrow_file(path):
+    """Memory-map an Arrow IPC file; column buffers are paged in only when read."""
+    source = pa.memory_map(path, 'r')
+    return pa.ipc.open_file(source).read_all()
+
+def _load_full_table(name):
+    csv_exists = os.path.exists(csv_path(name))
+    source_hash = file_hash(csv_path(name)).encode() if csv_exists else None
+    path = arrow_path(name)
+    key = (name, source_hash)
+    table = _tables.get(key)
+    if table is not None:
+        record_cache('dataset', True)
+        return table
+    with _store_lock:
+        table = _tables.get(key)
+        record_cache('dataset', table is not None)
+        if table is not None:
+            return table
+        start = time.perf_counter()
+        if os.path.exists(path):
+            table = _open_arrow_file(path)
+            metadata = table.schema.metadata or {}
+            if csv_exists and metadata.get(SOURCE_HASH_KEY) != source_hash:
+                table = None
+        elif not csv_exists:
+            raise FileNotFoundError(f"Neither '{csv_path(name)}' nor '{path}' exists.")
+        if table is None:
+            try:
+                table = _open_arrow_file(build_arrow_file(name))
+            except OSError:
+                # Read-only data directory: serve the typed table from memory instead
+                table = read_source_csv(name)
+        LOAD_SECONDS.labels(kind='data', name=name).observe(time.perf_counter() - start)
+        for stale_key in [k for k in _tables if k[0] == name]:
+            del _tables[stale_key]
+        _tables[key] = table
+    return table
+
+def load_table(name, columns=None):
+    """
+    Return a dataset as a memory-mapped Arrow table, optionally projected to columns.
+
+    Tables are shared process-wide and keyed by the source CSV's content hash.
+    """
+    table = _load_full_table(name)
+    if columns is not None:
+        table = table.select(list(columns))
+    return table
+
+def load_dataset(name, columns=None):
+    """Return a dataset ('stations', 'hourly' or 'model_metrics') as a DataFrame."""
+    return load_table(name, columns).to_pandas()
 
 def load_data():
     """Load the datasets for the Delhi Metro Ridership Prediction project."""
-    delhi_metro_data = pd.read_csv(os.path.join('data', 'delhi_metro_data.csv'))
-    hourly_ridership_data = pd.read_csv(os.path.join('data', 'hourly_ridership_data.csv'))
-    
+    delhi_metro_data = load_dataset('stations')
+    hourly_ridership_data = load_dataset('hourly')
+
     return delhi_metro_data, hourly_ridership_data
 
 def preprocess_data(df):
@@ -13,12 +155,12 @@ def preprocess_data(df):
     # Example preprocessing steps
     df['Station Names'] = df['Station Names'].str.title()
     df['Daily_Ridership'] = df['Daily_Ridership'].astype(int)
-    
+
     return df
 
 def load_and_preprocess_data():
     """Load and preprocess the datasets."""
     delhi_metro_data, hourly_ridership_data = load_data()
     delhi_metro_data = preprocess_data(delhi_metro_data)
-    
-    return delhi_metro_data, hourly_ridership_data
\ No newline at end of file
+
+    return delhi_metro_data, hourly_ridership_data
@@ -0,0 +1,130 @@
+import json
+import numpy as np
+
+# Batches up to this size are traversed in NumPy; larger ones use XGBoost's in-place predict
+NUMPY_TRAVERSAL_MAX_ROWS = 256
+
+def fold_thresholds(thresholds):
+    """
+    Map float32 split thresholds to float64 values that route raw rows the same way.
+
+    XGBoost sends a row left when float32(x) < threshold. For each threshold this
+    bisects for the smallest float64 x where that no longer holds, so `x < folded`
+    routes every float64 input exactly as XGBoost's float32 conversion would.
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float32)
+    if len(thresholds) == 0:
+        return np.empty(0)
+
+    def goes_right(x):
+        return x.astype(np.float32) >= thresholds
+
+    estimate = thresholds.astype(np.float64)
+    width = np.abs(estimate) * 1e-6 + 1e-6
+    low, high = estimate - width, estimate + width
+    # Bisect between a value that goes left and one that goes right down to adjacent floats
+    for _ in range(200):
+        mid = low + (high - low) / 2
+        active = (mid > low) & (mid < high)
+        if not active.any():
+            break
+        right = goes_right(mid)
+        high = np.where(active & right, mid, high)
+        low = np.where(active & ~right, mid, low)
+    return high
+
+class CompiledTreeEnsemble:
+    """
+    Array-backed copy of a gbtree regression model, for predicting raw feature rows.
+
+    All trees are flattened into shared node arrays. Leaves point to themselves, so
+    every row can be advanced one level per step for max_depth steps with plain
+    NumPy gathers. Split thresholds are folded to float64, so float64 rows are
+    compared directly, without sklearn validation or building a DMatrix.
+    """
+
+    def __init__(self, booster, left, right, feature, threshold, default_left, value, roots, base_score, max_depth, n_features):
+        self.booster = booster
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.base_score = base_score
+        self.max_depth = max_depth
+        self.n_features = n_features
+
+    @classmethod
+    def from_xgboost(cls, model):
+        """Compile a fitted XGBRegressor (gbtree, squared error)."""
+        booster = model.get_booster()
+        learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+        if learner['gradient_booster']['name'] != 'gbtree' or learner['objective']['name'] != 'reg:squarederror':
+            raise ValueError("Only gbtree models with the reg:squarederror objective can be compiled.")
+        n_features = int(learner['learner_model_param']['num_feature'])
+        base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+
+        left, right, feature, threshold, default_left, value, roots = [], [], [], [], [], [], []
+        max_depth, offset = 0, 0
+        for tree in learner['gradient_booster']['model']['trees']:
+            tree_left = np.asarray(tree['left_children'], dtype=np.int64)
+            tree_right = np.asarray(tree['right_children'], dtype=np.int64)
+            n_nodes = len(tree_left)
+            leaf = tree_left == -1
+            node_ids = np.arange(n_nodes) + offset
+            left.append(np.where(leaf, node_ids, tree_left + offset))
+            right.append(np.where(leaf, node_ids, tree_right + offset))
+            feature.append(np.where(leaf, 0, np.asarray(tree['split_indices'], dtype=np.int64)))
+            threshold.append(np.asarray(tree['split_conditions'], dtype=np.float32))
+            default_left.append(np.asarray(tree['default_left'], dtype=bool))
+            # For leaves, split_conditions holds the leaf value
+            value.append(np.where(leaf, np.asarray(tree['split_conditions'], dtype=np.float32), 0))
+            roots.append(offset)
+            depth = np.zeros(n_nodes, dtype=np.int64)
+            for node in range(n_nodes):
+                if not leaf[node]:
+                    depth[tree_left[node]] = depth[tree_right[node]] = depth[node] + 1
+            max_depth = max(max_depth, int(depth.max()))
+            offset += n_nodes
+
+        left, right, feature = np.concatenate(left), np.concatenate(right), np.concatenate(feature)
+        split_threshold = np.concatenate(threshold)
+        leaf = left == np.arange(len(left))
+        folded = np.full(len(left), np.inf)
+        folded[~leaf] = fold_thresholds(split_threshold[~leaf])
+        return cls(
+            booster, left, right, feature, folded, np.concatenate(default_left),
+            np.concatenate(value).astype(np.float32), np.asarray(roots, dtype=np.int64),
+            np.float32(base_score), max_depth, n_features
+        )
+
+    def leaf_indices(self, X):
+        """Node index reached in every tree, shape (rows, trees)."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features)
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        rows = np.arange(len(X))[:, None]
+        has_missing = np.isnan(X).any()
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = x < self.threshold[nodes]
+            if has_missing:
+                go_left |= np.isnan(x) & self.default_left[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict(self, X):
+        """
+        Predict raw feature rows, bit-identical to the XGBoost model.
+
+        Leaf values are accumulated in float32 starting from the base score, one tree
+        at a time (cumsum is sequential), matching XGBoost's own summation order.
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features)
+        if len(X) > NUMPY_TRAVERSAL_MAX_ROWS:
+            return self.booster.inplace_predict(X)
+        terms = np.empty((len(X), len(self.roots) + 1), dtype=np.float32)
+        terms[:, 0] = self.base_score
+        terms[:, 1:] = self.value[self.leaf_indices(X)]
+        return np.cumsum(terms, axis=1)[:, -1]
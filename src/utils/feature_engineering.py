@@ -0,0 +1,139 @@
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils.model_utils import FEATURE_COLUMNS, get_line_encoder
+from utils.data_loader import load_dataset
+from utils.network_graph import MetroNetwork
+from utils.spatial_index import EARTH_RADIUS_KM, SpatialIndex
+
+# Radius used for the Station_Density feature
+DENSITY_RADIUS_KM = 2
+
+# Raw station attributes the features are derived from
+RAW_COLUMNS = [
+    'Station Names',
+    'Metro Line',
+    'Opened(Year)',
+    'Dist. From First Station(km)',
+    'Latitude',
+    'Longitude'
+]
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorized haversine distance in km; inputs broadcast like NumPy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def extract_opening_year(opened):
+    """Extract the opening year from 'Opened(Year)' values such as '08-03-2019' or '2019'."""
+    opened = pd.Series(opened).astype(str).str.strip()
+    years = pd.to_datetime(opened, format='%d-%m-%Y', errors='coerce').dt.year
+    fallback = pd.to_numeric(opened.str[-4:], errors='coerce')
+    return years.fillna(fallback)
+
+class StationFeatureTransformer:
+    """
+    Computes the seven model features from raw station attributes.
+
+    fit() records the reference network (station coordinates and the lines serving
+    each station name) and the line encoder. transform() then derives the features
+    for any stations, new or existing, against that network:
+
+    - Station_Age: reference_year - opening year
+    - Metro_Line_Encoded: the fitted LabelEncoder applied to 'Metro Line'
+    - Connectivity: number of distinct lines serving the station name, read from
+      the platforms of the station in the network graph
+    - Station_Density: number of reference stations within DENSITY_RADIUS_KM,
+      counted with the station SpatialIndex instead of a pairwise loop
+    """
+
+    def __init__(self, line_encoder=None, reference_year=None, radius_km=DENSITY_RADIUS_KM):
+        self.line_encoder = line_encoder
+        self.reference_year = reference_year
+        self.radius_km = radius_km
+
+    def fit(self, stations):
+        stations = pd.DataFrame(stations)
+        if self.reference_year is None:
+            self.reference_year = datetime.now().year
+        if self.line_encoder is None:
+            from sklearn.preprocessing import LabelEncoder
+            self.line_encoder = LabelEncoder().fit(stations['Metro Line'])
+        self.index_ = SpatialIndex(stations['Latitude'].to_numpy(), stations['Longitude'].to_numpy())
+        self.network_ = MetroNetwork.from_stations(stations)
+        return self
+
+    def fit_transform(self, stations):
+        """Fit on the reference network and return its features, excluding each station from its own density."""
+        self.fit(stations)
+        return self.transform(stations, in_reference=True)
+
+    @property
+    def line_classes(self):
+        return list(self.line_encoder.classes_)
+
+    def station_density(self, latitude, longitude, in_reference=False):
+        """
+        Count reference stations within radius_km of each point.
+
+        Set in_reference when the points are themselves part of the fitted network so
+        each station does not count itself.
+        """
+        counts = self.index_.count_within(latitude, longitude, self.radius_km)
+        if in_reference:
+            counts = counts - 1
+        return counts
+
+    def connectivity(self, stations):
+        """Number of distinct lines serving each station name across the reference network and the given rows."""
+        counts = self.network_.lines_per_station()
+        # Lines the given rows add to a station (or a new station) on top of the reference network
+        pairs = stations[['Station Names', 'Metro Line']].drop_duplicates()
+        new = pairs.merge(self.network_.station_lines, how='left', indicator=True)['_merge'] == 'left_only'
+        added = pairs['Station Names'][new.to_numpy()].value_counts()
+        counts = counts.add(added, fill_value=0).astype(int)
+        return stations['Station Names'].map(counts).to_numpy()
+
+    def transform(self, stations, in_reference=False):
+        """Return a DataFrame of FEATURE_COLUMNS for the given raw station rows."""
+        stations = pd.DataFrame(stations)
+        if 'Opening_Year' in stations:
+            opening_year = stations['Opening_Year']
+        else:
+            opening_year = extract_opening_year(stations['Opened(Year)'])
+        features = pd.DataFrame(index=stations.index)
+        features['Station_Age'] = (self.reference_year - opening_year.to_numpy()).astype(int)
+        features['Metro_Line_Encoded'] = self.line_encoder.transform(stations['Metro Line'])
+        features['Dist. From First Station(km)'] = stations['Dist. From First Station(km)'].astype(float)
+        features['Latitude'] = stations['Latitude'].astype(float)
+        features['Longitude'] = stations['Longitude'].astype(float)
+        features['Connectivity'] = self.connectivity(stations)
+        features['Station_Density'] = self.station_density(
+            stations['Latitude'].to_numpy(), stations['Longitude'].to_numpy(), in_reference=in_reference
+        )
+        return features[FEATURE_COLUMNS]
+
+_transformer_lock = threading.Lock()
+_transformer = None
+
+def get_feature_transformer():
+    """
+    Return the transformer fitted on the station network the models were trained on.
+
+    The reference year is taken from the dataset (Opening_Year + Station_Age) so that
+    Station_Age matches the training data, and the line encoder comes from the model
+    registry. The fitted transformer is shared process-wide.
+    """
+    global _transformer
+    with _transformer_lock:
+        if _transformer is None:
+            stations = load_dataset('stations', columns=RAW_COLUMNS + ['Opening_Year', 'Station_Age'])
+            reference_year = int((stations['Opening_Year'] + stations['Station_Age']).mode()[0])
+            _transformer = StationFeatureTransformer(
+                line_encoder=get_line_encoder(), reference_year=reference_year
+            ).fit(stations)
+        return _transformer
@@ -0,0 +1,87 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from utils.instrumentation import record_cache
+
+# Rendered images kept in memory, least recently used first out
+FIGURE_CACHE_SIZE = 256
+
+_cache_lock = threading.Lock()
+_cache = OrderedDict()
+
+# Matplotlib's text layout and font caches are shared by every figure and are not thread-safe,
+# so drawing is serialized process-wide. This caps uncached renders at one at a time across all
+# sessions (about 0.2 s each, roughly 5/s); cache hits never take the lock.
+_render_lock = threading.Lock()
+
+def data_hash(*objects):
+    """
+    Content hash of the data a figure is drawn from.
+
+    DataFrames, Series and arrays are hashed by value; other objects by repr.
+    """
+    digest = hashlib.sha256()
+    for obj in objects:
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+            digest.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        elif isinstance(obj, np.ndarray):
+            digest.update(f'{obj.dtype}{obj.shape}'.encode())
+            digest.update(np.ascontiguousarray(obj).tobytes())
+        else:
+            digest.update(repr(obj).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def draw_figure(draw, *data, figsize=(12, 6), dpi=100, fmt='png', **params):
+    """
+    Draw a figure with draw(fig, *data, **params) and return the encoded image bytes.
+
+    The Figure is created directly rather than through pyplot, so it is never registered
+    in pyplot's global figure list; it is cleared once saved, even if drawing fails.
+    Drawing and saving hold _render_lock, so concurrent calls run one after another.
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    buffer = io.BytesIO()
+    try:
+        with _render_lock:
+            draw(fig, *data, **params)
+            fig.savefig(buffer, format=fmt, bbox_inches='tight')
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+def render_figure(draw, *data, figsize=(12, 6), dpi=100, fmt='png', **params):
+    """
+    Cached draw_figure: image bytes keyed by the drawing function, a hash of the data and every plot parameter.
+
+    Safe to call from many sessions at once; concurrent misses on the same key may
+    both draw, but only one result is kept. Misses queue on the process-wide render
+    lock, so throughput under load depends on the cache hit rate.
+    """
+    key = (
+        f'{draw.__module__}.{draw.__qualname__}', data_hash(*data),
+        tuple(sorted((name, repr(value)) for name, value in params.items())), figsize, dpi, fmt
+    )
+    with _cache_lock:
+        image = _cache.get(key)
+        if image is not None:
+            _cache.move_to_end(key)
+    record_cache('figure', image is not None)
+    if image is None:
+        image = draw_figure(draw, *data, figsize=figsize, dpi=dpi, fmt=fmt, **params)
+        with _cache_lock:
+            _cache[key] = image
+            while len(_cache) > FIGURE_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return image
+
+def clear_figure_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,24 @@
+import hashlib
+import os
+
+_hash_cache = {}
+
+def file_hash(path):
+    """
+    Return the SHA-256 of a file's contents.
+
+    The digest is memoized on (mtime, size) so repeated lookups of an unchanged
+    file do not re-read it.
+    """
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _hash_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    content_hash = digest.hexdigest()
+    _hash_cache[path] = (signature, content_hash)
+    return content_hash
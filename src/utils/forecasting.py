@@ -0,0 +1,122 @@
+import threading
+import numpy as np
+from utils.ingestion import ENTRY, IST_OFFSET_SECONDS, SECONDS_PER_HOUR
+from utils.ridership_cube import HOURS, get_ridership_cube
+
+# Smoothing factors of the station level and of the hourly seasonal profiles
+LEVEL_ALPHA = 0.2
+SEASONAL_GAMMA = 0.05
+
+# Days covered by the cached forecast table
+FORECAST_DAYS = 7
+
+# 1970-01-01 was a Thursday (datetime.weekday() == 3)
+EPOCH_WEEKDAY = 3
+
+def local_hours(epoch_hours, utc_offset_seconds=IST_OFFSET_SECONDS):
+    """(day type index, hour of day) in local time for each UTC epoch hour."""
+    local = (np.asarray(epoch_hours, dtype=np.int64) * SECONDS_PER_HOUR + utc_offset_seconds) // SECONDS_PER_HOUR
+    weekday = (local // HOURS + EPOCH_WEEKDAY) % 7
+    return (weekday >= 5).astype(np.int64), local % HOURS
+
+class HourlyForecaster:
+    """
+    Per-station, per-hour ridership forecasts for every station at once.
+
+    A multiplicative Holt-Winters model without trend, kept as arrays: a level per
+    station (1.0 means "as the profile says") and a (stations, 2, 24) seasonal
+    profile seeded from the ridership cube. A forecast is level x seasonal for the
+    hour's local day type and hour of day, so a whole table is a single gather.
+    Observed hours update every station in one vectorized step; the forecast table
+    is recomputed only after an update or when the start hour moves.
+    """
+
+    def __init__(self, profile, station_index, level_alpha=LEVEL_ALPHA, seasonal_gamma=SEASONAL_GAMMA, utc_offset_seconds=IST_OFFSET_SECONDS):
+        self.seasonal = np.asarray(profile, dtype=np.float64).copy()
+        self.level = np.ones(len(self.seasonal))
+        self.station_index = station_index
+        self.level_alpha = level_alpha
+        self.seasonal_gamma = seasonal_gamma
+        self.utc_offset_seconds = utc_offset_seconds
+        self.last_observed_hour = -1
+        self.version = 0
+        self._table = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_cube(cls, cube, **kwargs):
+        return cls(cube.counts, cube.station_index, **kwargs)
+
+    def update(self, epoch_hour, observed):
+        """
+        Apply the observed ridership of every station for one completed UTC epoch hour.
+
+        observed has one value per station; NaN marks stations without data, which
+        are left unchanged. Hours at or before the last applied hour are ignored.
+        """
+        observed = np.asarray(observed, dtype=np.float64)
+        day_type, hour = local_hours(epoch_hour, self.utc_offset_seconds)
+        with self._lock:
+            if epoch_hour <= self.last_observed_hour:
+                return
+            seasonal = self.seasonal[:, day_type, hour]
+            known = ~np.isnan(observed) & (seasonal > 0)
+            ratio = np.divide(observed, seasonal, out=np.ones_like(observed), where=known)
+            self.level = np.where(known, self.level_alpha * ratio + (1 - self.level_alpha) * self.level, self.level)
+            level = np.where(known & (self.level > 0), self.level, 1.0)
+            updated = self.seasonal_gamma * observed / level + (1 - self.seasonal_gamma) * seasonal
+            self.seasonal[:, day_type, hour] = np.where(known, updated, seasonal)
+            self.last_observed_hour = int(epoch_hour)
+            self.version += 1
+
+    def sync(self, counter):
+        """
+        Apply every completed hour in a TapCounter that has not been applied yet.
+
+        Entries are taken as ridership. The counter's latest hour is still filling
+        up, so it is left for a later call. Returns the number of hours applied.
+        """
+        hours, counts = counter.completed_hours(self.last_observed_hour)
+        for hour, observed in zip(hours, counts[..., ENTRY]):
+            self.update(int(hour), observed)
+        return len(hours)
+
+    def forecast_table(self, start_hour, days=FORECAST_DAYS):
+        """
+        Forecasts of shape (stations, days * 24) for the UTC epoch hours from start_hour on.
+
+        The table is cached and reused until the model is updated or start_hour changes.
+        """
+        with self._lock:
+            key = (self.version, int(start_hour), days)
+            if self._table is None or self._table[0] != key:
+                day_type, hour = local_hours(np.arange(start_hour, start_hour + days * HOURS), self.utc_offset_seconds)
+                table = self.level[:, None] * self.seasonal[:, day_type, hour]
+                self._table = (key, np.maximum(table, 0).round().astype(np.int64))
+            return self._table[1]
+
+    def station_forecast(self, station_name, start_hour, hours=6):
+        """Forecasts for one station over the given number of hours from start_hour."""
+        try:
+            row = self.station_index[station_name]
+        except KeyError:
+            raise ValueError(f"Station '{station_name}' not found in the data.") from None
+        days = max(FORECAST_DAYS, -(-hours // HOURS))
+        return self.forecast_table(start_hour, days)[row, :hours]
+
+_forecaster_lock = threading.Lock()
+_forecaster_cache = {}
+
+def get_forecaster():
+    """Return the process-wide forecaster, rebuilt when the ridership cube changes."""
+    cube = get_ridership_cube()
+    with _forecaster_lock:
+        cached = _forecaster_cache.get('hourly')
+        if cached is None or cached[0] is not cube:
+            cached = (cube, HourlyForecaster.from_cube(cube))
+            _forecaster_cache['hourly'] = cached
+        return cached[1]
+
+def current_epoch_hour(now):
+    """UTC epoch hour of a timezone-aware datetime."""
+    return int(now.timestamp()) // SECONDS_PER_HOUR
@@ -0,0 +1,188 @@
+import argparse
+import datetime
+import functools
+import hashlib
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from utils.data_loader import DATA_DIR
+from utils.streaming_stats import IntegerHistogram, RunningMoments, describe
+
+# Directory of the partitioned ridership history, as written by utils.synthetic_data
+HISTORY_DIR = os.environ.get('METRO_HISTORY_DIR', os.path.join(DATA_DIR, 'history'))
+
+# Rows per scanned batch and batches read ahead; together they bound peak memory
+SCAN_BATCH_ROWS = 1 << 20
+SCAN_BATCH_READAHEAD = 2
+
+DAY_TYPES = ('Weekday', 'Weekend')
+HOURS = 24
+
+class HistoryAggregates:
+    """
+    Streaming aggregates of hourly ridership, one set per day type.
+
+    Holds running moments and an exact integer histogram of Ridership, plus the
+    ridership sum and row count per hour of day. Memory does not depend on the
+    number of rows folded in.
+    """
+
+    def __init__(self):
+        self.moments = [RunningMoments() for _ in DAY_TYPES]
+        self.histograms = [IntegerHistogram() for _ in DAY_TYPES]
+        self.hourly_sum = np.zeros((len(DAY_TYPES), HOURS))
+        self.hourly_count = np.zeros((len(DAY_TYPES), HOURS), dtype=np.int64)
+        self.rows = 0
+
+    def update(self, batch):
+        ridership = batch.column('Ridership').to_numpy(zero_copy_only=False)
+        hour = batch.column('Hour').to_numpy(zero_copy_only=False).astype(np.int64)
+        weekend = _is_weekend(batch.column('Day_Type'))
+        for day_type in range(len(DAY_TYPES)):
+            values = ridership[weekend == day_type]
+            self.moments[day_type].update(values)
+            self.histograms[day_type].update(values)
+        bins = weekend * HOURS + hour
+        self.hourly_sum += np.bincount(bins, weights=ridership, minlength=len(DAY_TYPES) * HOURS).reshape(self.hourly_sum.shape)
+        self.hourly_count += np.bincount(bins, minlength=len(DAY_TYPES) * HOURS).reshape(self.hourly_count.shape)
+        self.rows += batch.num_rows
+
+    def summary(self):
+        """Summary statistics of hourly ridership, overall and per day type, like DataFrame.describe()."""
+        overall_moments, overall_histogram = RunningMoments(), IntegerHistogram()
+        for moments, histogram in zip(self.moments, self.histograms):
+            overall_moments.merge(moments)
+            overall_histogram.merge(histogram)
+        columns = {'All Days': describe(overall_moments, overall_histogram)}
+        for name, moments, histogram in zip(DAY_TYPES, self.moments, self.histograms):
+            columns[name] = describe(moments, histogram)
+        return pd.DataFrame(columns)
+
+    def hourly_curves(self):
+        """Mean ridership per hour of day, with 'Hour', 'Weekday' and 'Weekend' columns."""
+        means = np.divide(self.hourly_sum, self.hourly_count, out=np.full(self.hourly_sum.shape, np.nan), where=self.hourly_count > 0)
+        return pd.DataFrame({'Hour': np.arange(HOURS), 'Weekday': means[0], 'Weekend': means[1]})
+
+def _is_weekend(day_type):
+    """1 for 'Weekend' rows and 0 otherwise, for a plain or dictionary-encoded column."""
+    if pa.types.is_dictionary(day_type.type):
+        weekend = np.asarray(day_type.dictionary.to_pylist(), dtype=object) == 'Weekend'
+        return weekend[day_type.indices.to_numpy(zero_copy_only=False)].astype(np.int64)
+    return pc.equal(day_type, 'Weekend').to_numpy(zero_copy_only=False).astype(np.int64)
+
+class RidershipHistory:
+    """
+    A partitioned on-disk ridership history: stations.parquet and hive-partitioned hourly/ Parquet.
+
+    Aggregations scan the hourly dataset in batches with station, line and date
+    filters pushed down into the scan, so whole year/month partitions and row
+    groups outside the filters are never read.
+    """
+
+    def __init__(self, path=HISTORY_DIR):
+        self.path = path
+        self.hourly = ds.dataset(os.path.join(path, 'hourly'), format='parquet', partitioning='hive')
+        self.stations_path = os.path.join(path, 'stations.parquet')
+
+    def fingerprint(self):
+        """Hash of the dataset's file names, sizes and modification times."""
+        digest = hashlib.sha256()
+        for path in sorted(self.hourly.files + [self.stations_path]):
+            stat = os.stat(path)
+            digest.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+        return digest.hexdigest()[:16]
+
+    def station_ids(self, station_names):
+        """Station_IDs of the given station names, read with the name filter pushed down."""
+        table = pq.read_table(self.stations_path, columns=['Station_ID'], filters=[('Station Names', 'in', list(station_names))])
+        return table.column('Station_ID').to_pylist()
+
+    def lines(self):
+        return sorted(pc.unique(pq.read_table(self.stations_path, columns=['Metro Line']).column('Metro Line')).to_pylist())
+
+    def filter(self, stations=None, lines=None, start_date=None, end_date=None):
+        """
+        Scan filter for station names, metro lines and an inclusive date range.
+
+        Date bounds are also expressed on the year/month partition keys so that
+        partitions outside the range are pruned before any file is opened.
+        """
+        expression = ds.scalar(True)
+        if stations:
+            expression &= ds.field('Station_ID').isin(self.station_ids(stations))
+        if lines:
+            expression &= ds.field('Metro_Line').isin(list(lines))
+        year, month = ds.field('year'), ds.field('month')
+        if start_date is not None:
+            start_date = pd.Timestamp(start_date).date()
+            expression &= (year > start_date.year) | ((year == start_date.year) & (month >= start_date.month))
+            expression &= ds.field('Date') >= pa.scalar(start_date, pa.date32())
+        if end_date is not None:
+            end_date = pd.Timestamp(end_date).date()
+            expression &= (year < end_date.year) | ((year == end_date.year) & (month <= end_date.month))
+            expression &= ds.field('Date') <= pa.scalar(end_date, pa.date32())
+        return expression
+
+    def scan(self, expression, columns=('Ridership', 'Hour', 'Day_Type')):
+        """
+        Record batches of the filtered columns, at most SCAN_BATCH_ROWS rows each.
+
+        Files are scanned one at a time: a dataset-wide scanner reads ahead across
+        files faster than the batches are consumed, and its memory then grows with
+        the size of the history.
+        """
+        for fragment in self.hourly.get_fragments(filter=expression):
+            yield from fragment.to_batches(
+                schema=self.hourly.schema, columns=list(columns), filter=expression, batch_size=SCAN_BATCH_ROWS,
+                batch_readahead=SCAN_BATCH_READAHEAD
+            )
+
+    def aggregate(self, stations=None, lines=None, start_date=None, end_date=None):
+        """Stream the filtered history through a HistoryAggregates and return it."""
+        aggregates = HistoryAggregates()
+        for batch in self.scan(self.filter(stations, lines, start_date, end_date)):
+            aggregates.update(batch)
+        return aggregates
+
+def history_available(path=HISTORY_DIR):
+    return os.path.isdir(os.path.join(path, 'hourly')) and os.path.exists(os.path.join(path, 'stations.parquet'))
+
+@functools.lru_cache(maxsize=64)
+def _aggregate_cached(path, fingerprint, stations, lines, start_date, end_date):
+    return RidershipHistory(path).aggregate(stations, lines, start_date, end_date)
+
+def get_history_aggregates(stations=None, lines=None, start_date=None, end_date=None, path=HISTORY_DIR):
+    """
+    Aggregates of the history under path, cached per filter and dataset version.
+
+    A new or rewritten partition changes the fingerprint, so results are recomputed
+    rather than served stale.
+    """
+    # Rediscover the files every call, so new partitions are picked up
+    fingerprint = RidershipHistory(path).fingerprint()
+    key_stations = tuple(sorted(stations)) if stations else None
+    key_lines = tuple(sorted(lines)) if lines else None
+    return _aggregate_cached(path, fingerprint, key_stations, key_lines, start_date, end_date)
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate a partitioned ridership history out of core (run from src).")
+    parser.add_argument('path', nargs='?', default=HISTORY_DIR)
+    parser.add_argument('--station', action='append', help="Station name to include (repeatable).")
+    parser.add_argument('--line', action='append', help="Metro line to include (repeatable).")
+    parser.add_argument('--start-date', type=datetime.date.fromisoformat)
+    parser.add_argument('--end-date', type=datetime.date.fromisoformat)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    aggregates = RidershipHistory(args.path).aggregate(args.station, args.line, args.start_date, args.end_date)
+    print(f"Scanned {aggregates.rows:,} rows in {time.perf_counter() - start:.1f}s")
+    print(aggregates.summary().round(2).to_string())
+    print(aggregates.hourly_curves().round(1).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import base64
+import io
+import os
+import threading
+from PIL import Image
+from utils.file_utils import file_hash
+from utils.instrumentation import record_cache
+
+ASSETS_DIR = 'assets'
+ASSET_CACHE_DIR = os.path.join('data', 'asset_cache')
+
+# Graph directories served by the dashboard pages
+GRAPH_DIRS = [
+    os.path.join(ASSETS_DIR, 'data_analysis_graphs'),
+    os.path.join(ASSETS_DIR, 'model_analysis_graphs')
+]
+
+# Variant name -> (maximum width in pixels, WebP quality)
+IMAGE_VARIANTS = {
+    'thumbnail': (640, 75),
+    'full': (1200, 80)
+}
+
+_variants_lock = threading.Lock()
+_variants = {}
+_listings = {}
+
+def encode_image(source, variant):
+    """
+    Resize an image (a path or encoded bytes) to the variant's width and encode it as WebP.
+
+    Images narrower than the variant are only re-encoded, never enlarged.
+    """
+    max_width, quality = IMAGE_VARIANTS[variant]
+    with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as image:
+        image.load()
+        if image.width > max_width:
+            image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format='WEBP', quality=quality, method=6)
+    return buffer.getvalue()
+
+def data_uri(webp_bytes):
+    """
+    A data URI for WebP bytes.
+
+    st.image passes data URIs straight to the browser; raw bytes would be decoded and
+    re-encoded as PNG or JPEG on every rerun, undoing the compression.
+    """
+    return 'data:image/webp;base64,' + base64.b64encode(webp_bytes).decode('ascii')
+
+def _cache_file(path, digest, variant):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(ASSET_CACHE_DIR, f'{name}-{variant}-{digest[:16]}.webp')
+
+def _read_cached_variant(path, digest, variant):
+    try:
+        with open(_cache_file(path, digest, variant), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _write_cached_variant(path, digest, variant, data):
+    cache_path = _cache_file(path, digest, variant)
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    prefix = f'{os.path.splitext(os.path.basename(path))[0]}-{variant}-'
+    try:
+        os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+        # Keep only the current version of each variant on disk
+        for name in os.listdir(ASSET_CACHE_DIR):
+            if name.startswith(prefix) and name != os.path.basename(cache_path):
+                os.remove(os.path.join(ASSET_CACHE_DIR, name))
+    except OSError:
+        pass  # The cache is an optimisation; a read-only data directory just means re-encoding
+
+def image_variant(path, variant='thumbnail'):
+    """
+    Data URI of an image asset resized and encoded as the given variant.
+
+    Variants are keyed by the hash of the source file and looked up first in memory,
+    then in the on-disk cache, so each image is encoded once per content version.
+    """
+    digest = file_hash(path)
+    key = (path, variant)
+    with _variants_lock:
+        cached = _variants.get(key)
+    record_cache('image_asset_memory', cached is not None and cached[0] == digest)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+    data = _read_cached_variant(path, digest, variant)
+    record_cache('image_asset_disk', data is not None)
+    if data is None:
+        data = encode_image(path, variant)
+        _write_cached_variant(path, digest, variant, data)
+    uri = data_uri(data)
+    with _variants_lock:
+        _variants[key] = (digest, uri)
+    return uri
+
+def list_images(directory, exclude=()):
+    """Sorted PNG file paths in a directory, re-listed only when the directory changes."""
+    signature = os.stat(directory).st_mtime_ns
+    with _variants_lock:
+        cached = _listings.get(directory)
+    if cached is None or cached[0] != signature:
+        names = sorted(f for f in os.listdir(directory) if f.endswith('.png'))
+        cached = (signature, names)
+        with _variants_lock:
+            _listings[directory] = cached
+    return [os.path.join(directory, name) for name in cached[1] if name not in exclude]
+
+def graph_title(path):
+    """Readable title from a graph file name, e.g. 'Stations Per Metro Line'."""
+    return os.path.splitext(os.path.basename(path))[0].replace('_', ' ').title()
+
+def pregenerate_variants(directories=GRAPH_DIRS, variants=IMAGE_VARIANTS):
+    """Encode every variant of every graph into the on-disk cache. Returns {variant: (source bytes, encoded bytes)}."""
+    totals = {variant: [0, 0] for variant in variants}
+    for directory in directories:
+        for path in list_images(directory):
+            for variant in variants:
+                totals[variant][0] += os.path.getsize(path)
+                totals[variant][1] += len(base64.b64decode(image_variant(path, variant).split(',', 1)[1]))
+    return {variant: tuple(sizes) for variant, sizes in totals.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate the resized WebP variants of the dashboard graphs (run from src).")
+    parser.parse_args()
+    for variant, (source, encoded) in pregenerate_variants().items():
+        print(f"{variant:10s} {source / 1024:8.1f} KiB PNG -> {encoded / 1024:7.1f} KiB WebP ({encoded / source:.0%})")
+
+if __name__ == "__main__":
+    main()
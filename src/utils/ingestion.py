@@ -0,0 +1,297 @@
+import math
+import os
+import socket
+import threading
+import time
+import numpy as np
+
+SECONDS_PER_HOUR = 3600
+ENTRY, EXIT = 0, 1
+DIRECTIONS = ('entry', 'exit')
+IST_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+
+# Events stamped further than this from the local clock are dropped, so one bad timestamp cannot move the window
+MAX_CLOCK_SKEW_SECONDS = 3600
+
+class TapCounter:
+    """
+    Rolling per-station, per-hour entry/exit counters in bounded memory.
+
+    Counts live in a ring buffer of shape (window_hours, stations, 2) indexed by
+    absolute epoch hour modulo the window, so memory is fixed no matter how many
+    events arrive. Events older than the window, stamped more than max_skew_seconds
+    ahead of the clock, or with an unknown station or direction, are dropped. Batches are applied with a single np.bincount, which keeps ingestion well above 100k events/s.
+    """
+
+    def __init__(self, station_names, window_hours=24, max_skew_seconds=MAX_CLOCK_SKEW_SECONDS, clock=time.time):
+        self.station_names = list(station_names)
+        self.station_index = {}
+        for row, name in enumerate(self.station_names):
+            self.station_index.setdefault(name, row)
+        self.window_hours = window_hours
+        self.max_skew_seconds = max_skew_seconds
+        self.clock = clock
+        self.counts = np.zeros((window_hours, len(self.station_names), 2), dtype=np.int64)
+        self.slot_hours = np.full(window_hours, -1, dtype=np.int64)
+        self.latest_hour = -1
+        self.events = 0
+        self._lock = threading.Lock()
+
+    def ingest(self, timestamps, station_ids, directions):
+        """
+        Add a batch of events.
+
+        Parameters:
+        timestamps (array-like): Event times in epoch seconds.
+        station_ids (array-like): Station row index of each event.
+        directions (array-like): ENTRY (0) or EXIT (1) for each event.
+        """
+        hours = np.asarray(timestamps, dtype=np.int64) // SECONDS_PER_HOUR
+        station_ids = np.asarray(station_ids, dtype=np.int64)
+        directions = np.asarray(directions, dtype=np.int64)
+        if len(hours) == 0:
+            return
+        window, n_stations = self.window_hours, len(self.station_names)
+        now = self.clock()
+        newest_hour = int(now + self.max_skew_seconds) // SECONDS_PER_HOUR
+        oldest_hour = int(now - self.max_skew_seconds) // SECONDS_PER_HOUR - window
+        valid = ((station_ids >= 0) & (station_ids < n_stations) & ((directions == ENTRY) | (directions == EXIT))
+                 & (hours > oldest_hour) & (hours <= newest_hour))
+        with self._lock:
+            # Only events that are counted may advance the window
+            if valid.any():
+                self.latest_hour = max(self.latest_hour, int(hours[valid].max()))
+            keep = valid & (hours > self.latest_hour - window)
+            if not keep.all():
+                hours, station_ids, directions = hours[keep], station_ids[keep], directions[keep]
+            # Recycle any slot whose stored hour has fallen out of the window
+            for hour in np.unique(hours):
+                slot = hour % window
+                if self.slot_hours[slot] != hour:
+                    self.counts[slot] = 0
+                    self.slot_hours[slot] = hour
+            flat = ((hours % window) * n_stations + station_ids) * 2 + directions
+            self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+            self.events += len(flat)
+
+    def hour_counts(self, station_name, epoch_hour=None):
+        """(entries, exits) for a station in one epoch hour, defaulting to the latest hour seen."""
+        with self._lock:
+            hour = self.latest_hour if epoch_hour is None else epoch_hour
+            slot = hour % self.window_hours
+            if hour < 0 or self.slot_hours[slot] != hour:
+                return 0, 0
+            entries, exits = self.counts[slot, self.station_index[station_name]]
+        return int(entries), int(exits)
+
+    def recent_hours(self, station_name):
+        """
+        Entry/exit counts for a station over the window, oldest hour first.
+
+        Returns the epoch hours and an array of shape (window_hours, 2).
+        """
+        with self._lock:
+            hours = np.arange(self.latest_hour - self.window_hours + 1, self.latest_hour + 1)
+            slots = hours % self.window_hours
+            values = self.counts[slots, self.station_index[station_name]].copy()
+            values[self.slot_hours[slots] != hours] = 0
+        return hours, values
+
+    def completed_hours(self, after_hour=-1):
+        """
+        Counts of every station for the complete hours in the window after after_hour.
+
+        The latest hour is still filling up and is left out, as are hours without any
+        events. Returns the epoch hours and an array of shape (hours, stations, 2).
+        """
+        with self._lock:
+            hours = np.arange(max(after_hour + 1, self.latest_hour - self.window_hours + 1), self.latest_hour)
+            slots = hours % self.window_hours
+            present = self.slot_hours[slots] == hours
+            return hours[present], self.counts[slots[present]].copy()
+
+def synthetic_events(station_weights, hourly_weights=None, batch_size=65536, events_per_second=None, start_time=None, utc_offset_seconds=0, seed=42):
+    """
+    Yield synthetic (timestamps, station_ids, directions) batches.
+
+    Stations are drawn in proportion to station_weights and, when hourly_weights
+    (shape (stations, 24)) is given, to each station's profile for the batch's local
+    hour (UTC shifted by utc_offset_seconds).
+    With events_per_second set, batches are paced in real time from now; otherwise
+    timestamps advance at that nominal rate (or 100k/s) as fast as they can be drawn.
+    """
+    rng = np.random.default_rng(seed)
+    base = np.asarray(station_weights, dtype=np.float64)
+    rate = events_per_second or 100_000
+    clock = time.time() if start_time is None else start_time
+    while True:
+        weights = base
+        if hourly_weights is not None:
+            local_hour = int((clock + utc_offset_seconds) // SECONDS_PER_HOUR) % 24
+            weights = hourly_weights[:, local_hour].astype(np.float64)
+        cumulative = np.cumsum(weights)
+        station_ids = np.searchsorted(cumulative, rng.random(batch_size) * cumulative[-1], side='right')
+        duration = batch_size / rate
+        timestamps = clock + np.sort(rng.random(batch_size)) * duration
+        directions = rng.integers(0, 2, batch_size)
+        yield timestamps, station_ids, directions
+        clock += duration
+        if events_per_second:
+            time.sleep(max(0.0, clock - time.time()))
+
+def parse_event_lines(lines, station_index):
+    """
+    Parse 'timestamp,station,direction' lines into arrays.
+
+    station may be a row index or a station name and direction 0/1 or entry/exit.
+    Lines that cannot be parsed, have a non-finite timestamp or name unknown stations are skipped.
+    """
+    timestamps, station_ids, directions = [], [], []
+    for line in lines:
+        parts = line.strip().split(',')
+        if len(parts) != 3:
+            continue
+        ts, station, direction = parts
+        try:
+            station_id = int(station) if station.isdigit() else station_index[station]
+            direction = int(direction) if direction.isdigit() else DIRECTIONS.index(direction.lower())
+            ts = float(ts)
+        except (KeyError, ValueError):
+            continue
+        if not math.isfinite(ts):
+            continue
+        timestamps.append(ts)
+        station_ids.append(station_id)
+        directions.append(direction)
+    return np.array(timestamps), np.array(station_ids, dtype=np.int64), np.array(directions, dtype=np.int64)
+
+def tail_file_events(path, station_index, poll_interval=0.5, stop_event=None):
+    """Follow an event log like `tail -f`, yielding parsed batches of newly appended lines."""
+    while not os.path.exists(path):
+        if stop_event is not None and stop_event.is_set():
+            return
+        time.sleep(poll_interval)
+    with open(path, 'r', encoding='utf-8') as f:
+        f.seek(0, os.SEEK_END)
+        pending = ''
+        while stop_event is None or not stop_event.is_set():
+            chunk = f.read(1 << 20)
+            if not chunk:
+                time.sleep(poll_interval)
+                continue
+            pending += chunk
+            lines = pending.split('\n')
+            pending = lines.pop()
+            yield parse_event_lines(lines, station_index)
+
+def socket_events(host, port, station_index, stop_event=None):
+    """Accept line-oriented TCP connections on host:port, yielding parsed batches as data arrives."""
+    with socket.create_server((host, port)) as server:
+        server.settimeout(0.5)
+        while stop_event is None or not stop_event.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            with conn:
+                conn.settimeout(0.5)
+                pending = b''
+                while stop_event is None or not stop_event.is_set():
+                    try:
+                        data = conn.recv(1 << 20)
+                    except socket.timeout:
+                        continue
+                    if not data:
+                        break
+                    pending += data
+                    lines = pending.split(b'\n')
+                    pending = lines.pop()
+                    yield parse_event_lines([line.decode('utf-8', 'replace') for line in lines], station_index)
+
+class IngestionWorker(threading.Thread):
+    """
+    Background thread that feeds batches from any event source into a TapCounter.
+
+    If the source fails (a socket that cannot bind, a log file that cannot be
+    opened), the exception is kept in `error` and the thread ends.
+    """
+
+    def __init__(self, counter, source, name='tap-ingestion', source_spec=None):
+        super().__init__(name=name, daemon=True)
+        self.counter = counter
+        self.source = source
+        self.source_spec = source_spec
+        self.stop_event = threading.Event()
+        self.error = None
+
+    def run(self):
+        try:
+            for timestamps, station_ids, directions in self.source:
+                if self.stop_event.is_set():
+                    break
+                self.counter.ingest(timestamps, station_ids, directions)
+        except Exception as error:
+            self.error = error
+
+    def stop(self):
+        self.stop_event.set()
+
+_ingestion_lock = threading.Lock()
+_counter = None
+_worker = None
+
+def get_tap_counter():
+    """Return the process-wide TapCounter over the stations of the hourly dataset."""
+    global _counter
+    from utils.ridership_cube import get_ridership_cube
+    with _ingestion_lock:
+        if _counter is None:
+            _counter = TapCounter(get_ridership_cube().station_names)
+        return _counter
+
+def is_ingesting():
+    return _worker is not None and _worker.is_alive()
+
+def ingestion_error():
+    """The exception that stopped the ingestion worker, or None."""
+    return None if _worker is None else _worker.error
+
+def start_ingestion(source_spec='synthetic'):
+    """
+    Start the process-wide ingestion worker if it is not already running.
+
+    A worker that failed is not restarted for the same source_spec, so the error
+    stays visible through ingestion_error() instead of a new thread failing on
+    every rerun; restarting the server retries it.
+
+    source_spec selects the event source:
+    - 'synthetic': paced synthetic events following each station's hourly profile
+    - 'file:<path>': tail an event log
+    - 'socket:<host>:<port>': listen for events on a local TCP socket
+    """
+    global _worker
+    from utils.ridership_cube import get_ridership_cube
+    counter = get_tap_counter()
+    with _ingestion_lock:
+        if _worker is not None and (_worker.is_alive() or (_worker.error is not None and _worker.source_spec == source_spec)):
+            return _worker
+        stop_event = threading.Event()
+        if source_spec == 'synthetic':
+            cube = get_ridership_cube()
+            # Entries per second at network scale: one day's weekday ridership spread over the day
+            rate = max(1.0, cube.counts[:, 0].sum() / 86400 * 2)
+            source = synthetic_events(cube.counts[:, 0].sum(axis=1), hourly_weights=cube.counts[:, 0],
+                                      batch_size=64, events_per_second=rate, utc_offset_seconds=IST_OFFSET_SECONDS)
+        elif source_spec.startswith('file:'):
+            source = tail_file_events(source_spec[len('file:'):], counter.station_index, stop_event=stop_event)
+        elif source_spec.startswith('socket:'):
+            host, _, port = source_spec[len('socket:'):].rpartition(':')
+            if not host or not port.isdigit():
+                raise ValueError(f"Malformed event source '{source_spec}'.")
+            source = socket_events(host, int(port), counter.station_index, stop_event=stop_event)
+        else:
+            raise ValueError(f"Unknown event source '{source_spec}'.")
+        _worker = IngestionWorker(counter, source, source_spec=source_spec)
+        _worker.stop_event = stop_event
+        _worker.start()
+        return _worker
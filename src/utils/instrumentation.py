@@ -0,0 +1,176 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, start_http_server
+
+# Local port the metrics endpoint listens on; set METRO_METRICS_PORT=0 to disable it
+DEFAULT_METRICS_PORT = 9108
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+def _collector(cls, name, documentation, labelnames=(), **kwargs):
+    """
+    Create and register a metric.
+
+    Streamlit re-imports this module when its source changes, and the registry
+    rejects the second registration; the metric is then created unregistered, so
+    its values are not exported until the server is restarted.
+    """
+    try:
+        return cls(name, documentation, labelnames, **kwargs)
+    except ValueError:
+        return cls(name, documentation, labelnames, registry=None, **kwargs)
+
+PAGE_RENDER_SECONDS = _collector(
+    Histogram, 'metro_page_render_seconds', 'Time to render a dashboard page.',
+    ['page'], buckets=LATENCY_BUCKETS
+)
+LOAD_SECONDS = _collector(
+    Histogram, 'metro_load_seconds', 'Time to load a dataset or model artifact from disk.',
+    ['kind', 'name'], buckets=LATENCY_BUCKETS
+)
+INFERENCE_SECONDS = _collector(
+    Histogram, 'metro_inference_seconds', 'Latency of one model prediction call.',
+    ['model'], buckets=LATENCY_BUCKETS
+)
+INFERENCE_ROWS = _collector(
+    Counter, 'metro_inference_rows', 'Feature rows predicted.',
+    ['model']
+)
+CACHE_REQUESTS = _collector(
+    Counter, 'metro_cache_requests', 'Cache lookups by cache and result (hit or miss).',
+    ['cache', 'result']
+)
+SESSION_STATE_BYTES = _collector(
+    Histogram, 'metro_session_state_bytes',
+    'Approximate deep size of st.session_state values, observed on each rerun; excludes cached data, images and widget payloads.',
+    buckets=BYTES_BUCKETS
+)
+ACTIVE_SESSIONS = _collector(
+    Gauge, 'metro_active_sessions', 'Streamlit sessions seen in the last five minutes.'
+)
+WARMUP_SECONDS = _collector(
+    Histogram, 'metro_warmup_seconds', 'Time taken by each step of the background warm-up.',
+    ['step'], buckets=LATENCY_BUCKETS
+)
+
+@contextmanager
+def timer(histogram, **labels):
+    """Context manager that observes the elapsed time of its block in histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric = histogram.labels(**labels) if labels else histogram
+        metric.observe(time.perf_counter() - start)
+
+def record_cache(cache, hit, count=1):
+    """Count lookups in the named cache as hits or misses."""
+    if count:
+        CACHE_REQUESTS.labels(cache=cache, result='hit' if hit else 'miss').inc(count)
+
+def object_size(obj, _seen=None):
+    """Approximate deep size in bytes of containers, strings and arrays."""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = getattr(obj, 'nbytes', None)
+    if not isinstance(size, int):
+        size = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        size += sum(object_size(k, seen) + object_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(object_size(item, seen) for item in obj)
+    return size
+
+_sessions_lock = threading.Lock()
+_session_last_seen = {}
+SESSION_TTL_SECONDS = 300
+
+def record_session(session_id, state):
+    """
+    Observe the size of a session's st.session_state and update the active-session gauge.
+
+    Only the values held in session state are measured (object_size); data in
+    process-wide caches, rendered images and widget payloads are not, so this is
+    not a session's full memory cost.
+    """
+    SESSION_STATE_BYTES.observe(object_size(dict(state)))
+    now = time.time()
+    with _sessions_lock:
+        _session_last_seen[session_id] = now
+        for sid in [sid for sid, seen in _session_last_seen.items() if now - seen > SESSION_TTL_SECONDS]:
+            del _session_last_seen[sid]
+        ACTIVE_SESSIONS.set(len(_session_last_seen))
+
+_server_lock = threading.Lock()
+_server_port = None
+_server_error = None
+
+def start_metrics_server(port=None, addr='127.0.0.1'):
+    """
+    Expose the metrics on a local HTTP port, once per process.
+
+    The port defaults to METRO_METRICS_PORT or DEFAULT_METRICS_PORT. Returns the port,
+    or None if metrics are disabled or the port is taken by another process. A failed
+    bind is recorded (see metrics_server_error) and not retried on later reruns.
+    """
+    global _server_port, _server_error
+    with _server_lock:
+        if _server_port is not None or _server_error is not None:
+            return _server_port
+        if port is None:
+            port = int(os.environ.get('METRO_METRICS_PORT', DEFAULT_METRICS_PORT))
+        if port == 0:
+            return None
+        try:
+            start_http_server(port, addr=addr)
+        except OSError as error:
+            _server_error = error
+            return None
+        _server_port = port
+        return _server_port
+
+def metrics_server_error():
+    """The error that stopped the metrics endpoint from starting, or None."""
+    return _server_error
+
+def metrics_summary():
+    """
+    Summarise the dashboard metrics for display.
+
+    Returns {'histograms': [(metric, labels, count, mean_seconds)], 'caches': {cache: (hits, misses)},
+    'gauges': {metric: value}}.
+    """
+    histograms, caches, gauges = [], {}, {}
+    for metric in REGISTRY.collect():
+        if not metric.name.startswith('metro_'):
+            continue
+        if metric.type == 'histogram':
+            sums, counts = {}, {}
+            for sample in metric.samples:
+                key = tuple(sorted((k, v) for k, v in sample.labels.items() if k != 'le'))
+                if sample.name.endswith('_sum'):
+                    sums[key] = sample.value
+                elif sample.name.endswith('_count'):
+                    counts[key] = sample.value
+            for key, count in counts.items():
+                if count:
+                    histograms.append((metric.name, dict(key), int(count), sums.get(key, 0.0) / count))
+        elif metric.name == 'metro_cache_requests':
+            for sample in metric.samples:
+                if sample.name.endswith('_total'):
+                    hits, misses = caches.get(sample.labels['cache'], (0, 0))
+                    if sample.labels['result'] == 'hit':
+                        hits += int(sample.value)
+                    else:
+                        misses += int(sample.value)
+                    caches[sample.labels['cache']] = (hits, misses)
+        elif metric.type == 'gauge':
+            for sample in metric.samples:
+                gauges[sample.name] = sample.value
+    return {'histograms': histograms, 'caches': caches, 'gauges': gauges}
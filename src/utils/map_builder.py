@@ -0,0 +1,332 @@
+import functools
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import folium
+from folium.plugins import HeatMap
+from folium.template import Template
+import pandas as pd
+from utils.instrumentation import record_cache
+
+MAP_CACHE_DIR = os.path.join('data', 'map_cache')
+
+# Bump when the layer format changes so cached layers are regenerated
+LAYER_VERSION = 1
+
+MAP_CENTER = [28.6139, 77.2090]
+
+LINE_COLORS = {
+    'Red line': 'red',
+    'Yellow line': 'gold',
+    'Blue line': 'blue',
+    'Blue line branch': 'navy',
+    'Green line branch': 'forestgreen',
+    'Green line': 'green',
+    'Rapid Metro': 'silver',
+    'Voilet line': 'purple',
+    'Magenta line': 'magenta',
+    'Pink line': 'pink',
+    'Aqua line': 'skyblue',
+    'Gray line': 'gray',
+    'Orange line': 'orange'
+}
+
+# Columns each layer is generated from; a layer is rebuilt only when these change
+LAYER_INPUTS = {
+    'stations': ['Station Names', 'Metro Line', 'Daily_Ridership', 'Opening_Year', 'Dist. From First Station(km)', 'Latitude', 'Longitude'],
+    'lines': ['Metro Line', 'Dist. From First Station(km)', 'Latitude', 'Longitude'],
+    'heat': ['Metro Line', 'Latitude', 'Longitude', 'Daily_Ridership']
+}
+
+# Coordinates are rounded to ~0.1 m to keep the payload small
+COORD_DECIMALS = 6
+
+# Station markers drawn at once; beyond this the stations in view are thinned evenly
+MAX_VIEWPORT_STATIONS = 3000
+
+# Fields of a station shown in its popup
+POPUP_FIELDS = ['Station', 'Line', 'Daily Ridership', 'Opened', 'Distance from First Station (km)']
+
+_layers_lock = threading.Lock()
+_layers = {}
+
+def layer_hash(df, layer):
+    """Hash of the columns a layer is built from."""
+    digest = hashlib.sha256(f'{layer}:{LAYER_VERSION}'.encode())
+    digest.update(pd.util.hash_pandas_object(df[LAYER_INPUTS[layer]], index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+def line_color(line):
+    return LINE_COLORS.get(line, 'gray')
+
+def build_stations_layer(df):
+    """Station markers as a GeoJSON FeatureCollection, built column-wise."""
+    lons = df['Longitude'].round(COORD_DECIMALS).tolist()
+    lats = df['Latitude'].round(COORD_DECIMALS).tolist()
+    props = pd.DataFrame({
+        'Station': df['Station Names'],
+        'Line': df['Metro Line'],
+        'Daily Ridership': df['Daily_Ridership'],
+        'Opened': df['Opening_Year'],
+        'Distance from First Station (km)': df['Dist. From First Station(km)'],
+        'color': df['Metro Line'].map(line_color)
+    }).to_dict('records')
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [lon, lat]}, 'properties': p}
+            for lon, lat, p in zip(lons, lats, props)
+        ]
+    }
+
+def build_lines_layer(df):
+    """One LineString per metro line, ordered by distance from the first station."""
+    ordered = df.sort_values(['Metro Line', 'Dist. From First Station(km)'], kind='stable')
+    coords = ordered[['Longitude', 'Latitude']].round(COORD_DECIMALS)
+    features = []
+    for line, group in coords.groupby(ordered['Metro Line'], sort=True):
+        if len(group) < 2:
+            continue
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': group.to_numpy().tolist()},
+            'properties': {'Line': line, 'color': line_color(line)}
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+def build_heat_layer(df):
+    """Heat points [lat, lon, ridership] with the line of each point for filtering."""
+    return {
+        'points': df[['Latitude', 'Longitude', 'Daily_Ridership']].round(COORD_DECIMALS).to_numpy().tolist(),
+        'lines': df['Metro Line'].tolist()
+    }
+
+LAYER_BUILDERS = {
+    'stations': build_stations_layer,
+    'lines': build_lines_layer,
+    'heat': build_heat_layer
+}
+
+def _cache_file(layer, digest):
+    return os.path.join(MAP_CACHE_DIR, f'{layer}-{digest}.json.gz')
+
+def _read_cached_layer(layer, digest):
+    try:
+        with gzip.open(_cache_file(layer, digest), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_cached_layer(layer, digest, data):
+    path = _cache_file(layer, digest)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(MAP_CACHE_DIR, exist_ok=True)
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        # Keep only the current version of each layer on disk
+        for name in os.listdir(MAP_CACHE_DIR):
+            if name.startswith(f'{layer}-') and name != os.path.basename(path):
+                os.remove(os.path.join(MAP_CACHE_DIR, name))
+    except OSError:
+        pass  # The cache is an optimisation; a read-only data directory just means rebuilding
+
+def build_layers(df):
+    """
+    Return {layer: (hash, data)} for every map layer.
+
+    Each layer is looked up by the hash of its input columns, first in memory and then
+    in the on-disk cache; only layers whose inputs changed are regenerated.
+    """
+    layers = {}
+    for layer, builder in LAYER_BUILDERS.items():
+        digest = layer_hash(df, layer)
+        with _layers_lock:
+            cached = _layers.get(layer)
+        record_cache('map_layer_memory', cached is not None and cached[0] == digest)
+        if cached is None or cached[0] != digest:
+            data = _read_cached_layer(layer, digest)
+            record_cache('map_layer_disk', data is not None)
+            if data is None:
+                data = builder(df)
+                _write_cached_layer(layer, digest, data)
+            cached = (digest, data)
+            with _layers_lock:
+                _layers[layer] = cached
+        layers[layer] = cached
+    return layers
+
+def filter_layers(layers, lines=None):
+    """Restrict already-built layers to the given metro lines without rebuilding them."""
+    stations, line_features, heat = (layers[name][1] for name in ('stations', 'lines', 'heat'))
+    if lines is None:
+        return stations, line_features, heat['points']
+    lines = set(lines)
+    stations = {'type': 'FeatureCollection', 'features': [f for f in stations['features'] if f['properties']['Line'] in lines]}
+    line_features = {'type': 'FeatureCollection', 'features': [f for f in line_features['features'] if f['properties']['Line'] in lines]}
+    points = [p for p, line in zip(heat['points'], heat['lines']) if line in lines]
+    return stations, line_features, points
+
+def legend_html(lines):
+    rows = ''.join(
+        f'<div style="display:flex;align-items:center;margin:4px 0;">'
+        f'<div style="background-color:{line_color(line)};width:16px;height:16px;margin-right:6px;"></div>{line}</div>'
+        for line in lines
+    )
+    return (
+        '<div style="position:fixed;bottom:30px;right:30px;max-height:300px;overflow-y:auto;z-index:9999;'
+        'background:white;border:2px solid grey;padding:8px;font-size:13px;">'
+        f'<div style="text-align:center;"><b>Metro Lines</b></div>{rows}</div>'
+    )
+
+class ViewportStations(folium.map.Layer):
+    """
+    Station markers that are only created for the part of the map in view.
+
+    The stations are embedded once, sorted by latitude. On every pan or zoom the
+    browser binary-searches the visible latitude band, keeps the stations inside
+    the visible longitudes, and adds or removes markers for the difference, so the
+    page holds markers only for what is on screen however many stations there are.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = L.layerGroup();
+            (function(layer, map, data) {
+                var shown = {};
+                function escape(value) {
+                    return String(value).replace(/[&<>"]/g, function(c) {
+                        return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c];
+                    });
+                }
+                function lowerBound(value) {
+                    var lo = 0, hi = data.lat.length;
+                    while (lo < hi) {
+                        var mid = (lo + hi) >> 1;
+                        if (data.lat[mid] < value) { lo = mid + 1; } else { hi = mid; }
+                    }
+                    return lo;
+                }
+                function marker(i) {
+                    var m = L.circleMarker([data.lat[i], data.lon[i]], {
+                        radius: 5, weight: 1, color: 'black', fill: true, fillColor: data.color[i], fillOpacity: 0.9
+                    });
+                    m.bindTooltip(escape(data.props[i][0]));
+                    m.bindPopup(function() {
+                        return data.fields.map(function(field, j) {
+                            return '<b>' + escape(field) + '</b>: ' + escape(data.props[i][j]);
+                        }).join('<br>');
+                    });
+                    return m;
+                }
+                function refresh() {
+                    if (!map.hasLayer(layer)) { return; }
+                    var bounds = map.getBounds().pad({{ this.padding }});
+                    var west = bounds.getWest(), east = bounds.getEast(), north = bounds.getNorth();
+                    var inView = [];
+                    for (var i = lowerBound(bounds.getSouth()); i < data.lat.length && data.lat[i] <= north; i++) {
+                        if (data.lon[i] >= west && data.lon[i] <= east) { inView.push(i); }
+                    }
+                    var step = Math.ceil(inView.length / {{ this.max_markers }}) || 1;
+                    var next = {};
+                    for (var k = 0; k < inView.length; k += step) {
+                        var idx = inView[k];
+                        next[idx] = shown[idx] || marker(idx);
+                    }
+                    for (var key in shown) { if (!(key in next)) { layer.removeLayer(shown[key]); } }
+                    for (var key in next) { if (!(key in shown)) { layer.addLayer(next[key]); } }
+                    shown = next;
+                }
+                map.on('moveend', refresh);
+                layer.on('add', refresh);
+            })({{ this.get_name() }}, {{ this._parent.get_name() }}, {{ this.data|tojson }});
+        {% endmacro %}
+        """)
+
+    def __init__(self, stations, name='Stations', max_markers=MAX_VIEWPORT_STATIONS, padding=0.2):
+        super().__init__(name=name, overlay=True, control=True, show=True)
+        self._name = 'ViewportStations'
+        features = sorted(stations['features'], key=lambda f: f['geometry']['coordinates'][1])
+        self.data = {
+            'lat': [f['geometry']['coordinates'][1] for f in features],
+            'lon': [f['geometry']['coordinates'][0] for f in features],
+            'color': [f['properties']['color'] for f in features],
+            'fields': POPUP_FIELDS,
+            'props': [[f['properties'][field] for field in POPUP_FIELDS] for f in features]
+        }
+        self.max_markers = max_markers
+        self.padding = padding
+
+def create_map(df, lines=None, route=None):
+    """
+    Create an interactive map with station markers, metro lines and a ridership heatmap.
+
+    Layers come from build_layers, so only layers whose data changed are regenerated,
+    and lines optionally restricts the map to a subset of metro lines. route is an
+    optional sequence of (lat, lon) stops drawn on top.
+    """
+    return _assemble_map(build_layers(df), None if lines is None else tuple(sorted(lines)), _route_key(route))
+
+def _route_key(route):
+    return None if not route else tuple((round(lat, COORD_DECIMALS), round(lon, COORD_DECIMALS)) for lat, lon in route)
+
+def _assemble_map(layers, lines, route=None):
+    stations, line_features, heat_points = filter_layers(layers, lines)
+    delhi_map = folium.Map(location=MAP_CENTER, zoom_start=11, tiles='CartoDB positron', prefer_canvas=True)
+
+    if line_features['features']:
+        folium.GeoJson(
+            line_features,
+            name='Metro Lines',
+            style_function=lambda f: {'color': f['properties']['color'], 'weight': 4, 'opacity': 0.7},
+            tooltip=folium.GeoJsonTooltip(fields=['Line'], labels=False)
+        ).add_to(delhi_map)
+    if stations['features']:
+        ViewportStations(stations).add_to(delhi_map)
+    if heat_points:
+        HeatMap(heat_points, name='Ridership Heatmap', radius=15, blur=10, max_zoom=13).add_to(delhi_map)
+
+    if route:
+        folium.PolyLine(route, name='Route', color='black', weight=7, opacity=0.8).add_to(delhi_map)
+        for (lat, lon), label in ((route[0], 'Origin'), (route[-1], 'Destination')):
+            folium.CircleMarker([lat, lon], radius=9, color='black', fill=True, fill_color='white', fill_opacity=1, tooltip=label).add_to(delhi_map)
+
+    shown_lines = sorted({f['properties']['Line'] for f in stations['features']})
+    delhi_map.get_root().html.add_child(folium.Element(legend_html(shown_lines)))
+    folium.LayerControl(collapsed=True).add_to(delhi_map)
+    return delhi_map
+
+def minify_html(html):
+    """Strip indentation and blank lines from rendered map HTML."""
+    return re.sub(r'\n\s*', '\n', html).strip()
+
+@functools.lru_cache(maxsize=32)
+def _render_cached(layer_hashes, lines, route=None):
+    with _layers_lock:
+        layers = {name: _layers[name] for name in LAYER_BUILDERS}
+    if tuple(layers[name][0] for name in LAYER_BUILDERS) != layer_hashes:
+        raise KeyError("Map layers changed while rendering.")
+    return minify_html(_assemble_map(layers, lines, route).get_root().render())
+
+def render_map_html(df, lines=None, route=None):
+    """
+    Return the minified map HTML for the stations in df, optionally filtered to lines.
+
+    Rendered pages are cached per (layer hashes, line selection, route), so switching
+    the line filter or route back and forth does not rebuild or re-render anything.
+    """
+    layers = build_layers(df)
+    layer_hashes = tuple(layers[name][0] for name in LAYER_BUILDERS)
+    lines = None if lines is None else tuple(sorted(lines))
+    route = _route_key(route)
+    misses = _render_cached.cache_info().misses
+    try:
+        html = _render_cached(layer_hashes, lines, route)
+        record_cache('map_html', _render_cached.cache_info().misses == misses)
+        return html
+    except KeyError:
+        return minify_html(_assemble_map(layers, lines, route).get_root().render())
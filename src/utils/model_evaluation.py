@@ -0,0 +1,146 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from utils.data_loader import DATA_DIR, csv_path, load_dataset
+from utils.file_utils import file_hash
+from utils.model_utils import FEATURE_COLUMNS, artifact_path, get_model_performance, load_model
+
+# Models scored on the Model Comparisons page, with their display names
+EVALUATED_MODELS = {
+    'xgboost': 'XGBoost',
+    'linear_regression': 'Linear Regression',
+    'ensemble': 'Ensemble'
+}
+
+EVALUATION_CACHE_DIR = os.path.join(DATA_DIR, 'evaluation_cache')
+
+# Bump when the result format or the held-out split changes so cached results are recomputed
+EVALUATION_VERSION = 1
+
+# Held-out split used when the models were trained
+TEST_SIZE = 0.3
+RANDOM_STATE = 42
+
+TARGET_COLUMN = 'Daily_Ridership'
+
+def held_out_data(random_state=RANDOM_STATE):
+    """Return the (X_test, y_test) split the models were not trained on (with the training seed)."""
+    from sklearn.model_selection import train_test_split
+    df = load_dataset('stations', columns=FEATURE_COLUMNS + [TARGET_COLUMN])
+    _, X_test, _, y_test = train_test_split(df[FEATURE_COLUMNS], df[TARGET_COLUMN], test_size=TEST_SIZE, random_state=random_state)
+    return X_test, y_test
+
+def evaluation_key(name, model_hash, data_hash):
+    digest = hashlib.sha256(f'{name}:{model_hash}:{data_hash}:{EVALUATION_VERSION}'.encode())
+    return digest.hexdigest()[:16]
+
+def _cache_file(name, key):
+    return os.path.join(EVALUATION_CACHE_DIR, f'{name}-{key}.json')
+
+def _read_cached_result(name, key):
+    try:
+        with open(_cache_file(name, key), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_cached_result(name, key, result):
+    path = _cache_file(name, key)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(EVALUATION_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+        for stale in os.listdir(EVALUATION_CACHE_DIR):
+            if stale.startswith(f'{name}-') and stale != os.path.basename(path):
+                os.remove(os.path.join(EVALUATION_CACHE_DIR, stale))
+    except OSError:
+        pass  # A read-only data directory only means evaluating again next time
+
+def model_explanation(model):
+    """Return (label, {feature: value}) for models exposing importances or coefficients, else None."""
+    if hasattr(model, 'feature_importances_'):
+        return 'Feature Importance', dict(zip(FEATURE_COLUMNS, np.asarray(model.feature_importances_, dtype=float).tolist()))
+    if hasattr(model, 'coef_'):
+        return 'Coefficient', dict(zip(FEATURE_COLUMNS, np.ravel(model.coef_).astype(float).tolist()))
+    return None
+
+def evaluate_model_file(name, model_path, X_test, y_test):
+    """
+    Score one pickled model on the held-out data.
+
+    Runs in a worker process, so it loads the model itself rather than going through
+    the registry. Models are evaluated on raw features, as they were trained.
+    """
+    model = load_model(model_path)
+    rmse, mae, r2 = get_model_performance(model, X_test, y_test)
+    return {
+        'name': name,
+        'model': EVALUATED_MODELS.get(name, name),
+        'rmse': float(rmse),
+        'mae': float(mae),
+        'r2': float(r2),
+        'actual': np.asarray(y_test, dtype=float).tolist(),
+        'predicted': np.asarray(model.predict(X_test), dtype=float).tolist(),
+        'explanation': model_explanation(model)
+    }
+
+_evaluation_lock = threading.Lock()
+_results = {}
+
+def evaluate_models(names=None, max_workers=None):
+    """
+    Return evaluation results for the given models (all of EVALUATED_MODELS by default).
+
+    Results are cached in memory and on disk under the hashes of the model file and
+    the stations CSV, so replacing either re-scores only the affected models. Models
+    without a cached result are scored in parallel in a process pool.
+    """
+    names = list(EVALUATED_MODELS) if names is None else list(names)
+    data_hash = file_hash(csv_path('stations'))
+    keys = {name: evaluation_key(name, file_hash(artifact_path(name)), data_hash) for name in names}
+    with _evaluation_lock:
+        results = {}
+        for name in names:
+            result = _results.get(keys[name]) or _read_cached_result(name, keys[name])
+            if result is not None:
+                results[name] = _results[keys[name]] = dict(result, key=keys[name])
+        missing = [name for name in names if name not in results]
+        if missing:
+            X_test, y_test = held_out_data()
+            if len(missing) == 1:
+                fresh = [evaluate_model_file(missing[0], artifact_path(missing[0]), X_test, y_test)]
+            else:
+                # Spawn rather than fork: the Streamlit server process is multi-threaded
+                context = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(max_workers=max_workers or min(len(missing), os.cpu_count() or 1), mp_context=context) as pool:
+                    fresh = list(pool.map(
+                        evaluate_model_file, missing, [artifact_path(name) for name in missing],
+                        [X_test] * len(missing), [y_test] * len(missing)
+                    ))
+            for name, result in zip(missing, fresh):
+                _write_cached_result(name, keys[name], result)
+                results[name] = _results[keys[name]] = dict(result, key=keys[name])
+    return [results[name] for name in names]
+
+def metrics_table(results):
+    """Rows of Model, RMSE, MAE and R² Score, in the layout of model_performance_metrics.csv."""
+    return [{'Model': r['model'], 'RMSE': r['rmse'], 'MAE': r['mae'], 'R² Score': r['r2']} for r in results]
+
+def main():
+    parser = argparse.ArgumentParser(description="Score the pickled models on the held-out data (run from the src directory).")
+    parser.add_argument('models', nargs='*', help=f"Models to evaluate (default: {', '.join(EVALUATED_MODELS)}).")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per model).")
+    args = parser.parse_args()
+
+    for row in metrics_table(evaluate_models(args.models or None, args.workers)):
+        print(f"{row['Model']:20s} RMSE {row['RMSE']:10.2f}  MAE {row['MAE']:10.2f}  R² {row['R² Score']:.4f}")
+
+if __name__ == "__main__":
+    main()
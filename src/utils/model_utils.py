@@ -1,16 +1,143 @@
+import os
+import threading
+import time
 import numpy as np
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import joblib
+from utils.fast_inference import CompiledTreeEnsemble
+from utils.file_utils import file_hash
+from utils.instrumentation import INFERENCE_ROWS, INFERENCE_SECONDS, LOAD_SECONDS, record_cache, timer
+
+MODELS_DIR = 'models'
+
+# Feature order expected by the trained models
+FEATURE_COLUMNS = [
+    'Station_Age',
+    'Metro_Line_Encoded',
+    'Dist. From First Station(km)',
+    'Latitude',
+    'Longitude',
+    'Connectivity',
+    'Station_Density'
+]
+
+# Artifacts served by the registry, keyed by their registry name.
+# 'scaler' is the notebook's ridership-normalisation scaler, not an input transform for the models.
+MODEL_FILES = {
+    'xgboost': 'xgboost_model.pkl',
+    'linear_regression': 'linear_regression_model.pkl',
+    'ensemble': 'ensemble_model.pkl',
+    'scaler': 'scaler.pkl',
+    'line_encoder': 'line_encoder.pkl'
+}
+
+# Process-wide registry state, shared by every Streamlit session (sessions are threads)
+_registry_lock = threading.Lock()
+_artifacts = {}
+_load_stats = {}
+_engines = {}
 
 def load_model(model_path):
     model = joblib.load(model_path)
     return model
 
+def artifact_path(name):
+    """Return the on-disk path of a registry artifact."""
+    if name not in MODEL_FILES:
+        raise KeyError(f"Unknown model artifact '{name}'. Available: {', '.join(MODEL_FILES)}")
+    return os.path.join(MODELS_DIR, MODEL_FILES[name])
+
+def get_artifact(name):
+    """
+    Return a loaded model or preprocessing artifact from the registry.
+
+    Artifacts are loaded on first use and shared across all sessions. The cache is
+    keyed by the file's content hash, so replacing a pickle on disk is picked up on
+    the next call without restarting the server.
+    """
+    path = artifact_path(name)
+    content_hash = file_hash(path)
+    key = (name, content_hash)
+    artifact = _artifacts.get(key)
+    if artifact is not None:
+        record_cache('model_registry', True)
+        return artifact
+    with _registry_lock:
+        artifact = _artifacts.get(key)
+        record_cache('model_registry', artifact is not None)
+        if artifact is None:
+            start = time.perf_counter()
+            artifact = load_model(path)
+            elapsed = time.perf_counter() - start
+            LOAD_SECONDS.labels(kind='model', name=name).observe(elapsed)
+            # Drop any stale version of this artifact before publishing the new one
+            for stale_key in [k for k in _artifacts if k[0] == name]:
+                del _artifacts[stale_key]
+            _artifacts[key] = artifact
+            _load_stats[name] = {
+                'path': path,
+                'content_hash': content_hash,
+                'load_seconds': elapsed,
+                'loaded_at': time.time()
+            }
+    return artifact
+
+def get_model(name):
+    """Return one of the trained models: 'xgboost', 'linear_regression' or 'ensemble'."""
+    return get_artifact(name)
+
+def get_line_encoder():
+    return get_artifact('line_encoder')
+
+def pipeline_version():
+    """Content hashes of the serving pipeline's artifacts; changes whenever the model file is replaced."""
+    return (file_hash(artifact_path('xgboost')),)
+
+def get_inference_engine():
+    """
+    Return the compiled serving pipeline: the XGBoost model on raw FEATURE_COLUMNS,
+    as it was trained. Recompiled whenever the model file changes on disk.
+
+    scaler.pkl is not part of it: it is the notebook's ridership-normalisation
+    scaler, fitted on other columns in another order, not the model's input transform.
+    """
+    version = pipeline_version()
+    engine = _engines.get(version)
+    if engine is not None:
+        return engine
+    model = get_model('xgboost')
+    with _registry_lock:
+        engine = _engines.get(version)
+        if engine is None:
+            engine = CompiledTreeEnsemble.from_xgboost(model)
+            _engines.clear()
+            _engines[version] = engine
+    return engine
+
+def get_load_stats():
+    """Return load time and content hash for every artifact loaded so far."""
+    with _registry_lock:
+        return {name: dict(stats) for name, stats in _load_stats.items()}
+
 def predict_ridership(model, features):
-    prediction = model.predict(features)
+    with timer(INFERENCE_SECONDS, model=type(model).__name__):
+        prediction = model.predict(features)
     return prediction
 
+def predict_ridership_batch(features):
+    """
+    Predict ridership for an (N, 7) array of feature rows in FEATURE_COLUMNS order.
+
+    Runs the XGBoost model through the compiled engine, which returns the same
+    predictions as model.predict without per-call sklearn and DMatrix overhead.
+    """
+    features = np.asarray(features, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+    engine = get_inference_engine()
+    INFERENCE_ROWS.labels(model='serving_pipeline').inc(len(features))
+    with timer(INFERENCE_SECONDS, model='serving_pipeline'):
+        return engine.predict(features)
+
 def evaluate_model(y_true, y_pred):
+    from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
     rmse = np.sqrt(mean_squared_error(y_true, y_pred))
     mae = mean_absolute_error(y_true, y_pred)
     r2 = r2_score(y_true, y_pred)
@@ -18,4 +145,4 @@ def evaluate_model(y_true, y_pred):
 
 def get_model_performance(model, X_test, y_test):
     y_pred = predict_ridership(model, X_test)
-    return evaluate_model(y_test, y_pred)
\ No newline at end of file
+    return evaluate_model(y_test, y_pred)
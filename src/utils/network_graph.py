@@ -0,0 +1,294 @@
+import argparse
+import hashlib
+import os
+import re
+import threading
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from utils.data_loader import DATA_DIR, load_table
+
+NETWORK_CACHE_DIR = os.path.join(DATA_DIR, 'network_cache')
+
+# Bump when the graph or matrix format changes so cached matrices are recomputed
+NETWORK_VERSION = 2
+
+# Distance a change of line is worth when choosing between routes
+TRANSFER_PENALTY_KM = 5.0
+
+# Line segments listed with the same distance still need a non-zero edge weight
+MIN_EDGE_KM = 1e-3
+
+# Sources per Dijkstra batch when computing the all-pairs matrices, bounding memory
+ALL_PAIRS_BATCH = 256
+
+NETWORK_COLUMNS = ['Station Names', 'Metro Line', 'Dist. From First Station(km)']
+
+# Spellings of one station that differ between lines in the CSV: terminus markers and the Airport Express suffix
+STATION_SUFFIX = re.compile(r'\s*(\((First|Last) Station\)|-\s*Airport Express)$')
+
+# Out-of-station interchanges, joined by a walkway and routed as one hub
+HUB_ALIASES = {'Noida Sector 52': 'Noida Sector 51'}
+
+def platform_name(name):
+    """A CSV station name without stray whitespace, terminus markers or the Airport Express suffix."""
+    return STATION_SUFFIX.sub('', name.strip())
+
+def hub_name(name):
+    """The interchange hub a CSV station name is routed through."""
+    name = platform_name(name)
+    return HUB_ALIASES.get(name, name)
+
+class MetroNetwork:
+    """
+    The metro network as a compact CSR graph.
+
+    Every (station, line) row is a platform node, and platforms of consecutive
+    stations along a line are joined by their distance apart. Every station name
+    also has a hub node joined to each of its platforms at half the transfer penalty,
+    so changing lines costs TRANSFER_PENALTY_KM while staying on a line never passes
+    through a hub. Routes run hub to hub; the hubs a route passes through are its
+    transfers. Hubs are keyed by hub_name, so the CSV's different spellings of one
+    interchange meet at the same hub.
+    """
+
+    def __init__(self, station_names, station_lines, node_station, node_name, node_line, graph):
+        self.station_names = station_names
+        self.station_index = {name: i for i, name in enumerate(station_names)}
+        self.station_lines = station_lines
+        self.node_station = node_station
+        self.node_name = node_name
+        self.node_line = node_line
+        self.graph = graph
+        self.n_platforms = len(node_station)
+        self.hubs = self.n_platforms + np.arange(len(station_names))
+        self.is_hub = np.zeros(graph.shape[0], dtype=bool)
+        self.is_hub[self.hubs] = True
+        self._matrices = None
+
+    @classmethod
+    def from_stations(cls, stations):
+        """Build the network from rows with 'Station Names', 'Metro Line' and 'Dist. From First Station(km)'."""
+        stations = pd.DataFrame(stations)[NETWORK_COLUMNS].drop_duplicates(['Station Names', 'Metro Line'])
+        platform_names = stations['Station Names'].map(platform_name)
+        station_codes, station_names = pd.factorize(platform_names.map(hub_name), sort=True)
+        line_codes, line_names = pd.factorize(stations['Metro Line'], sort=True)
+        distance = stations['Dist. From First Station(km)'].to_numpy(dtype=np.float64)
+        n_platforms, n_stations = len(stations), len(station_names)
+
+        # Consecutive platforms along each line, ordered by distance from the first station
+        order = np.lexsort((distance, line_codes))
+        a, b = order[:-1], order[1:]
+        same_line = line_codes[a] == line_codes[b]
+        a, b = a[same_line], b[same_line]
+        line_weight = np.maximum(np.abs(distance[b] - distance[a]), MIN_EDGE_KM)
+
+        platforms = np.arange(n_platforms)
+        hubs = n_platforms + station_codes
+        src = np.concatenate([a, b, platforms, hubs])
+        dst = np.concatenate([b, a, hubs, platforms])
+        weight = np.concatenate([line_weight, line_weight, np.full(2 * n_platforms, TRANSFER_PENALTY_KM / 2)])
+        size = n_platforms + n_stations
+        graph = csr_matrix((weight, (src, dst)), shape=(size, size))
+
+        station_lines = pd.DataFrame({'Station Names': stations['Station Names'].to_numpy(), 'Metro Line': stations['Metro Line'].to_numpy()})
+        return cls(list(station_names), station_lines, station_codes, platform_names.to_numpy(dtype=object),
+                   np.asarray(line_names, dtype=object)[line_codes], graph)
+
+    def station(self, name):
+        """Index of the hub for a station name, as spelt in the CSV or normalised."""
+        try:
+            return self.station_index[hub_name(name)]
+        except KeyError:
+            raise ValueError(f"Station '{name}' not found in the network.") from None
+
+    def lines_per_station(self):
+        """
+        Number of distinct lines listed under each CSV station name, as a Series.
+
+        Counted per name as spelt in the CSV rather than per hub, as the dataset's
+        Connectivity column (and so the models) count them.
+        """
+        return self.station_lines['Station Names'].value_counts()
+
+    def _hub_routes(self, sources):
+        """
+        Cost and transfer count from each source hub to every node.
+
+        Transfers are summed along the predecessor tree by pointer jumping, so the
+        work is O(log path length) array operations rather than a walk per route.
+        """
+        cost, predecessors = dijkstra(self.graph, indices=sources, return_predecessors=True)
+        rows = np.arange(len(sources))[:, None]
+        columns = np.broadcast_to(np.arange(self.graph.shape[0]), predecessors.shape)
+        parent = np.where(predecessors < 0, columns, predecessors)
+        transfers = (self.is_hub[parent] & (parent != np.asarray(sources)[:, None]) & (parent != columns)).astype(np.int32)
+        while True:
+            grandparent = parent[rows, parent]
+            if np.array_equal(grandparent, parent):
+                break
+            transfers = transfers + transfers[rows, parent]
+            parent = grandparent
+        return cost, transfers
+
+    def compute_all_pairs(self, distance_out=None, transfers_out=None):
+        """
+        Station-to-station route distance (km) and transfers for every pair.
+
+        Returns float32 distances (inf when unreachable) and int16 transfers (-1 when
+        unreachable); pass memory-mapped arrays as the outputs to write straight to disk.
+        """
+        n = len(self.station_names)
+        distance_out = np.empty((n, n), dtype=np.float32) if distance_out is None else distance_out
+        transfers_out = np.empty((n, n), dtype=np.int16) if transfers_out is None else transfers_out
+        for start in range(0, n, ALL_PAIRS_BATCH):
+            sources = self.hubs[start:start + ALL_PAIRS_BATCH]
+            cost, transfers = self._hub_routes(sources)
+            cost, transfers = cost[:, self.hubs], transfers[:, self.hubs]
+            reachable = np.isfinite(cost)
+            distance = np.where(reachable, cost - TRANSFER_PENALTY_KM * (transfers + 1), np.inf)
+            distance[np.arange(len(sources)), np.arange(start, start + len(sources))] = 0
+            distance_out[start:start + len(sources)] = np.maximum(distance, 0)
+            transfers_out[start:start + len(sources)] = np.where(reachable, transfers, -1)
+        return distance_out, transfers_out
+
+    def all_pairs(self):
+        """The all-pairs (distance, transfers) matrices, memory-mapped from the cache when available."""
+        if self._matrices is None:
+            self._matrices = self.compute_all_pairs()
+        return self._matrices
+
+    def route_matrices(self, origin, destination):
+        """(distance_km, transfers) between two stations from the all-pairs matrices."""
+        distance, transfers = self.all_pairs()
+        i, j = self.station(origin), self.station(destination)
+        return float(distance[i, j]), int(transfers[i, j])
+
+    def shortest_path(self, origin, destination):
+        """
+        The best route between two stations, trading distance against TRANSFER_PENALTY_KM per change of line.
+
+        Returns a dict with distance_km, transfers and path, a list of (station, line)
+        stops; None if the stations are not connected.
+        """
+        source, target = self.hubs[self.station(origin)], self.hubs[self.station(destination)]
+        if source == target:
+            return {'distance_km': 0.0, 'transfers': 0, 'path': []}
+        cost, predecessors = dijkstra(self.graph, indices=source, return_predecessors=True)
+        if not np.isfinite(cost[target]):
+            return None
+        nodes = [target]
+        while nodes[-1] != source:
+            nodes.append(predecessors[nodes[-1]])
+        nodes.reverse()
+        transfers = int(self.is_hub[nodes[1:-1]].sum())
+        path = [(self.node_name[node], self.node_line[node]) for node in nodes if node < self.n_platforms]
+        return {
+            'distance_km': float(max(cost[target] - TRANSFER_PENALTY_KM * (transfers + 1), 0)),
+            'transfers': transfers,
+            'path': path
+        }
+
+    def accessibility(self, max_transfers=1):
+        """
+        Per-station accessibility from the all-pairs matrices, as a DataFrame.
+
+        - Reachable_Stations: stations reachable with at most max_transfers changes
+        - Mean_Distance_km: mean route distance to every reachable station
+        """
+        distance, transfers = self.all_pairs()
+        reachable = transfers >= 0
+        within = reachable & (transfers <= max_transfers)
+        total = np.where(reachable, distance, 0).sum(axis=1, dtype=np.float64)
+        count = reachable.sum(axis=1)
+        return pd.DataFrame({
+            'Reachable_Stations': within.sum(axis=1) - 1,
+            'Mean_Distance_km': total / np.maximum(count - 1, 1)
+        }, index=self.station_names)
+
+def network_hash(stations):
+    """Hash of the columns the network is built from, plus the routing settings."""
+    digest = hashlib.sha256(f'{NETWORK_VERSION}:{TRANSFER_PENALTY_KM}:{MIN_EDGE_KM}'.encode())
+    digest.update(pd.util.hash_pandas_object(pd.DataFrame(stations)[NETWORK_COLUMNS], index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+def _matrix_files(digest):
+    return [os.path.join(NETWORK_CACHE_DIR, f'{kind}-{digest}.npy') for kind in ('distance', 'transfers')]
+
+def load_all_pairs(network, digest):
+    """
+    Memory-map the all-pairs matrices for a network, computing and saving them on a miss.
+
+    The matrices are written to temporary .npy files and renamed into place, so
+    readers never see a partial file. Falls back to in-memory arrays if the data
+    directory is read-only.
+    """
+    distance_path, transfers_path = _matrix_files(digest)
+    try:
+        return np.load(distance_path, mmap_mode='r'), np.load(transfers_path, mmap_mode='r')
+    except (OSError, ValueError):
+        pass
+    n = len(network.station_names)
+    try:
+        os.makedirs(NETWORK_CACHE_DIR, exist_ok=True)
+        tmp_paths = [f'{path}.{os.getpid()}.tmp' for path in (distance_path, transfers_path)]
+        distance = np.lib.format.open_memmap(tmp_paths[0], mode='w+', dtype=np.float32, shape=(n, n))
+        transfers = np.lib.format.open_memmap(tmp_paths[1], mode='w+', dtype=np.int16, shape=(n, n))
+        network.compute_all_pairs(distance, transfers)
+        distance.flush()
+        transfers.flush()
+        del distance, transfers
+        for tmp_path, path in zip(tmp_paths, (distance_path, transfers_path)):
+            os.replace(tmp_path, path)
+        # Keep only the current matrices on disk
+        current = {os.path.basename(distance_path), os.path.basename(transfers_path)}
+        for name in os.listdir(NETWORK_CACHE_DIR):
+            if name not in current and not name.endswith('.tmp'):
+                os.remove(os.path.join(NETWORK_CACHE_DIR, name))
+        return np.load(distance_path, mmap_mode='r'), np.load(transfers_path, mmap_mode='r')
+    except OSError:
+        return network.compute_all_pairs()
+
+_network_lock = threading.Lock()
+_network_cache = {}
+
+def get_network():
+    """
+    Return the network of the stations dataset, shared process-wide.
+
+    The network and its memory-mapped all-pairs matrices are rebuilt only when the
+    station, line or distance columns change.
+    """
+    stations = load_table('stations', columns=NETWORK_COLUMNS).to_pandas()
+    digest = network_hash(stations)
+    with _network_lock:
+        cached = _network_cache.get('stations')
+        if cached is None or cached[0] != digest:
+            network = MetroNetwork.from_stations(stations)
+            network._matrices = load_all_pairs(network, digest)
+            cached = (digest, network)
+            _network_cache['stations'] = cached
+        return cached[1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the metro network and its all-pairs route matrices (run from src).")
+    parser.add_argument('origin', nargs='?', help="Print the best route from this station...")
+    parser.add_argument('destination', nargs='?', help="...to this one.")
+    args = parser.parse_args()
+
+    network = get_network()
+    distance, transfers = network.all_pairs()
+    print(f"{len(network.station_names)} stations, {network.n_platforms} platforms, {network.graph.nnz} directed edges")
+    print(f"Mean route distance {distance[np.isfinite(distance)].mean():.1f} km, max transfers {transfers.max()}")
+    if args.origin and args.destination:
+        route = network.shortest_path(args.origin, args.destination)
+        if route is None:
+            print("No route.")
+            return
+        print(f"{route['distance_km']:.1f} km, {route['transfers']} transfer(s)")
+        for station, line in route['path']:
+            print(f"  {station} ({line})")
+
+if __name__ == "__main__":
+    main()
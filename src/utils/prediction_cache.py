@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from utils.instrumentation import record_cache
+from utils.model_utils import FEATURE_COLUMNS, pipeline_version, predict_ridership_batch
+from utils.prediction_surface import get_prediction_surface, surface_enabled
+
+# Entries kept before the least recently used prediction is evicted
+PREDICTION_CACHE_SIZE = 4096
+
+# Decimal places each input is rounded to before lookup (0 means a whole number):
+# distance to 10 m and coordinates to about 1 m, finer than the Scenario page's inputs
+QUANTIZE_DECIMALS = {
+    'Station_Age': 0,
+    'Metro_Line_Encoded': 0,
+    'Dist. From First Station(km)': 2,
+    'Latitude': 5,
+    'Longitude': 5,
+    'Connectivity': 0,
+    'Station_Density': 0
+}
+_DECIMALS = [QUANTIZE_DECIMALS[col] for col in FEATURE_COLUMNS]
+
+# Seconds between checks that the model on disk is unchanged
+VERSION_CHECK_INTERVAL = 1.0
+
+def quantize(row):
+    """Round a feature row in FEATURE_COLUMNS order to its cache key."""
+    return tuple(round(v, d) if d else int(round(v)) for v, d in zip(map(float, row), _DECIMALS))
+
+class PredictionCache:
+    """
+    Bounded LRU cache of serving-pipeline predictions keyed on quantized inputs.
+
+    Misses are predicted in one batch on the rows as given; the quantized row is
+    only the key. With use_surface (default: surface_enabled()), misses are first
+    looked up in the precomputed prediction surface, and those values are flagged
+    as approximate. The cache empties itself when the model on disk changes.
+    """
+
+    def __init__(self, maxsize=PREDICTION_CACHE_SIZE, predict_fn=predict_ridership_batch, use_surface=None):
+        self.maxsize = maxsize
+        self.predict_fn = predict_fn
+        self.use_surface = surface_enabled() if use_surface is None else use_surface
+        self._entries = OrderedDict()
+        self._version = None
+        self._version_checked = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def predict(self, rows, return_approximate=False):
+        """
+        Predict ridership for an (N, 7) array of feature rows in FEATURE_COLUMNS order.
+
+        With return_approximate, also returns a boolean array marking the values
+        interpolated from the prediction surface rather than predicted by the model.
+        """
+        now = time.monotonic()
+        if now - self._version_checked >= VERSION_CHECK_INTERVAL:
+            version = pipeline_version()
+            self._version_checked = now
+        else:
+            version = self._version
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+        keys = [quantize(row) for row in rows.tolist()]
+        # (prediction, approximate) per row
+        results = [None] * len(keys)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            for i, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    results[i] = value
+        missing = [i for i, value in enumerate(results) if value is None]
+        record_cache('prediction', True, len(keys) - len(missing))
+        record_cache('prediction', False, len(missing))
+        if missing:
+            computed = missing
+            surface = get_prediction_surface() if self.use_surface else None
+            if surface is not None:
+                for i in missing:
+                    value = surface.lookup(rows[i].tolist())
+                    if value is not None:
+                        results[i] = (value, True)
+                unresolved = [i for i in missing if results[i] is None]
+                record_cache('prediction_surface', True, len(missing) - len(unresolved))
+                record_cache('prediction_surface', False, len(unresolved))
+                missing = unresolved
+            if missing:
+                predictions = self.predict_fn(rows[missing])
+                for i, value in zip(missing, predictions.tolist()):
+                    results[i] = (value, False)
+            with self._lock:
+                if version == self._version:
+                    for i in computed:
+                        self._entries[keys[i]] = results[i]
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+        values = np.array([value for value, _ in results], dtype=np.float64)
+        if return_approximate:
+            return values, np.array([approximate for _, approximate in results], dtype=bool)
+        return values
+
+    def predict_one(self, *features):
+        """Predict ridership for one scenario given its features in FEATURE_COLUMNS order."""
+        return self.predict([features])[0]
+
+_cache_lock = threading.Lock()
+_cache = None
+
+def get_prediction_cache():
+    """Return the process-wide prediction cache shared by every session."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PredictionCache()
+        return _cache
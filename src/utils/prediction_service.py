@@ -0,0 +1,177 @@
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import tornado.ioloop
+import tornado.web
+from utils.data_loader import load_dataset
+from utils.model_utils import FEATURE_COLUMNS, get_model, predict_ridership_batch
+
+DEFAULT_PORT = 8600
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_WAIT_MS = 2.0
+
+def parse_feature_rows(payload):
+    """
+    Convert a /predict request body into an (N, 7) float array.
+
+    Accepted forms, each either bare or wrapped as {"features": ...} / {"instances": ...}:
+    - a single row: [age, line, dist, lat, lon, connectivity, density]
+    - many rows: [[...], [...]]
+    - a single object or a list of objects keyed by FEATURE_COLUMNS
+    """
+    if isinstance(payload, dict):
+        if 'features' in payload:
+            payload = payload['features']
+        elif 'instances' in payload:
+            payload = payload['instances']
+    if isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list) or not payload:
+        raise ValueError("Request must contain at least one feature row.")
+    if isinstance(payload[0], dict):
+        missing = [col for col in FEATURE_COLUMNS if col not in payload[0]]
+        if missing:
+            raise ValueError(f"Missing features: {', '.join(missing)}")
+        payload = [[row[col] for col in FEATURE_COLUMNS] for row in payload]
+    rows = np.asarray(payload, dtype=np.float64)
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+    if rows.ndim != 2 or rows.shape[1] != len(FEATURE_COLUMNS):
+        raise ValueError(f"Each row must have {len(FEATURE_COLUMNS)} features in the order: {', '.join(FEATURE_COLUMNS)}")
+    if not np.isfinite(rows).all():
+        raise ValueError("Features must be finite numbers.")
+    return rows
+
+def check_predictions():
+    """
+    Predict every station with the serving path and with get_model('xgboost').predict.
+
+    Returns the largest absolute difference; the two agree exactly when the served
+    predictions are the model's own on raw FEATURE_COLUMNS.
+    """
+    stations = load_dataset('stations', columns=FEATURE_COLUMNS)
+    expected = get_model('xgboost').predict(stations)
+    served = predict_ridership_batch(stations.to_numpy(dtype=np.float64))
+    return float(np.abs(np.asarray(served, dtype=np.float64) - expected).max())
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into one vectorized predict call.
+
+    Requests queue up until either max_batch_size rows are pending or the oldest
+    request has waited max_wait_ms, then the whole queue is predicted at once on a
+    single worker thread so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(self, predict_fn=predict_ridership_batch, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = []
+        self._pending_rows = 0
+        self._flush_handle = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.rows = 0
+
+    async def submit(self, rows):
+        """Queue rows for prediction and return their predictions."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((rows, future))
+        self._pending_rows += len(rows)
+        if self._pending_rows >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._queue = self._queue, []
+        self._pending_rows = 0
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        features = np.concatenate([rows for rows, _ in batch])
+        try:
+            predictions = await loop.run_in_executor(self._executor, self.predict_fn, features)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(features)
+        offset = 0
+        for rows, future in batch:
+            if not future.done():
+                future.set_result(predictions[offset:offset + len(rows)])
+            offset += len(rows)
+
+class PredictHandler(tornado.web.RequestHandler):
+    def initialize(self, batcher):
+        self.batcher = batcher
+
+    async def post(self):
+        try:
+            rows = parse_feature_rows(json.loads(self.request.body))
+        except (ValueError, TypeError, KeyError) as e:
+            self.set_status(400)
+            self.write({'error': str(e)})
+            return
+        predictions = await self.batcher.submit(rows)
+        self.write({'predictions': np.asarray(predictions, dtype=np.float64).tolist()})
+
+class HealthHandler(tornado.web.RequestHandler):
+    def initialize(self, batcher):
+        self.batcher = batcher
+
+    def get(self):
+        self.write({
+            'status': 'ok',
+            'batches': self.batcher.batches,
+            'rows': self.batcher.rows,
+            'max_batch_size': self.batcher.max_batch_size,
+            'max_wait_ms': self.batcher.max_wait * 1000.0
+        })
+
+def make_app(max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    """Build the tornado application serving /predict and /health."""
+    batcher = MicroBatcher(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    return tornado.web.Application([
+        (r'/predict', PredictHandler, {'batcher': batcher}),
+        (r'/health', HealthHandler, {'batcher': batcher})
+    ])
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless ridership prediction service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Maximum number of rows coalesced into one predict call.")
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="Maximum time a request waits for a batch to fill.")
+    args = parser.parse_args()
+
+    # Load the pipeline before accepting traffic so the first request is not penalised,
+    # and refuse to serve predictions that differ from the model's own
+    max_diff = check_predictions()
+    if max_diff != 0:
+        print(f"Served predictions differ from the XGBoost model by up to {max_diff}; not starting.", file=sys.stderr)
+        sys.exit(1)
+
+    app = make_app(args.max_batch_size, args.max_wait_ms)
+    app.listen(args.port, address=args.host)
+    print(f"Prediction service listening on http://{args.host}:{args.port}/predict")
+    tornado.ioloop.IOLoop.current().start()
+
+if __name__ == "__main__":
+    main()
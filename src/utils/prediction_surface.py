@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import threading
+import time
+import numpy as np
+from utils.model_utils import FEATURE_COLUMNS, MODELS_DIR, get_model, pipeline_version, predict_ridership_batch
+
+SURFACE_FILE = os.path.join(MODELS_DIR, 'prediction_surface.npy')
+SURFACE_META_FILE = os.path.join(MODELS_DIR, 'prediction_surface.json')
+
+# Integer range of each discrete input covered by the surface
+DISCRETE_RANGES = {
+    'Station_Age': (0, 100),
+    'Metro_Line_Encoded': (0, 12),
+    'Connectivity': (1, 10),
+    'Station_Density': (0, 10)
+}
+
+# Range of each continuous input, interpolated between grid points
+CONTINUOUS_RANGES = {
+    'Dist. From First Station(km)': (0.0, 50.0),
+    'Latitude': (28.40, 28.90),
+    'Longitude': (76.80, 77.60)
+}
+
+DEFAULT_GRID_POINTS = 41
+
+DISCRETE_FEATURES = list(DISCRETE_RANGES)
+CONTINUOUS_FEATURES = list(CONTINUOUS_RANGES)
+
+def split_thresholds(model, feature):
+    """Sorted float32 split thresholds the XGBoost model uses for a feature."""
+    trees = model.get_booster().trees_to_dataframe()
+    splits = trees.loc[trees['Feature'] == feature, 'Split'].to_numpy(dtype=np.float64)
+    return np.unique(splits.astype(np.float32))
+
+def discrete_bins(model, feature):
+    """
+    Group a discrete input's values by the split interval they fall into.
+
+    Every value in an interval takes the same path through every tree, so one
+    representative per interval reproduces the model exactly. Returns the
+    representative values and, for each value in the range, its interval number.
+    """
+    low, high = DISCRETE_RANGES[feature]
+    values = np.arange(low, high + 1, dtype=np.float64)
+    # The model takes raw feature values; XGBoost compares them as float32 against float32 thresholds
+    intervals = np.searchsorted(split_thresholds(model, feature), values.astype(np.float32), side='right')
+    _, first, bins = np.unique(intervals, return_index=True, return_inverse=True)
+    return values[first], bins
+
+class PredictionSurface:
+    """
+    Precomputed serving-pipeline predictions over every discrete input combination.
+
+    The table has one axis per discrete input's split intervals, followed by a
+    regular grid over distance, latitude and longitude, which lookups interpolate
+    trilinearly. Discrete inputs are exact; continuous ones are approximated.
+    """
+
+    def __init__(self, table, bins, axes, version):
+        self.table = table
+        self.bins = {feature: np.asarray(b, dtype=np.int64) for feature, b in bins.items()}
+        self.axes = {feature: tuple(axis) for feature, axis in axes.items()}
+        self.version = tuple(version)
+        self._discrete = [(FEATURE_COLUMNS.index(f), DISCRETE_RANGES[f][0], self.bins[f].tolist()) for f in DISCRETE_FEATURES]
+        self._continuous = [(FEATURE_COLUMNS.index(f),) + self.axes[f] for f in CONTINUOUS_FEATURES]
+
+    def lookup(self, row):
+        """Approximate ridership for a feature row, or None if it lies outside the surface."""
+        index = []
+        for column, low, bins in self._discrete:
+            offset = row[column] - low
+            # The discrete axes only cover whole values
+            if offset != int(offset) or not 0 <= offset < len(bins):
+                return None
+            index.append(bins[int(offset)])
+        cell = self.table[tuple(index)]
+        starts, fractions = [], []
+        for column, low, high, points in self._continuous:
+            position = (row[column] - low) / (high - low) * (points - 1)
+            if not 0 <= position <= points - 1:
+                return None
+            start = min(int(position), points - 2)
+            starts.append(start)
+            fractions.append(position - start)
+        (a, b, c), (fa, fb, fc) = starts, fractions
+        corners = cell[a:a + 2, b:b + 2, c:c + 2].tolist()
+        plane = [[corners[0][j][k] * (1 - fa) + corners[1][j][k] * fa for k in (0, 1)] for j in (0, 1)]
+        line = [plane[0][k] * (1 - fb) + plane[1][k] * fb for k in (0, 1)]
+        return line[0] * (1 - fc) + line[1] * fc
+
+def precompute_surface(grid_points=DEFAULT_GRID_POINTS):
+    """Predict the full surface with the current model."""
+    model = get_model('xgboost')
+    version = pipeline_version()
+    representatives, bins = {}, {}
+    for feature in DISCRETE_FEATURES:
+        representatives[feature], bins[feature] = discrete_bins(model, feature)
+    axes = {feature: (low, high, grid_points) for feature, (low, high) in CONTINUOUS_RANGES.items()}
+
+    axis_values = [representatives[f] for f in DISCRETE_FEATURES] + [np.linspace(*axes[f]) for f in CONTINUOUS_FEATURES]
+    shape = tuple(len(values) for values in axis_values)
+    table = np.empty(shape, dtype=np.float32)
+    # One predict call per value of the first axis keeps the feature matrix small
+    for i, first in enumerate(axis_values[0]):
+        grids = np.meshgrid(*([np.array([first])] + axis_values[1:]), indexing='ij')
+        by_feature = dict(zip(DISCRETE_FEATURES + CONTINUOUS_FEATURES, (grid.ravel() for grid in grids)))
+        features = np.column_stack([by_feature[col] for col in FEATURE_COLUMNS])
+        table[i] = predict_ridership_batch(features).reshape(shape[1:])
+    return PredictionSurface(table, bins, axes, version)
+
+def save_surface(surface):
+    """Write the table and its metadata atomically next to the models."""
+    tmp_path = f'{SURFACE_FILE}.{os.getpid()}.tmp.npy'
+    np.save(tmp_path, surface.table)
+    os.replace(tmp_path, SURFACE_FILE)
+    metadata = {
+        'version': list(surface.version),
+        'shape': list(surface.table.shape),
+        'bins': {feature: bins.tolist() for feature, bins in surface.bins.items()},
+        'axes': {feature: list(axis) for feature, axis in surface.axes.items()}
+    }
+    tmp_path = f'{SURFACE_META_FILE}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+    os.replace(tmp_path, SURFACE_META_FILE)
+
+def load_surface():
+    """Load the saved surface, or return None if it is missing or was built for other artifacts."""
+    try:
+        with open(SURFACE_META_FILE, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        # Memory-mapped: a lookup reads only the eight grid corners around the row
+        table = np.load(SURFACE_FILE, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if tuple(metadata['version']) != pipeline_version() or list(table.shape) != metadata['shape']:
+        return None
+    return PredictionSurface(table, metadata['bins'], metadata['axes'], metadata['version'])
+
+def surface_enabled():
+    """The simulator answers cache misses from the surface only with METRO_PREDICTION_SURFACE=1."""
+    return os.environ.get('METRO_PREDICTION_SURFACE') == '1'
+
+_surface_lock = threading.Lock()
+_surface = None
+_surface_key = None
+
+def get_prediction_surface():
+    """
+    Return the process-wide precomputed surface, or None if none has been built
+    for the current model.
+    """
+    global _surface, _surface_key
+    key = pipeline_version()
+    if os.path.exists(SURFACE_META_FILE):
+        key += (os.stat(SURFACE_META_FILE).st_mtime_ns,)
+    if key == _surface_key:
+        return _surface
+    with _surface_lock:
+        if key != _surface_key:
+            _surface = load_surface()
+            _surface_key = key
+        return _surface
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the simulator's prediction surface (run from the src directory).")
+    parser.add_argument('--grid-points', type=int, default=DEFAULT_GRID_POINTS,
+                        help="Grid points per continuous input (distance, latitude, longitude).")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    surface = precompute_surface(args.grid_points)
+    save_surface(surface)
+    print(f"Wrote {SURFACE_FILE}: shape {surface.table.shape}, "
+          f"{surface.table.nbytes / 1e6:.1f} MB in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import threading
+import numpy as np
+import pandas as pd
+from utils.data_loader import HOURLY_COLUMNS, load_table
+
+DAY_TYPES = ('Weekday', 'Weekend')
+HOURS = 24
+
+class RidershipCube:
+    """
+    Hourly ridership as a dense int32 array of shape (stations, 2, 24).
+
+    Axis 1 is the day type (0 = Weekday, 1 = Weekend) and axis 2 the hour of day.
+    Stations keep the row order of the hourly dataset; interchange stations that
+    appear once per line share a name, and name lookups resolve to the first row
+    as the DataFrame filters did.
+    """
+
+    def __init__(self, counts, station_names, metro_lines):
+        self.counts = np.ascontiguousarray(counts, dtype=np.int32)
+        self.station_names = np.asarray(station_names, dtype=object)
+        self.metro_lines = np.asarray(metro_lines, dtype=object)
+        self.station_index = {}
+        for row, name in enumerate(self.station_names):
+            self.station_index.setdefault(name, row)
+        self.line_names, self.line_codes = np.unique(self.metro_lines, return_inverse=True)
+
+    @classmethod
+    def from_table(cls, table):
+        """Build the cube from the Arrow 'hourly' table."""
+        wide = np.column_stack([table.column(col).to_numpy() for col in HOURLY_COLUMNS])
+        # HOURLY_COLUMNS interleaves Weekday_h, Weekend_h for each hour
+        counts = wide.reshape(len(wide), HOURS, len(DAY_TYPES)).transpose(0, 2, 1)
+        return cls(
+            counts,
+            table.column('Station_Name').to_pylist(),
+            table.column('Metro_Line').to_pylist()
+        )
+
+    @property
+    def stations(self):
+        """Sorted unique station names."""
+        return sorted(self.station_index)
+
+    def row(self, station_name):
+        try:
+            return self.station_index[station_name]
+        except KeyError:
+            raise ValueError(f"Station '{station_name}' not found in the data.") from None
+
+    def lookup(self, station_name, day_type, hour):
+        """Ridership of one station at one hour; day_type is 0/1 or 'Weekday'/'Weekend'."""
+        return int(self.counts[self.row(station_name), day_type_index(day_type), hour])
+
+    def station_profile(self, station_name):
+        """The (2, 24) weekday/weekend hourly profile of a station."""
+        return self.counts[self.row(station_name)]
+
+    def network_hourly(self):
+        """Network-wide ridership per hour, shape (2, 24)."""
+        return self.counts.sum(axis=0, dtype=np.int64)
+
+    def line_totals(self, day_type=None, hour=None):
+        """
+        Total ridership per metro line.
+
+        Sums over all hours and day types unless day_type and/or hour are given.
+        """
+        values = self.counts
+        if day_type is not None:
+            values = values[:, day_type_index(day_type)]
+        if hour is not None:
+            values = values[..., hour]
+        per_station = values.reshape(len(values), -1).sum(axis=1, dtype=np.int64)
+        totals = np.bincount(self.line_codes, weights=per_station, minlength=len(self.line_names))
+        return pd.Series(totals.astype(np.int64), index=self.line_names, name='Ridership')
+
+    def top_stations(self, hour, day_type=0, n=10):
+        """The n busiest station rows for an hour, as a DataFrame sorted by ridership."""
+        values = self.counts[:, day_type_index(day_type), hour]
+        n = min(n, len(values))
+        top = np.argpartition(values, -n)[-n:]
+        top = top[np.argsort(values[top])[::-1]]
+        return pd.DataFrame({
+            'Station': self.station_names[top],
+            'Metro Line': self.metro_lines[top],
+            'Ridership': values[top]
+        })
+
+def day_type_index(day_type):
+    if isinstance(day_type, str):
+        return DAY_TYPES.index(day_type)
+    return int(day_type)
+
+def day_type_for(weekday):
+    """Day type index for a datetime.weekday() value (Monday=0, Sunday=6)."""
+    return 0 if weekday < 5 else 1
+
+_cube_lock = threading.Lock()
+_cube_cache = {}
+
+def get_ridership_cube():
+    """
+    Return the cube built from the hourly dataset, shared process-wide.
+
+    The cube is rebuilt only when the data loader hands back a new table, i.e. when
+    the source data changes.
+    """
+    table = load_table('hourly')
+    with _cube_lock:
+        cached = _cube_cache.get('hourly')
+        if cached is None or cached[0] is not table:
+            cached = (table, RidershipCube.from_table(table))
+            _cube_cache['hourly'] = cached
+        return cached[1]
@@ -0,0 +1,147 @@
+import argparse
+import threading
+import time
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from utils.data_loader import load_table
+
+EARTH_RADIUS_KM = 6371
+
+def unit_vectors(latitude, longitude):
+    """Points on the unit sphere, shape (n, 3), for latitudes and longitudes in degrees."""
+    lat, lon = np.radians(np.asarray(latitude, dtype=np.float64)), np.radians(np.asarray(longitude, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+def chord_to_km(chord):
+    """Great-circle (haversine) distance in km for a straight-line distance between unit vectors."""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+def km_to_chord(km):
+    return 2 * np.sin(np.asarray(km) / (2 * EARTH_RADIUS_KM))
+
+class SpatialIndex:
+    """
+    Nearest-neighbour, radius and bounding-box queries over points in latitude/longitude.
+
+    Points are stored as unit vectors in a k-d tree. The straight-line (chord)
+    distance between unit vectors grows monotonically with great-circle distance,
+    so k-nearest and radius queries in 3D return exactly the haversine answers
+    without the per-query trigonometry of a haversine tree. Bounding boxes are
+    answered from the points sorted by latitude: a binary search for the latitude
+    band, then a longitude mask over that band.
+    """
+
+    def __init__(self, latitude, longitude):
+        self.latitude = np.asarray(latitude, dtype=np.float64)
+        self.longitude = np.asarray(longitude, dtype=np.float64)
+        self.tree = cKDTree(unit_vectors(self.latitude, self.longitude))
+        self.lat_order = np.argsort(self.latitude, kind='stable')
+        self.sorted_latitude = self.latitude[self.lat_order]
+        self.sorted_longitude = self.longitude[self.lat_order]
+
+    def __len__(self):
+        return len(self.latitude)
+
+    def nearest(self, latitude, longitude, k=5):
+        """(distances_km, indices) of the k nearest points to one location, nearest first."""
+        k = min(k, len(self))
+        chord, indices = self.tree.query(unit_vectors([latitude], [longitude])[0], k=k)
+        return chord_to_km(np.atleast_1d(chord)), np.atleast_1d(indices)
+
+    def within_radius(self, latitude, longitude, radius_km):
+        """(distances_km, indices) of the points within radius_km of one location, nearest first."""
+        point = unit_vectors([latitude], [longitude])[0]
+        indices = np.asarray(self.tree.query_ball_point(point, km_to_chord(radius_km)), dtype=np.int64)
+        distances = chord_to_km(np.linalg.norm(self.tree.data[indices] - point, axis=1))
+        order = np.argsort(distances, kind='stable')
+        return distances[order], indices[order]
+
+    def count_within(self, latitude, longitude, radius_km):
+        """Number of points within radius_km of each of many locations."""
+        points = unit_vectors(np.atleast_1d(latitude), np.atleast_1d(longitude))
+        return np.asarray(self.tree.query_ball_point(points, km_to_chord(radius_km), return_length=True))
+
+    def bbox(self, south, west, north, east):
+        """
+        Indices of the points inside a latitude/longitude box, in latitude order.
+
+        A box with west > east crosses the antimeridian.
+        """
+        start = np.searchsorted(self.sorted_latitude, south, side='left')
+        stop = np.searchsorted(self.sorted_latitude, north, side='right')
+        band = self.sorted_longitude[start:stop]
+        inside = (band >= west) & (band <= east) if west <= east else (band >= west) | (band <= east)
+        return self.lat_order[start:stop][inside]
+
+class StationLocator:
+    """
+    A SpatialIndex over station names, for "stations near this point" queries.
+
+    Interchange stations appear once per line in the dataset; here each name is
+    one point (at its first row's coordinates) with the lines serving it.
+    """
+
+    def __init__(self, stations):
+        stations = pd.DataFrame(stations)
+        grouped = stations.groupby('Station Names', sort=False)
+        self.stations = grouped[['Latitude', 'Longitude']].first()
+        self.stations.insert(0, 'Lines', grouped['Metro Line'].agg(lambda lines: ', '.join(sorted(set(lines)))))
+        self.stations = self.stations.rename_axis('Station').reset_index()
+        self.index = SpatialIndex(self.stations['Latitude'], self.stations['Longitude'])
+
+    def _frame(self, distances, indices):
+        found = self.stations.iloc[indices][['Station', 'Lines']].reset_index(drop=True)
+        found['Distance_km'] = np.round(distances, 2)
+        return found
+
+    def nearest(self, latitude, longitude, k=5):
+        """The k nearest stations as a DataFrame with Station, Lines and Distance_km."""
+        return self._frame(*self.index.nearest(latitude, longitude, k))
+
+    def within_radius(self, latitude, longitude, radius_km):
+        return self._frame(*self.index.within_radius(latitude, longitude, radius_km))
+
+    def in_bbox(self, south, west, north, east):
+        return self.stations.iloc[self.index.bbox(south, west, north, east)].reset_index(drop=True)
+
+_locator_lock = threading.Lock()
+_locator_cache = {}
+
+def get_station_locator():
+    """Return the station locator of the stations dataset, rebuilt only when the dataset changes."""
+    table = load_table('stations')
+    with _locator_lock:
+        cached = _locator_cache.get('stations')
+        if cached is None or cached[0] is not table:
+            columns = ['Station Names', 'Metro Line', 'Latitude', 'Longitude']
+            cached = (table, StationLocator(table.select(columns).to_pandas()))
+            _locator_cache['stations'] = cached
+        return cached[1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the station spatial index, or time it on random points (run from src).")
+    parser.add_argument('latitude', type=float, nargs='?')
+    parser.add_argument('longitude', type=float, nargs='?')
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--benchmark-points', type=int, help="Time queries on this many random points around Delhi instead.")
+    args = parser.parse_args()
+
+    if args.benchmark_points:
+        rng = np.random.default_rng(0)
+        n = args.benchmark_points
+        index = SpatialIndex(rng.uniform(28.4, 28.9, n), rng.uniform(76.8, 77.6, n))
+        queries = np.column_stack([rng.uniform(28.4, 28.9, 1000), rng.uniform(76.8, 77.6, 1000)])
+        for name, fn in [('nearest k=5', lambda q: index.nearest(q[0], q[1], 5)),
+                         ('radius 1 km', lambda q: index.within_radius(q[0], q[1], 1.0)),
+                         ('bbox 0.05 deg', lambda q: index.bbox(q[0], q[1], q[0] + 0.05, q[1] + 0.05))]:
+            start = time.perf_counter()
+            for q in queries:
+                fn(q)
+            print(f"{name:14s} {(time.perf_counter() - start) / len(queries) * 1e6:8.1f} us/query ({n:,} points)")
+        return
+    print(get_station_locator().nearest(args.latitude, args.longitude, args.k).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import threading
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from utils.data_loader import load_table
+from utils.instrumentation import record_cache
+from utils.streaming_stats import QuantileSketch, RunningMoments, TopK, describe
+
+# Largest values kept per column by the top-k trackers
+TOP_K = 10
+
+# Column whose top values are tracked with their station names, per dataset
+TOP_KEYS = {'stations': ('Daily_Ridership', 'Station Names')}
+
+def _numeric_values(column):
+    """
+    The non-null values of a numeric Arrow column as a numpy array.
+
+    Read straight from the value buffers: Array.to_numpy() imports pandas, which
+    would put it on the import path of the Home page.
+    """
+    column = pc.drop_null(column)
+    kind = 'f' if pa.types.is_floating(column.type) else 'i' if pa.types.is_signed_integer(column.type) else 'u'
+    dtype = np.dtype(f'{kind}{column.type.bit_width // 8}')
+    chunks = [np.frombuffer(chunk.buffers()[1], dtype=dtype, count=chunk.offset + len(chunk))[chunk.offset:] for chunk in column.chunks]
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+class StatisticsStore:
+    """
+    Summary statistics of a table, maintained incrementally as rows are appended.
+
+    Every numeric column has running moments (count, mean, variance, min, max) and
+    a quantile sketch; optionally one column also has a top-k of its largest values
+    with a key column. Appending rows folds in only the new rows, and reading any
+    statistic does not touch the data.
+    """
+
+    def __init__(self, top_column=None, key_column=None):
+        self.columns = {}
+        self.rows = 0
+        self.top_column = top_column
+        self.key_column = key_column
+        self.top_k = TopK(TOP_K) if top_column else None
+        self._lock = threading.Lock()
+
+    def append(self, table):
+        """Fold the rows of an Arrow table (or DataFrame) into the statistics."""
+        if not isinstance(table, pa.Table):
+            table = pa.Table.from_pandas(table, preserve_index=False)
+        with self._lock:
+            self._append(table)
+
+    def _append(self, table):
+        for name, column in zip(table.column_names, table.columns):
+            if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+                continue
+            values = _numeric_values(column)
+            values = values[~np.isnan(values)] if pa.types.is_floating(column.type) else values
+            moments, sketch = self.columns.setdefault(name, (RunningMoments(), QuantileSketch()))
+            moments.update(values)
+            sketch.update(values)
+        if self.top_k is not None:
+            ranked = table.filter(pc.is_valid(table.column(self.top_column)))
+            self.top_k.update(_numeric_values(ranked.column(self.top_column)), ranked.column(self.key_column).to_pylist())
+        self.rows += table.num_rows
+
+    def mean(self, column):
+        with self._lock:
+            return self.columns[column][0].mean
+
+    def quantile(self, column, q):
+        with self._lock:
+            return self.columns[column][1].quantile(q)
+
+    def top(self, n=1):
+        """The n largest (value, key) pairs of the tracked column, largest first."""
+        with self._lock:
+            return self.top_k.top()[:n]
+
+    def describe(self):
+        """Summary statistics of every numeric column, laid out like DataFrame.describe()."""
+        # pandas is only needed here; the Home metrics are read without importing it
+        import pandas as pd
+        with self._lock:
+            return pd.DataFrame({name: describe(moments, sketch) for name, (moments, sketch) in self.columns.items()})
+
+_store_lock = threading.Lock()
+_stores = {}
+
+def _is_prefix(previous, table):
+    """True if the rows of previous are exactly the first rows of table."""
+    return table.num_rows >= previous.num_rows and table.slice(0, previous.num_rows).equals(previous)
+
+def get_statistics_store(name):
+    """
+    Return the statistics store of a dataset, shared process-wide.
+
+    When the dataset changes and the previous rows are unchanged at its start, only
+    the appended rows are folded in; otherwise the store is rebuilt.
+    """
+    table = load_table(name)
+    cached = _stores.get(name)
+    if cached is not None and cached[0] is table:
+        record_cache('statistics', True)
+        return cached[1]
+    with _store_lock:
+        cached = _stores.get(name)
+        record_cache('statistics', cached is not None and cached[0] is table)
+        if cached is not None and cached[0] is table:
+            return cached[1]
+        if cached is not None and cached[1].rows == cached[0].num_rows and _is_prefix(cached[0], table):
+            store = cached[1]
+            store.append(table.slice(store.rows))
+        else:
+            store = StatisticsStore(*TOP_KEYS.get(name, (None, None)))
+            store.append(table)
+        _stores[name] = (table, store)
+        return store
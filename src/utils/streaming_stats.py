@@ -0,0 +1,204 @@
+import heapq
+import numpy as np
+
+# Quantiles reported in summary statistics, as in DataFrame.describe()
+SUMMARY_QUANTILES = (0.25, 0.5, 0.75)
+
+class RunningMoments:
+    """
+    Count, mean, variance, min and max of a stream of values in O(1) memory.
+
+    Batches are folded in with Chan et al.'s parallel update, so the result does
+    not depend on how the stream is split and two instances can be merged.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        batch = RunningMoments()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1), as pandas reports it."""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+class IntegerHistogram:
+    """
+    Exact counts of non-negative integer values, for exact streaming quantiles.
+
+    Memory is proportional to the largest value seen, not to the number of values,
+    which suits ridership counts.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def update(self, values):
+        values = np.asarray(values)
+        if len(values) == 0:
+            return
+        if values.min() < 0:
+            raise ValueError("IntegerHistogram only counts non-negative values.")
+        counts = np.bincount(values.astype(np.int64, copy=False))
+        self.merge_counts(counts)
+
+    def merge_counts(self, counts):
+        if len(counts) > len(self.counts):
+            self.counts = np.pad(self.counts, (0, len(counts) - len(self.counts)))
+        self.counts[:len(counts)] += counts
+
+    def merge(self, other):
+        self.merge_counts(other.counts)
+
+    def quantile(self, q):
+        """The q-quantile with linear interpolation, matching numpy's default."""
+        return weighted_quantile(np.arange(len(self.counts)), self.counts, q)
+
+def weighted_quantile(sorted_values, weights, q):
+    """
+    The q-quantile of sorted values each repeated weight times, with linear interpolation.
+
+    With unit weights this is numpy's (and pandas') default quantile.
+    """
+    cumulative = np.cumsum(weights)
+    total = cumulative[-1] if len(cumulative) else 0
+    if total == 0:
+        return np.nan
+    position = q * (total - 1)
+    lower = sorted_values[np.searchsorted(cumulative, np.floor(position), side='right')]
+    upper = sorted_values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+    return float(lower + (upper - lower) * (position - np.floor(position)))
+
+class QuantileSketch:
+    """
+    A KLL quantile sketch: approximate quantiles of a stream in O(k log n) memory.
+
+    Items are kept in levels where an item at level h stands for 2**h values.
+    When a level outgrows its capacity it is sorted and every other item is
+    promoted to the level above, alternating the starting offset so the errors
+    cancel out. Capacities shrink by 2/3 per level below the top. Until the first
+    compaction (fewer than k values) quantiles are exact.
+    """
+
+    def __init__(self, k=1024):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._offset = 0
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so the promoted pairs are complete
+                keep = items[len(items) - len(items) % 2:]
+                promoted = items[self._offset:len(items) - len(items) % 2:2]
+                self._offset ^= 1
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantile(self, q):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.int64) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return weighted_quantile(values[order], weights[order], q)
+
+class TopK:
+    """
+    The k largest values of a stream with their keys, in O(k) memory.
+
+    Ties keep the earliest key, as DataFrame.idxmax() does.
+    """
+
+    def __init__(self, k=10):
+        self.k = k
+        self._heap = []
+        self._seen = 0
+
+    def update(self, values, keys):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) > self.k:
+            # Only the batch's own top k (ties resolved by position) can enter
+            candidates = np.lexsort((np.arange(len(values)), -values))[:self.k]
+            candidates.sort()
+        else:
+            candidates = range(len(values))
+        for i in candidates:
+            item = (values[i], -(self._seen + i), keys[i])
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            elif item[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, item)
+        self._seen += len(values)
+
+    def top(self):
+        """(value, key) pairs, largest first."""
+        return [(value, key) for value, _, key in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+def describe(moments, histogram=None, quantiles=SUMMARY_QUANTILES):
+    """
+    Summary statistics in the order of DataFrame.describe(), as a dict.
+
+    histogram is anything with a quantile(q) method, such as an IntegerHistogram
+    or a QuantileSketch.
+    """
+    summary = {'count': moments.count, 'mean': moments.mean if moments.count else np.nan, 'std': moments.std,
+               'min': moments.min if moments.count else np.nan}
+    for q in quantiles:
+        summary[f'{q:.0%}'] = histogram.quantile(q) if histogram is not None else np.nan
+    summary['max'] = moments.max if moments.count else np.nan
+    return summary
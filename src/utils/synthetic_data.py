@@ -0,0 +1,245 @@
+import argparse
+import datetime
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.data_loader import load_dataset
+
+# Hourly share of daily ridership on weekdays and weekends (from the notebook)
+WEEKDAY_PATTERN = [0.02, 0.01, 0.01, 0.01, 0.02, 0.05, 0.08, 0.12, 0.10, 0.07, 0.06, 0.05,
+                   0.05, 0.05, 0.05, 0.06, 0.07, 0.10, 0.12, 0.10, 0.08, 0.05, 0.03, 0.02]
+WEEKEND_PATTERN = [0.01, 0.01, 0.01, 0.01, 0.01, 0.02, 0.03, 0.05, 0.07, 0.09, 0.10, 0.10,
+                   0.10, 0.10, 0.09, 0.08, 0.07, 0.06, 0.05, 0.04, 0.03, 0.02, 0.02, 0.01]
+
+# Features and weights of the synthetic daily ridership formula (from the notebook)
+RIDERSHIP_FEATURES = ['Station_Age', 'Metro_Line_Encoded', 'Connectivity', 'Station_Density',
+                      'Dist. From First Station(km)', 'Latitude', 'Longitude']
+RIDERSHIP_WEIGHTS = np.array([0.2, 0.2, 0.2, 0.15, 0.15, 0.05, 0.05])
+RIDERSHIP_NOISE = 0.1
+# Daily ridership spans RIDERSHIP_MIN to RIDERSHIP_MIN + RIDERSHIP_SPAN
+RIDERSHIP_MIN = 1000
+RIDERSHIP_SPAN = 9000
+
+# Day-to-day variation of a station's ridership, as the sigma of a log-normal factor
+DAY_NOISE = 0.1
+
+# Jitter applied to sampled template stations
+COORD_JITTER = 0.02
+DIST_JITTER_KM = 1.0
+
+# Stations per generated chunk. A chunk is one block of stations over one month,
+# seeded by (seed, block, year, month), so the output depends only on the seed,
+# the station count and the date range.
+STATION_BLOCK = 1024
+
+# Rows per Parquet file before a month partition rolls over to a new file
+MAX_ROWS_PER_FILE = 20_000_000
+
+HOURLY_SCHEMA = pa.schema([
+    ('Station_ID', pa.int32()),
+    ('Metro_Line', pa.dictionary(pa.int8(), pa.string())),
+    ('Date', pa.date32()),
+    ('Hour', pa.int8()),
+    ('Day_Type', pa.dictionary(pa.int8(), pa.string())),
+    ('Ridership', pa.int32())
+])
+
+STATION_COLUMNS = ['Station Names', 'Metro Line', 'Dist. From First Station(km)', 'Latitude', 'Longitude',
+                   'Opening_Year', 'Station_Age', 'Metro_Line_Encoded', 'Connectivity', 'Station_Density']
+
+class RidershipGenerator:
+    """
+    Seeded synthetic ridership for any number of stations and days.
+
+    Stations are sampled from a template station table and jittered, their daily
+    ridership follows the notebook's weighted-feature formula with noise, and
+    hourly ridership is the daily ridership times the weekday or weekend hourly
+    pattern, with a log-normal day factor and Poisson counts. The feature scaling
+    and ridership range are fixed from the template up front, so any chunk can be
+    generated on its own.
+    """
+
+    def __init__(self, template, seed=42):
+        self.template = template[STATION_COLUMNS].reset_index(drop=True)
+        self.seed = seed
+        self.line_names = np.asarray(sorted(self.template['Metro Line'].unique()), dtype=object)
+        features = self._ridership_features(self.template)
+        # MinMax scaling fixed by the template, as the notebook fitted it on the real stations
+        self.feature_min = features.min(axis=0)
+        self.feature_span = np.where(np.ptp(features, axis=0) > 0, np.ptp(features, axis=0), 1)
+        base = self._base_ridership(features)
+        self.base_min = base.min() - 3 * RIDERSHIP_NOISE
+        self.base_span = np.ptp(base) + 6 * RIDERSHIP_NOISE
+        self.patterns = np.array([WEEKDAY_PATTERN, WEEKEND_PATTERN])
+
+    @staticmethod
+    def _ridership_features(stations):
+        features = stations[RIDERSHIP_FEATURES].to_numpy(dtype=np.float64).copy()
+        # Stations closer to the start of a line are busier
+        features[:, 4] = 1 / (1 + features[:, 4])
+        return features
+
+    def _base_ridership(self, features):
+        return ((features - self.feature_min) / self.feature_span) @ RIDERSHIP_WEIGHTS
+
+    def stations(self, block, n_stations):
+        """The stations of one block as a DataFrame, with Station_ID and Daily_Ridership."""
+        start = block * STATION_BLOCK
+        size = min(STATION_BLOCK, n_stations - start)
+        rng = np.random.default_rng([self.seed, block])
+        stations = self.template.iloc[rng.integers(0, len(self.template), size)].reset_index(drop=True)
+        station_ids = np.arange(start, start + size, dtype=np.int32)
+        stations.insert(0, 'Station_ID', station_ids)
+        stations['Station Names'] = stations['Station Names'] + ' #' + station_ids.astype(str).astype(object)
+        stations['Latitude'] += rng.normal(0, COORD_JITTER, size)
+        stations['Longitude'] += rng.normal(0, COORD_JITTER, size)
+        stations['Dist. From First Station(km)'] = np.maximum(stations['Dist. From First Station(km)'] + rng.normal(0, DIST_JITTER_KM, size), 0)
+        ridership = self._base_ridership(self._ridership_features(stations)) + rng.normal(0, RIDERSHIP_NOISE, size)
+        scaled = np.clip((ridership - self.base_min) / self.base_span, 0, 1)
+        stations['Daily_Ridership'] = (RIDERSHIP_MIN + RIDERSHIP_SPAN * scaled).astype(np.int64)
+        return stations
+
+    def hourly_chunk(self, stations, block, days):
+        """
+        Hourly ridership of a block of stations over consecutive days, as an Arrow table.
+
+        days is a datetime64[D] array within one month; rows are ordered by station,
+        then date, then hour.
+        """
+        year, month = int(str(days[0])[:4]), int(str(days[0])[5:7])
+        rng = np.random.default_rng([self.seed, block, year, month])
+        n_stations, n_days = len(stations), len(days)
+        weekend = ((days.astype(np.int64) + 3) % 7 >= 5).astype(np.int64)  # 1970-01-01 was a Thursday
+        day_factor = rng.lognormal(-DAY_NOISE ** 2 / 2, DAY_NOISE, (n_stations, n_days))
+        daily = stations['Daily_Ridership'].to_numpy(dtype=np.float64)[:, None] * day_factor
+        expected = daily[:, :, None] * self.patterns[weekend][None, :, :]
+        ridership = rng.poisson(expected).astype(np.int32)
+
+        line_codes = np.searchsorted(self.line_names, stations['Metro Line'].to_numpy()).astype(np.int8)
+        per_station = n_days * 24
+        return pa.table([
+            pa.array(np.repeat(stations['Station_ID'].to_numpy(), per_station)),
+            pa.DictionaryArray.from_arrays(np.repeat(line_codes, per_station), self.line_names.tolist()),
+            pa.array(np.tile(np.repeat(days, 24), n_stations)),
+            pa.array(np.tile(np.arange(24, dtype=np.int8), n_stations * n_days)),
+            pa.DictionaryArray.from_arrays(np.tile(np.repeat(weekend.astype(np.int8), 24), n_stations), ['Weekday', 'Weekend']),
+            pa.array(ridership.ravel())
+        ], schema=HOURLY_SCHEMA)
+
+def month_ranges(start_date, n_days):
+    """Split n_days from start_date into datetime64[D] arrays, one per calendar month."""
+    days = np.datetime64(start_date, 'D') + np.arange(n_days)
+    months = days.astype('datetime64[M]')
+    boundaries = np.flatnonzero(months[1:] != months[:-1]) + 1
+    return np.split(days, boundaries)
+
+class _PartitionWriter:
+    """Writes one hive partition directory, rolling to a new file every MAX_ROWS_PER_FILE rows."""
+
+    def __init__(self, directory, schema):
+        self.directory = directory
+        self.schema = schema
+        self.writer = None
+        self.files = 0
+        self.rows_in_file = 0
+
+    def write(self, table):
+        if self.writer is None or self.rows_in_file >= MAX_ROWS_PER_FILE:
+            self.close()
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f'part-{self.files:05d}.parquet')
+            self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+            self.files += 1
+            self.rows_in_file = 0
+        # Each chunk is one row group, so its min/max statistics cover one station block
+        self.writer.write_table(table, row_group_size=len(table))
+        self.rows_in_file += len(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+def generate(output_dir, n_stations, n_days, start_date='2020-01-01', seed=42, template=None, progress=None):
+    """
+    Write a synthetic ridership dataset to output_dir and return its manifest.
+
+    - stations.parquet: one row per station, with the columns of the stations dataset
+    - hourly/year=YYYY/month=MM/part-NNNNN.parquet: Station_ID, Metro_Line, Date,
+      Hour, Day_Type and Ridership per station, day and hour
+
+    Chunks of STATION_BLOCK stations by one month are generated and written one at
+    a time, so memory use does not grow with the number of stations or days.
+    Station attributes are regenerated per month from their block seed rather than
+    kept in memory.
+    """
+    template = load_dataset('stations') if template is None else template
+    generator = RidershipGenerator(template, seed)
+    n_blocks = -(-n_stations // STATION_BLOCK)
+
+    station_writer = None
+    for block in range(n_blocks):
+        table = pa.Table.from_pandas(generator.stations(block, n_stations), preserve_index=False)
+        if station_writer is None:
+            os.makedirs(output_dir, exist_ok=True)
+            station_writer = pq.ParquetWriter(os.path.join(output_dir, 'stations.parquet'), table.schema, compression='zstd')
+        station_writer.write_table(table)
+    if station_writer is not None:
+        station_writer.close()
+
+    rows = 0
+    months = month_ranges(start_date, n_days)
+    for i, days in enumerate(months):
+        year, month = str(days[0])[:4], str(days[0])[5:7]
+        writer = _PartitionWriter(os.path.join(output_dir, 'hourly', f'year={year}', f'month={month}'), HOURLY_SCHEMA)
+        try:
+            for block in range(n_blocks):
+                chunk = generator.hourly_chunk(generator.stations(block, n_stations), block, days)
+                writer.write(chunk)
+                rows += len(chunk)
+        finally:
+            writer.close()
+        if progress:
+            progress(i + 1, len(months), rows)
+
+    manifest = {
+        'seed': seed,
+        'stations': n_stations,
+        'days': n_days,
+        'start_date': str(np.datetime64(start_date, 'D')),
+        'hourly_rows': rows,
+        'station_block': STATION_BLOCK
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic station x day x hour ridership dataset as partitioned Parquet (run from src).")
+    parser.add_argument('output_dir')
+    parser.add_argument('--stations', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--start-date', default='2020-01-01', type=lambda s: str(datetime.date.fromisoformat(s)))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--overwrite', action='store_true', help="Replace output_dir if it already exists.")
+    args = parser.parse_args()
+
+    if os.path.exists(args.output_dir) and os.listdir(args.output_dir):
+        if not args.overwrite:
+            parser.error(f"'{args.output_dir}' is not empty; pass --overwrite to replace it.")
+        shutil.rmtree(args.output_dir)
+
+    def progress(done, total, rows):
+        print(f"\r{done}/{total} months, {rows:,} rows", end='', flush=True)
+
+    start = time.perf_counter()
+    manifest = generate(args.output_dir, args.stations, args.days, args.start_date, args.seed, progress=progress)
+    print(f"\nWrote {manifest['hourly_rows']:,} hourly rows for {manifest['stations']:,} stations in "
+          f"{time.perf_counter() - start:.1f}s to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
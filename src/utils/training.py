@@ -0,0 +1,201 @@
+import itertools
+import json
+import os
+import platform
+import time
+import numpy as np
+import pandas as pd
+import joblib
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import VotingRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import KFold, cross_validate, train_test_split
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+from xgboost import XGBRegressor
+from utils.data_loader import DATA_DIR, DATASET_FILES, csv_path, load_dataset
+from utils.file_utils import file_hash
+from utils.conformal import calibrate, save_calibration
+from utils.model_evaluation import EVALUATED_MODELS
+from utils.model_utils import FEATURE_COLUMNS, MODEL_FILES, MODELS_DIR, evaluate_model
+
+TARGET_COLUMN = 'Daily_Ridership'
+
+# Held-out split and folds, as in the notebook
+TEST_SIZE = 0.3
+RANDOM_STATE = 42
+CV_FOLDS = 5
+
+# Hyperparameters searched for XGBoost; n_estimators is chosen by early stopping
+XGB_PARAM_GRID = {
+    'max_depth': [3, 5, 7],
+    'learning_rate': [0.01, 0.05, 0.1],
+    'subsample': [0.8, 1.0],
+    'colsample_bytree': [0.8, 1.0]
+}
+XGB_MAX_ESTIMATORS = 1000
+EARLY_STOPPING_ROUNDS = 30
+
+# Columns the ridership scaler was fitted on in the notebook (distance is inverted first).
+# scaler.pkl is kept for the notebook's ridership normalisation only: the models are
+# trained on raw FEATURE_COLUMNS, and nothing that serves predictions applies it.
+SCALER_COLUMNS = ['Station_Age', 'Metro_Line_Encoded', 'Connectivity', 'Station_Density', 'Dist. From First Station(km)', 'Latitude', 'Longitude']
+
+VERSIONS_DIR = os.path.join(MODELS_DIR, 'versions')
+
+def scaler_features(df):
+    """The scaler's input frame: SCALER_COLUMNS with distance mapped to 1 / (1 + km)."""
+    features = df[SCALER_COLUMNS].copy()
+    features['Dist. From First Station(km)'] = 1 / (1 + features['Dist. From First Station(km)'])
+    return features
+
+def fit_preprocessors(df):
+    """Fit the line encoder and the ridership-normalisation scaler (not a model input transform)."""
+    line_encoder = LabelEncoder().fit(df['Metro Line'])
+    scaler = MinMaxScaler().fit(scaler_features(df))
+    return line_encoder, scaler
+
+def _score_candidate(params, X, y, train_idx, val_idx, seed):
+    """Fit one (params, fold) pair with early stopping; return (best iteration, validation RMSE)."""
+    model = XGBRegressor(
+        n_estimators=XGB_MAX_ESTIMATORS, early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+        eval_metric='rmse', random_state=seed, n_jobs=1, **params
+    )
+    model.fit(X[train_idx], y[train_idx], eval_set=[(X[val_idx], y[val_idx])], verbose=False)
+    return model.best_iteration + 1, float(model.best_score)
+
+def search_xgboost(X_train, y_train, folds=CV_FOLDS, n_jobs=-1, seed=RANDOM_STATE, param_grid=XGB_PARAM_GRID):
+    """
+    K-fold grid search over param_grid with early stopping on each validation fold.
+
+    Every (candidate, fold) fit runs as its own joblib task across all cores. Returns
+    the best parameters, with n_estimators set to the median early-stopped iteration
+    count of the best candidate, and the per-candidate CV results.
+    """
+    X, y = np.asarray(X_train, dtype=np.float64), np.asarray(y_train, dtype=np.float64)
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=seed).split(X))
+    candidates = [dict(zip(param_grid, values)) for values in itertools.product(*param_grid.values())]
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_score_candidate)(params, X, y, train_idx, val_idx, seed)
+        for params in candidates for train_idx, val_idx in splits
+    )
+    results = []
+    for i, params in enumerate(candidates):
+        fold_scores = scores[i * folds:(i + 1) * folds]
+        results.append({
+            'params': params,
+            'cv_rmse': float(np.mean([rmse for _, rmse in fold_scores])),
+            'n_estimators': int(np.median([iterations for iterations, _ in fold_scores]))
+        })
+    best = min(results, key=lambda r: r['cv_rmse'])
+    return dict(best['params'], n_estimators=best['n_estimators']), results
+
+def cross_validate_models(models, X, y, folds=CV_FOLDS, n_jobs=-1, seed=RANDOM_STATE):
+    """5-fold RMSE and R² (mean and std) for each model, with folds run in parallel."""
+    kf = KFold(n_splits=folds, shuffle=True, random_state=seed)
+    summary = {}
+    for name, model in models.items():
+        scores = cross_validate(clone(model), X, y, cv=kf, n_jobs=n_jobs, scoring=('neg_mean_squared_error', 'r2'))
+        rmse = np.sqrt(-scores['test_neg_mean_squared_error'])
+        summary[name] = {
+            'rmse_mean': float(rmse.mean()), 'rmse_std': float(rmse.std()),
+            'r2_mean': float(scores['test_r2'].mean()), 'r2_std': float(scores['test_r2'].std())
+        }
+    return summary
+
+def train_models(df, n_jobs=-1, seed=RANDOM_STATE, param_grid=XGB_PARAM_GRID, folds=CV_FOLDS):
+    """
+    Reproduce the notebook's training pipeline on the stations dataset.
+
+    Returns (artifacts, report): artifacts maps MODEL_FILES names to fitted objects;
+    report holds the chosen hyperparameters, CV scores and held-out metrics.
+    """
+    line_encoder, scaler = fit_preprocessors(df)
+    X, y = df[FEATURE_COLUMNS], df[TARGET_COLUMN]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=seed)
+
+    xgb_params, search_results = search_xgboost(X_train, y_train, folds=folds, n_jobs=n_jobs, seed=seed, param_grid=param_grid)
+    # n_jobs=1 keeps the served model single-threaded, as latency matters more than throughput there
+    xgb_model = XGBRegressor(random_state=seed, n_jobs=1, **xgb_params).fit(X_train, y_train)
+    lr_model = LinearRegression().fit(X_train, y_train)
+    ensemble_model = VotingRegressor(estimators=[('xgb', xgb_model), ('lr', lr_model)]).fit(X_train, y_train)
+    models = {'xgboost': xgb_model, 'linear_regression': lr_model, 'ensemble': ensemble_model}
+
+    metrics = {}
+    for name, model in models.items():
+        rmse, mae, r2 = evaluate_model(y_test, model.predict(X_test))
+        metrics[name] = {'rmse': float(rmse), 'mae': float(mae), 'r2': float(r2)}
+
+    report = {
+        'xgboost_params': xgb_params,
+        'search_candidates': len(search_results),
+        'cross_validation': cross_validate_models(models, X, y, folds=folds, n_jobs=n_jobs, seed=seed),
+        'test_metrics': metrics,
+        'train_rows': len(X_train),
+        'test_rows': len(X_test)
+    }
+    artifacts = dict(models, scaler=scaler, line_encoder=line_encoder)
+    return artifacts, report
+
+def metrics_frame(test_metrics):
+    """model_performance_metrics.csv rows for the held-out metrics."""
+    return pd.DataFrame([
+        {'Model': EVALUATED_MODELS[name], 'RMSE': m['rmse'], 'MAE': m['mae'], 'R² Score': m['r2']}
+        for name, m in test_metrics.items()
+    ])
+
+def _atomic_copy(source, destination):
+    tmp_path = f'{destination}.{os.getpid()}.tmp'
+    with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+        dst.write(src.read())
+    os.replace(tmp_path, destination)
+
+def write_artifacts(artifacts, report, publish=True):
+    """
+    Write a versioned copy of every artifact, then publish it.
+
+    Artifacts and a manifest go to models/versions/<version>/. Publishing replaces
+    each file in models/ and data/model_performance_metrics.csv atomically; the
+    registry and data loader pick up the new files by content hash.
+    Returns the version directory.
+    """
+    version = time.strftime('%Y%m%d-%H%M%S') + '-' + file_hash(csv_path('stations'))[:8]
+    version_dir = os.path.join(VERSIONS_DIR, version)
+    os.makedirs(version_dir, exist_ok=True)
+    for name, artifact in artifacts.items():
+        joblib.dump(artifact, os.path.join(version_dir, MODEL_FILES[name]))
+    metrics_path = os.path.join(version_dir, DATASET_FILES['model_metrics'])
+    metrics_frame(report['test_metrics']).to_csv(metrics_path, index=False)
+
+    manifest = dict(
+        report,
+        version=version,
+        data_sha256=file_hash(csv_path('stations')),
+        artifacts={MODEL_FILES[name]: file_hash(os.path.join(version_dir, MODEL_FILES[name])) for name in artifacts},
+        python=platform.python_version(),
+        libraries={lib.__name__: lib.__version__ for lib in (np, pd, joblib, __import__('sklearn'), __import__('xgboost'))}
+    )
+    with open(os.path.join(version_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    if publish:
+        for name in artifacts:
+            _atomic_copy(os.path.join(version_dir, MODEL_FILES[name]), os.path.join(MODELS_DIR, MODEL_FILES[name]))
+        _atomic_copy(metrics_path, os.path.join(DATA_DIR, DATASET_FILES['model_metrics']))
+    return version_dir
+
+def run_training(n_jobs=-1, seed=RANDOM_STATE, quick=False, publish=True):
+    """
+    Train every artifact from the stations dataset and write it out. Returns (version_dir, report).
+
+    Published models are also calibrated for the simulator's prediction intervals.
+    """
+    df = load_dataset('stations')
+    param_grid = {key: values[:1] if quick else values for key, values in XGB_PARAM_GRID.items()}
+    if quick:
+        param_grid['learning_rate'] = [0.1]
+    artifacts, report = train_models(df, n_jobs=n_jobs, seed=seed, param_grid=param_grid)
+    version_dir = write_artifacts(artifacts, report, publish=publish)
+    if publish:
+        save_calibration(calibrate(random_state=seed))
+    return version_dir, report
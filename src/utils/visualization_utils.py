@@ -1,66 +1,97 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from utils.figure_rendering import render_figure
+
+# Each draw_* function draws onto the Figure it is given; the matching plot_*
+# function renders it through the figure cache and returns PNG bytes for st.image.
+# seaborn is imported by the draw functions that use it, as it takes most of a second to import.
+
+def draw_daily_ridership_distribution(fig, df):
+    import seaborn as sns
+    ax = fig.subplots()
+    sns.histplot(df['Daily_Ridership'], bins=30, kde=True, color='skyblue', ax=ax)
+    ax.set_title('Daily Ridership Distribution')
+    ax.set_xlabel('Daily Ridership')
+    ax.set_ylabel('Frequency')
+    ax.grid(True)
+    fig.tight_layout()
 
 def plot_daily_ridership_distribution(df):
-    plt.figure(figsize=(12, 6))
-    sns.histplot(df['Daily_Ridership'], bins=30, kde=True, color='skyblue')
-    plt.title('Daily Ridership Distribution')
-    plt.xlabel('Daily Ridership')
-    plt.ylabel('Frequency')
-    plt.grid(True)
-    plt.tight_layout()
-    return plt
+    return render_figure(draw_daily_ridership_distribution, df[['Daily_Ridership']], figsize=(12, 6))
+
+def draw_ridership_by_station_age(fig, df):
+    import seaborn as sns
+    ax = fig.subplots()
+    sns.scatterplot(x='Station_Age', y='Daily_Ridership', hue='Metro Line', data=df, palette='viridis', s=100, alpha=0.7, ax=ax)
+    ax.set_title('Ridership by Station Age')
+    ax.set_xlabel('Station Age (years)')
+    ax.set_ylabel('Daily Ridership')
+    ax.grid(True)
+    fig.tight_layout()
 
 def plot_ridership_by_station_age(df):
-    plt.figure(figsize=(12, 6))
-    sns.scatterplot(x='Station_Age', y='Daily_Ridership', hue='Metro Line', data=df, palette='viridis', s=100, alpha=0.7)
-    plt.title('Ridership by Station Age')
-    plt.xlabel('Station Age (years)')
-    plt.ylabel('Daily Ridership')
-    plt.grid(True)
-    plt.tight_layout()
-    return plt
+    return render_figure(draw_ridership_by_station_age, df[['Station_Age', 'Daily_Ridership', 'Metro Line']], figsize=(12, 6))
+
+def draw_ridership_by_distance(fig, df):
+    import seaborn as sns
+    ax = fig.subplots()
+    sns.scatterplot(x='Dist. From First Station(km)', y='Daily_Ridership', hue='Metro Line', data=df, palette='viridis', s=100, alpha=0.7, ax=ax)
+    ax.set_title('Ridership by Distance from First Station')
+    ax.set_xlabel('Distance from First Station (km)')
+    ax.set_ylabel('Daily Ridership')
+    ax.grid(True)
+    fig.tight_layout()
 
 def plot_ridership_by_distance(df):
-    plt.figure(figsize=(12, 6))
-    sns.scatterplot(x='Dist. From First Station(km)', y='Daily_Ridership', hue='Metro Line', data=df, palette='viridis', s=100, alpha=0.7)
-    plt.title('Ridership by Distance from First Station')
-    plt.xlabel('Distance from First Station (km)')
-    plt.ylabel('Daily Ridership')
-    plt.grid(True)
-    plt.tight_layout()
-    return plt
+    columns = ['Dist. From First Station(km)', 'Daily_Ridership', 'Metro Line']
+    return render_figure(draw_ridership_by_distance, df[columns], figsize=(12, 6))
 
-def plot_model_comparison(metrics):
-    plt.figure(figsize=(10, 6))
+def draw_model_comparison(fig, metrics):
+    ax = fig.subplots()
     models = list(metrics.keys())
     rmse_values = [metrics[model]['RMSE'] for model in models]
     mae_values = [metrics[model]['MAE'] for model in models]
-    
+
     x = range(len(models))
-    
-    plt.bar(x, rmse_values, width=0.4, label='RMSE', color='b', align='center')
-    plt.bar([p + 0.4 for p in x], mae_values, width=0.4, label='MAE', color='r', align='center')
-    
-    plt.xticks([p + 0.2 for p in x], models)
-    plt.title('Model Comparison: RMSE and MAE')
-    plt.ylabel('Error')
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    return plt
+
+    ax.bar(x, rmse_values, width=0.4, label='RMSE', color='b', align='center')
+    ax.bar([p + 0.4 for p in x], mae_values, width=0.4, label='MAE', color='r', align='center')
+
+    ax.set_xticks([p + 0.2 for p in x], models)
+    ax.set_title('Model Comparison: RMSE and MAE')
+    ax.set_ylabel('Error')
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+
+def plot_model_comparison(metrics):
+    return render_figure(draw_model_comparison, metrics, figsize=(10, 6))
+
+def draw_hourly_ridership_patterns(fig, hourly_data):
+    ax = fig.subplots()
+    ax.plot(hourly_data['Hour'], hourly_data['Weekday'], label='Weekday', color='blue')
+    ax.plot(hourly_data['Hour'], hourly_data['Weekend'], label='Weekend', color='orange')
+
+    ax.set_title('Average Hourly Ridership Patterns')
+    ax.set_xlabel('Hour of Day')
+    ax.set_ylabel('Average Ridership')
+    ax.set_xticks(hourly_data['Hour'])
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
 
 def plot_hourly_ridership_patterns(hourly_data):
-    plt.figure(figsize=(15, 6))
-    plt.plot(hourly_data['Hour'], hourly_data['Weekday'], label='Weekday', color='blue')
-    plt.plot(hourly_data['Hour'], hourly_data['Weekend'], label='Weekend', color='orange')
-    
-    plt.title('Average Hourly Ridership Patterns')
-    plt.xlabel('Hour of Day')
-    plt.ylabel('Average Ridership')
-    plt.xticks(hourly_data['Hour'])
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    return plt
\ No newline at end of file
+    return render_figure(draw_hourly_ridership_patterns, hourly_data[['Hour', 'Weekday', 'Weekend']], figsize=(15, 6))
+
+def draw_station_hourly_trends(fig, weekday_ridership, weekend_ridership, station):
+    ax = fig.subplots()
+    hours = list(range(len(weekday_ridership)))
+    ax.plot(hours, weekday_ridership, label='Weekday', color='blue')
+    ax.plot(hours, weekend_ridership, label='Weekend', color='red')
+    ax.set_title(f'Hourly Ridership Trends for {station}')
+    ax.set_xlabel('Hour of Day')
+    ax.set_ylabel('Ridership')
+    ax.set_xticks(hours)
+    ax.legend()
+
+def plot_station_hourly_trends(weekday_ridership, weekend_ridership, station):
+    """Weekday and weekend hourly ridership of one station, as PNG bytes."""
+    return render_figure(draw_station_hourly_trends, weekday_ridership, weekend_ridership, station=station, figsize=(12, 6))
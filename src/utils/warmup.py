@@ -0,0 +1,123 @@
+import argparse
+import os
+import threading
+import time
+from utils.instrumentation import WARMUP_SECONDS, timer
+
+def _import_pages():
+    import components.map_visualization
+    import components.data_insights
+    import components.model_comparisons
+    import components.real_time_analysis
+    import components.scenario_simulations
+
+def _load_datasets():
+    from utils.data_loader import DATASET_FILES, load_table
+    for name in DATASET_FILES:
+        load_table(name)
+
+def _build_statistics():
+    from utils.statistics_store import get_statistics_store
+    get_statistics_store('stations')
+
+def _render_map():
+    from utils.data_loader import load_dataset
+    from utils.map_builder import render_map_html
+    render_map_html(load_dataset('stations'))
+
+def _build_network():
+    from utils.network_graph import get_network
+    get_network().accessibility()
+
+def _build_ridership_cube():
+    from utils.ridership_cube import get_ridership_cube
+    get_ridership_cube()
+
+def _evaluate_models():
+    from utils.model_evaluation import evaluate_models
+    evaluate_models()
+
+def _load_serving_pipeline():
+    from utils.model_utils import get_inference_engine
+    get_inference_engine()
+
+def _build_feature_transformer():
+    from utils.feature_engineering import get_feature_transformer
+    get_feature_transformer()
+
+def _load_calibration():
+    from utils.conformal import get_calibration
+    get_calibration()
+
+def _build_station_locator():
+    from utils.spatial_index import get_station_locator
+    get_station_locator()
+
+# Steps in the order of the navigation menu, so the page a user is most likely to open next is ready first
+WARMUP_STEPS = [
+    ('pages', _import_pages),
+    ('datasets', _load_datasets),
+    ('statistics', _build_statistics),
+    ('map', _render_map),
+    ('network', _build_network),
+    ('model_evaluation', _evaluate_models),
+    ('ridership_cube', _build_ridership_cube),
+    ('serving_pipeline', _load_serving_pipeline),
+    ('feature_transformer', _build_feature_transformer),
+    ('calibration', _load_calibration),
+    ('station_locator', _build_station_locator)
+]
+
+_warmup_lock = threading.Lock()
+_worker = None
+_results = {}
+
+def warmup_enabled():
+    """The warm-up runs with METRO_WARMUP=1."""
+    return os.environ.get('METRO_WARMUP') == '1'
+
+def run_warmup(steps=WARMUP_STEPS):
+    """
+    Import the page modules and build the process-wide caches the pages read from.
+
+    A failing step is recorded and skipped: the page that needs it reports the
+    error when it is opened, as it would without the warm-up.
+    """
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            with timer(WARMUP_SECONDS, step=name):
+                step()
+            _results[name] = time.perf_counter() - start
+        except Exception as error:
+            _results[name] = error
+    return dict(_results)
+
+def start_warmup():
+    """
+    Run the warm-up in a background thread, once per process. Returns the thread.
+
+    Every step fills a cache shared by all sessions, so once it has run no session
+    pays for that import or load on its first visit to a page.
+    """
+    global _worker
+    with _warmup_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=run_warmup, name='warmup', daemon=True)
+            _worker.start()
+        return _worker
+
+def warmup_results():
+    """Seconds taken by each finished step, or the exception it raised."""
+    return dict(_results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the warm-up steps in the foreground and time them (run from src).")
+    parser.parse_args()
+    total = time.perf_counter()
+    for name, result in run_warmup().items():
+        print(f"{name:20s} {'failed: ' + str(result) if isinstance(result, Exception) else f'{result:.3f}s'}")
+    print(f"{'total':20s} {time.perf_counter() - total:.3f}s")
+
+if __name__ == "__main__":
+    main()